@@ -0,0 +1,171 @@
+"""
+ADMISSION CONTROL
+- Purpose: Caps how much /api/analyze and /api/scrape work a worker takes on,
+  so spikes get fast 503s instead of piling up threads and latency.
+- Each endpoint has its own limiter: max concurrent requests, a bounded FIFO
+  wait queue and a max time in that queue. Rejections carry a Retry-After
+  estimated from Little's law (work ahead / observed throughput).
+- With ADMISSION_ADAPTIVE=1 the concurrency limit follows observed latency:
+  it shrinks when requests run slower than the target and grows back while
+  they are faster and work is queueing.
+"""
+
+import asyncio
+import collections
+import math
+import os
+import threading
+import time
+
+ADMISSION_ADAPTIVE = os.getenv("ADMISSION_ADAPTIVE", "0") == "1"
+# EWMA weight of the newest latency / throughput sample
+SMOOTHING = 0.2
+ADAPT_EVERY = 10
+
+
+class Overloaded(Exception):
+    """Request rejected by admission control; retry_after is in seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limit + bounded wait queue, usable from any event loop."""
+
+    def __init__(self, name: str, max_concurrent: int, max_queue: int, max_queue_time: float,
+                 target_latency: float = None, adaptive: bool = ADMISSION_ADAPTIVE,
+                 min_concurrent: int = 1):
+        self.name = name
+        self.limit = max_concurrent
+        self.max_concurrent = max_concurrent
+        self.min_concurrent = min_concurrent
+        self.max_queue = max_queue
+        self.max_queue_time = max_queue_time
+        self.target_latency = target_latency
+        self.adaptive = adaptive and target_latency is not None
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiters = collections.deque()
+        self._latency = None
+        self._throughput = None
+        self._last_completion = None
+        self._since_adapt = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+
+    def retry_after(self) -> int:
+        """Seconds until the work ahead should drain: (active + queued) / throughput."""
+        ahead = self._active + len(self._waiters)
+        if self._throughput:
+            return max(1, math.ceil(ahead / self._throughput))
+        return max(1, math.ceil(self._latency or self.max_queue_time))
+
+    def _reject(self, reason: str):
+        return Overloaded(f"{self.name} over capacity: {reason}", self.retry_after())
+
+    async def acquire(self):
+        """Take a slot, waiting in the queue up to max_queue_time; raises Overloaded."""
+        with self._lock:
+            if self._active < self.limit and not self._waiters:
+                self._active += 1
+                self.admitted += 1
+                return
+            if len(self._waiters) >= self.max_queue:
+                self.rejected += 1
+                raise self._reject("queue full")
+            loop = asyncio.get_running_loop()
+            waiter = (loop, loop.create_future())
+            self._waiters.append(waiter)
+
+        try:
+            await asyncio.wait_for(waiter[1], timeout=self.max_queue_time)
+        except asyncio.TimeoutError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    self.timed_out += 1
+                    raise self._reject("queue wait exceeded")
+            # The slot was granted just as we timed out: keep it
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                    raise
+            self.release()
+            raise
+        with self._lock:
+            self.admitted += 1
+
+    def release(self, latency: float = None):
+        """Free a slot, record the request's latency and wake queued requests."""
+        with self._lock:
+            self._active -= 1
+            if latency is not None:
+                self._observe(latency)
+            self._wake()
+
+    def _wake(self):
+        while self._waiters and self._active < self.limit:
+            loop, fut = self._waiters.popleft()
+            self._active += 1
+            loop.call_soon_threadsafe(_grant, fut)
+
+    def _observe(self, latency: float):
+        now = time.monotonic()
+        self._latency = latency if self._latency is None else (
+            SMOOTHING * latency + (1 - SMOOTHING) * self._latency)
+        if self._last_completion is not None:
+            rate = 1.0 / max(now - self._last_completion, 1e-3)
+            self._throughput = rate if self._throughput is None else (
+                SMOOTHING * rate + (1 - SMOOTHING) * self._throughput)
+        self._last_completion = now
+
+        self._since_adapt += 1
+        if self.adaptive and self._since_adapt >= ADAPT_EVERY:
+            self._since_adapt = 0
+            if self._latency > self.target_latency:
+                target = math.floor(self.limit * self.target_latency / self._latency)
+                self.limit = max(self.min_concurrent, min(self.limit - 1, target))
+            elif self._waiters and self._latency < 0.8 * self.target_latency:
+                self.limit = min(self.max_concurrent, self.limit + 1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "limit": self.limit,
+                "max_concurrent": self.max_concurrent,
+                "active": self._active,
+                "queued": len(self._waiters),
+                "max_queue": self.max_queue,
+                "max_queue_time_s": self.max_queue_time,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "timed_out": self.timed_out,
+                "avg_latency_s": round(self._latency, 3) if self._latency is not None else None,
+                "throughput_per_s": round(self._throughput, 3) if self._throughput is not None else None,
+                "adaptive": self.adaptive,
+            }
+
+
+def _grant(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+
+def _from_env(name: str, max_concurrent: int, max_queue: int, max_queue_time: float,
+              target_latency: float) -> AdmissionController:
+    prefix = name.upper()
+    return AdmissionController(
+        name,
+        max_concurrent=int(os.getenv(f"{prefix}_MAX_CONCURRENT", str(max_concurrent))),
+        max_queue=int(os.getenv(f"{prefix}_MAX_QUEUE", str(max_queue))),
+        max_queue_time=float(os.getenv(f"{prefix}_MAX_QUEUE_TIME", str(max_queue_time))),
+        target_latency=float(os.getenv(f"{prefix}_TARGET_LATENCY", str(target_latency))),
+    )
+
+
+analyze_admission = _from_env("analyze", 8, 32, 5.0, 8.0)
+scrape_admission = _from_env("scrape", 16, 64, 3.0, 3.0)
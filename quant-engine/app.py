@@ -4,21 +4,103 @@ MAIN FASTAPI SERVER
 - Defines the internal routes that the Cloudflare Worker calls.
 - Orchestrates the scraping modules and the scoring module.
 - Uses concurrent.futures to call Wikipedia, Finnhub, and Polymarket simultaneously.
+- Responses are encoded with orjson; /api/scrape and /api/analyze answers are
+  cached as encoded bytes and served without re-serialization.
+- /api/scrape answers carry strong ETags (304 on If-None-Match) and are
+  brotli/gzip-compressed above a size threshold (compression.py).
+- /api/market-snapshot serves a pre-serialized market overview from memory;
+  reads trigger background refreshes of stale parts, or a refresher thread
+  runs while it is being read (snapshot.py).
+- Heavy modules (groq, requests) load lazily; a background thread warms them up
+  at startup so /health answers immediately.
+- /api/analyze and /api/scrape run their blocking pipelines in the threadpool
+  behind per-endpoint admission control (admission.py).
+- Questions naming several tickers (or a symbol list) are analyzed against
+  all of them, with a comparative Finnhub context.
+- Each question is parsed once (query.py); its canonical form keys the
+  response caches. Reworded /api/analyze questions can reuse a recent answer
+  through the semantic cache (semantic_cache.py).
+- /api/analyze asks the source planner (planner.py) which sources to call and
+  how long to wait for each; the plan is included in the response. Upstream
+  request timeouts adapt to live latency percentiles (latency.py).
+- /api/analyze work is cancelled when the client disconnects or the request
+  deadline passes (cancellation.py).
+- With LLM_HEDGE_MODE set, a slow or failed LLM call is hedged with a second
+  request and/or answered from the local pre-score, flagged "fallback"
+  (hedging.py). Fallback answers are not cached.
+- /api/jobs queues one or many analyze requests for background workers and
+  long-polls for the results (jobs.py); job requests use the scheduler's
+  batch lane.
 """
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import List, Optional, Union
 import concurrent.futures
+import asyncio
+import contextvars
 import re
+import threading
+import time
 
+import cancellation
+import hedging
+import indicators
+import jobs
+import latency
+import lazy
+import prescore
+import scoring
+import timeseries
+from admission import Overloaded, analyze_admission, scrape_admission
+from cache import _has_error, scrape_cache, analyze_cache
+from compression import conditional_response
+from planner import question_class, source_planner
+from query import MAX_SYMBOLS, analyze as analyze_query
+from semantic_cache import SEMANTIC_CACHE_ENABLED, semantic_cache
+from snapshot import SNAPSHOT_ENABLED, snapshot as market_snapshot
+from serialization import FastJSONResponse, dumps, loads, encoded_response
 from scoring import get_trade_confidence
 from scraping.wikipedia import search_wikipedia
-from scraping.finnHub import get_stock_quote, get_company_news, get_market_sentiment
+from scraping.finnHub import (get_stock_quote, get_company_news, get_market_sentiment,
+                               get_comparative_context, get_candles)
 from scraping.polymarket import search_markets, get_polymarket_context
+from scraping import scheduler
+from scraping.entity_titles import titles as entity_titles
+from scraping.http_cache import cache as http_cache
 
-app = FastAPI(title="BrightBet Quant Engine")
+_warm = threading.Event()
+
+
+def warm_up():
+    """Import deferred modules and build the Groq client off the request path."""
+    try:
+        lazy.load("requests")
+        if SEMANTIC_CACHE_ENABLED:
+            lazy.load("numpy")
+        if scoring.GROQ_API_KEY:
+            scoring.get_client()
+    finally:
+        _warm.set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    job_queue.start()
+    yield
+    market_snapshot.stop()
+    entity_titles.save()
+
+
+app = FastAPI(
+    title="BrightBet Quant Engine",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -28,53 +110,81 @@ app.add_middleware(
 )
 
 
+MAX_TECHNICALS_SYMBOLS = 20
+MAX_INDICATOR_WINDOW = 200
+
+
 class TradeRequest(BaseModel):
     question: str
     context: str = ""
-    symbol: Optional[str] = None
+    # One ticker or a list of them (at most MAX_SYMBOLS are used)
+    symbol: Optional[Union[str, List[str]]] = None
+    include_technicals: bool = False
+
+
+class JobRequest(BaseModel):
+    requests: List[TradeRequest]
+
+
+class TechnicalsRequest(BaseModel):
+    symbols: List[str]
+    resolution: str = "D"
+    days_back: int = 180
+    windows: List[int] = [14]
+    series: bool = False
 
 
 def _extract_symbol(question: str) -> Optional[str]:
     """Try to extract a stock ticker from the question."""
-    match = re.search(r'\$([A-Z]{1,5})', question.upper())
-    if match:
-        return match.group(1)
-
-    q_lower = question.lower()
-
-    # Skip stock ticker extraction if a crypto keyword is detected
-    # Long names: simple substring match
-    crypto_long = [
-        "bitcoin", "ethereum", "solana", "dogecoin", "cardano", "ripple",
-        "polkadot", "avalanche", "litecoin", "chainlink", "monero", "stellar",
-        "cosmos", "algorand", "fantom", "aptos", "uniswap", "aave", "arbitrum",
-        "near protocol", "shiba", "pepe", "cryptocurrency", "crypto",
-    ]
-    # Short tickers: word boundary match to avoid 'eth' in 'whether', 'sol' in 'solution'
-    crypto_short = [
-        "btc", "eth", "sol", "doge", "ada", "xrp", "dot", "avax", "ltc",
-        "link", "xmr", "trx", "xlm", "atom", "algo", "ftm", "apt", "sui",
-        "shib", "uni", "arb", "tron",
-    ]
-
-    for kw in crypto_long:
-        if kw in q_lower:
-            return None
-    for kw in crypto_short:
-        if re.search(rf'\b{kw}\b', q_lower):
-            return None
-
-    mappings = {
-        "tesla": "TSLA", "apple": "AAPL", "google": "GOOGL", "alphabet": "GOOGL",
-        "amazon": "AMZN", "microsoft": "MSFT", "nvidia": "NVDA", "meta": "META",
-        "netflix": "NFLX", "disney": "DIS", "amd": "AMD", "intel": "INTC",
-        "coinbase": "COIN", "palantir": "PLTR", "uber": "UBER",
-        "spacex": "TSLA", "elon": "TSLA", "musk": "TSLA",
+    return analyze_query(question).symbol
+
+
+def _request_symbols(request: TradeRequest) -> list:
+    """Tickers to analyze: the request's symbol(s), else those found in the question."""
+    if not request.symbol:
+        return list(analyze_query(request.question).symbols)
+    given = [request.symbol] if isinstance(request.symbol, str) else request.symbol
+    return list(dict.fromkeys(s.strip().upper() for s in given if s.strip()))[:MAX_SYMBOLS]
+
+
+async def _admit(controller):
+    """Wait for an admission slot or fail fast with 503 + Retry-After."""
+    try:
+        await controller.acquire()
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+def _submit(executor, fn, *args):
+    """executor.submit that carries the caller's context (scheduler lane) into the worker."""
+    return executor.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _compute_technicals(symbol: str, resolution: str = "D", days_back: int = 180,
+                        windows: list = None, series: bool = False) -> dict:
+    """Fetch candles for one symbol and compute its indicator summary."""
+    candles = get_candles(symbol, resolution, days_back)
+    if "error" in candles:
+        return {"symbol": symbol.upper(), "error": candles["error"]}
+    result = {
+        "symbol": symbol.upper(),
+        "indicators": indicators.summarize(candles, windows),
     }
-    for keyword, ticker in mappings.items():
-        if keyword in q_lower:
-            return ticker
-    return None
+    if series:
+        result["candles"] = candles
+    return result
+
+
+def _technicals_context(symbol: str) -> Optional[str]:
+    """Compact indicator block for the /api/analyze LLM context."""
+    result = _compute_technicals(symbol)
+    if "error" in result:
+        return None
+    return indicators.format_summary(symbol, result["indicators"])
 
 
 @app.get("/")
@@ -87,67 +197,443 @@ def health():
     return {"status": "healthy"}
 
 
-@app.post("/api/analyze")
-async def analyze_trade(request: TradeRequest):
-    """Full pipeline: scrape context -> AI inference -> return confidence."""
+@app.get("/ready")
+def ready():
+    """Readiness probe: 200 once the background warm-up has finished."""
+    if not _warm.is_set():
+        raise HTTPException(status_code=503, detail="warming up")
+    return {"status": "ready"}
+
+
+# (is_error, is_useful) for each context source's text, fed back to the planner
+_SOURCE_JUDGES = {
+    "wikipedia": lambda ctx: (
+        ctx.startswith("Wikipedia scrape failed"),
+        not ctx.startswith(("No Wikipedia results", "No summaries found")),
+    ),
+    "polymarket": lambda ctx: ("Error:" in ctx, "Market:" in ctx),
+    "finnhub": lambda ctx: ("failed:" in ctx, "Price:" in ctx or "  - " in ctx or "Relative Performance" in ctx),
+    "technicals": lambda ctx: (ctx is None, ctx is not None),
+}
+
+
+def _observed(cls: str, source: str, fn, *args):
+    """Call a context source and record its latency / outcome with the planner."""
+    start = time.monotonic()
     try:
-        symbol = request.symbol or _extract_symbol(request.question)
-        context_parts = []
-        finnhub_ctx = None
+        value = fn(*args)
+    except Exception:
+        source_planner.record(source, cls, time.monotonic() - start, error=True, useful=False)
+        raise
+    error, useful = _SOURCE_JUDGES[source](value)
+    source_planner.record(source, cls, time.monotonic() - start, error, useful)
+    return value
+
 
-        if request.context:
-            context_parts.append(request.context)
+def _await(future, decision: dict, started: float):
+    """Result of a planned call, or None once its timeout (from submission) has passed."""
+    if future is None:
+        return None
+    try:
+        return cancellation.current().wait(
+            future, max(0.0, started + decision["timeout_s"] - time.monotonic()))
+    except concurrent.futures.TimeoutError:
+        decision["timed_out"] = True
+        return None
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-            wiki_future = executor.submit(search_wikipedia, request.question)
-            poly_future = executor.submit(get_polymarket_context, request.question)
 
+def _run_analysis(request: TradeRequest) -> dict:
+    """Scrape context -> (pre-score) -> AI inference. Runs in a worker thread."""
+    symbols = _request_symbols(request)
+    symbol = symbols[0] if symbols else None
+    context_parts = []
+
+    if request.context:
+        context_parts.append(request.context)
+
+    cls = question_class(symbol)
+    wanted = {"wikipedia": False, "polymarket": False}
+    if symbol:
+        wanted["finnhub"] = True
+        if request.include_technicals:
+            wanted["technicals"] = True
+    plan = source_planner.plan(cls, wanted)
+    calls = plan["sources"]
+    fetchers = {
+        "wikipedia": (search_wikipedia, request.question),
+        "polymarket": (get_polymarket_context, request.question),
+        "finnhub": (get_comparative_context, symbols) if len(symbols) > 1 else (get_market_sentiment, symbol),
+        "technicals": (_technicals_context, symbol),
+    }
+
+    pre = scored = None
+    futures, structured = {}, {}
+    # Not a with-block: a timed-out source must not hold the request open
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=7)
+    try:
+        started = time.monotonic()
+        futures = {
+            name: _submit(executor, _observed, cls, name, fn, arg)
+            for name, (fn, arg) in fetchers.items()
+            if name in calls and calls[name]["call"]
+        }
+
+        # Structured results for the pre-score; the scraper cache's
+        # single-flight makes these share the fetches behind the contexts.
+        # The LLM fallback needs them too.
+        if prescore.PRESCORE_MODE != "off" or hedging.llm_hedge.enabled:
+            if "polymarket" in futures:
+                structured["markets"] = (_submit(executor, search_markets, request.question), "polymarket")
             if symbol:
-                finn_future = executor.submit(get_market_sentiment, symbol)
-                finnhub_ctx = finn_future.result(timeout=15)
-                context_parts.append(finnhub_ctx)
+                structured["quote"] = (_submit(executor, get_stock_quote, symbol), "finnhub")
+                structured["news"] = (_submit(executor, get_company_news, symbol), "finnhub")
 
-            wiki_ctx = wiki_future.result(timeout=15)
-            poly_ctx = poly_future.result(timeout=15)
+        ctx = {name: _await(futures.get(name), calls[name], started) for name in calls}
+        for name in ("finnhub", "technicals", "wikipedia", "polymarket"):
+            if ctx.get(name):
+                context_parts.append(ctx[name])
 
-            context_parts.append(wiki_ctx)
-            context_parts.append(poly_ctx)
+        if structured:
+            scored = prescore.score(prescore.extract_features(question=request.question, **{
+                name: _await(f, calls[source], started) for name, (f, source) in structured.items()
+            }))
+            pre = scored if prescore.PRESCORE_MODE != "off" else None
+    finally:
+        if cancellation.current().cancelled:
+            pending = list(futures.values()) + [f for f, _ in structured.values()]
+            cancellation.count("futures_cancelled", sum(f.cancel() for f in pending))
+        executor.shutdown(wait=False)
 
+    if pre and prescore.PRESCORE_MODE == "skip" and pre["confidence"] >= prescore.PRESCORE_SKIP_CONFIDENCE:
+        result = prescore.as_answer(pre)
+    else:
+        if pre:
+            context_parts.append(prescore.describe(pre))
         full_context = "\n\n".join(context_parts)
-        result = get_trade_confidence(request.question, full_context)
-        result["sources"] = {
-            "wikipedia": wiki_ctx[:500] if wiki_ctx else None,
-            "polymarket": poly_ctx[:500] if poly_ctx else None,
-            "finnhub": finnhub_ctx[:500] if symbol and finnhub_ctx else None,
-        }
-        result["question"] = request.question
-        result["symbol"] = symbol
-        return result
+        cancellation.check("llm_skipped")
+        if hedging.llm_hedge.enabled:
+            result = hedging.llm_hedge.answer(
+                request.question, full_context,
+                lambda: prescore.as_answer(scored or prescore.score(prescore.extract_features())),
+            )
+        else:
+            result = get_trade_confidence(request.question, full_context)
+        if pre:
+            pre["disagreement"] = prescore.disagrees(pre, result)
+    if pre:
+        result["prescore"] = pre
+    wiki_ctx, poly_ctx, finnhub_ctx = ctx.get("wikipedia"), ctx.get("polymarket"), ctx.get("finnhub")
+    result["sources"] = {
+        "wikipedia": wiki_ctx[:500] if wiki_ctx else None,
+        "polymarket": poly_ctx[:500] if poly_ctx else None,
+        "finnhub": finnhub_ctx[:500] if finnhub_ctx else None,
+    }
+    if request.include_technicals:
+        result["sources"]["technicals"] = ctx.get("technicals")
+    result["plan"] = plan
+    result["question"] = request.question
+    result["symbol"] = symbol
+    if len(symbols) > 1:
+        result["symbols"] = symbols
+    return result
+
+
+@app.post("/api/analyze")
+async def analyze_trade(request: TradeRequest, http_request: Request):
+    """Full pipeline: scrape context -> AI inference -> return confidence."""
+    analysis = analyze_query(request.question)
+    cache_key = dumps({**request.model_dump(), "question": analysis.cache_key})
+    cached = analyze_cache.get(cache_key)
+    if cached is not None:
+        result = loads(cached)
+        if result.get("question") != request.question:
+            # Shared by rephrasings: echo this request's wording, not the first asker's
+            result["question"] = request.question
+            return encoded_response(dumps(result))
+        return encoded_response(cached)
 
+    scope = None
+    if SEMANTIC_CACHE_ENABLED:
+        # A reworded question may reuse an answer only for the same symbols and options
+        scope = dumps({**request.model_dump(exclude={"question"}),
+                       "symbol": _request_symbols(request)}).decode()
+        match = semantic_cache.lookup(request.question, scope)
+        if match is not None:
+            body, matched_question, similarity = match
+            result = loads(body)
+            result["question"] = request.question
+            result["semantic_match"] = {"question": matched_question, "similarity": similarity}
+            return encoded_response(dumps(result))
+
+    await _admit(analyze_admission)
+    start = time.monotonic()
+    token = cancellation.CancelToken(cancellation.ANALYZE_DEADLINE)
+    try:
+        # The slot is held until the worker thread exits, not until we stop waiting
+        # for it, so cancelled-but-running work still counts against the limit
+        result = await cancellation.run_cancellable(
+            http_request, token, _run_analysis, request,
+            on_exit=lambda: analyze_admission.release(time.monotonic() - start),
+        )
+    except cancellation.Cancelled as e:
+        if e.reason == "client_closed":
+            # Nobody is listening; the status only reaches logs
+            raise HTTPException(status_code=400, detail="Client closed the connection")
+        raise HTTPException(status_code=504,
+                            detail=f"Analysis exceeded its {cancellation.ANALYZE_DEADLINE:g}s deadline")
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    body = dumps(result)
+    # A fallback answer stands in for a slow LLM; don't pin it for the cache TTL
+    if "error" not in result and not result.get("fallback"):
+        analyze_cache.set(cache_key, body)
+        if scope is not None:
+            semantic_cache.add(request.question, scope, body)
+    return encoded_response(body)
 
-@app.get("/api/scrape")
-async def scrape_only(question: str):
-    """Just scrape context without AI inference."""
-    symbol = _extract_symbol(question)
+
+JOB_RETRIES = 3
+
+
+async def _run_job_request(payload: dict) -> dict:
+    """One queued analyze request through the /api/analyze pipeline; errors become dicts."""
+    request = TradeRequest(**payload)
+    # Queued work yields upstream rate budget to live /api/analyze callers
+    with scheduler.in_lane("batch"):
+        for attempt in range(JOB_RETRIES + 1):
+            try:
+                response = await analyze_trade(request, None)
+                return loads(response.body)
+            except HTTPException as e:
+                if e.status_code == 503 and attempt < JOB_RETRIES:
+                    # Shed by admission control: a queued job can afford to wait its turn
+                    await asyncio.sleep(float((e.headers or {}).get("Retry-After", 1)))
+                    continue
+                return {"error": e.detail, "status_code": e.status_code}
+
+
+job_queue = jobs.JobQueue(_run_job_request)
+
+
+@app.post("/api/jobs", status_code=202)
+def submit_job(request: Union[JobRequest, TradeRequest]):
+    """Queue one analyze request (or {"requests": [...]}) and return its job id."""
+    requests = request.requests if isinstance(request, JobRequest) else [request]
+    if not requests:
+        raise HTTPException(status_code=400, detail="requests must not be empty")
+    if len(requests) > jobs.JOBS_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {jobs.JOBS_MAX_REQUESTS} requests per job",
+        )
+    try:
+        job = job_queue.submit([r.model_dump() for r in requests])
+    except jobs.QueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    return {"job_id": job.id, "status": job.status, "size": len(requests), "created_at": job.created_at}
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = 0):
+    """Job status and, once finished, its results; wait > 0 long-polls up to that many seconds."""
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job {job_id}")
+    if wait > 0 and not job.finished:
+        await job_queue.wait(job, wait)
+    return encoded_response(dumps(job.as_dict()))
+
+
+@app.post("/api/technicals")
+def technicals(request: TechnicalsRequest):
+    """RSI / MACD / Bollinger / ATR / VWAP for many symbols in one call."""
+    symbols = list(dict.fromkeys(s.strip().upper() for s in request.symbols if s.strip()))
+    if not symbols:
+        raise HTTPException(status_code=400, detail="symbols must not be empty")
+    if len(symbols) > MAX_TECHNICALS_SYMBOLS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_TECHNICALS_SYMBOLS} symbols per request",
+        )
+    if any(w < 2 or w > MAX_INDICATOR_WINDOW for w in request.windows):
+        raise HTTPException(
+            status_code=400,
+            detail=f"windows must be between 2 and {MAX_INDICATOR_WINDOW}",
+        )
+
+    windows = sorted(set(request.windows)) or [14]
+    with scheduler.in_lane("standard"), \
+            concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(symbols))) as executor:
+        futures = [
+            _submit(executor, _compute_technicals, s, request.resolution,
+                            request.days_back, windows, request.series)
+            for s in symbols
+        ]
+        results = [f.result(timeout=30) for f in futures]
+
+    return encoded_response(dumps({"results": results, "windows": windows}))
+
+
+@app.get("/api/market-snapshot")
+async def get_market_snapshot(request: Request):
+    """Index quotes, top Polymarket markets and market headlines, served pre-serialized."""
+    body = market_snapshot.body()
+    if SNAPSHOT_ENABLED:
+        market_snapshot.start()
+    elif body is not None:
+        market_snapshot.revalidate()
+    if body is None:
+        # Only the very first build is waited for
+        body = await run_in_threadpool(market_snapshot.refresh)
+    return conditional_response(request, body)
+
+
+@app.get("/api/admin/snapshot")
+def snapshot_stats():
+    """Version, size, read count and per-component freshness of the market snapshot."""
+    return market_snapshot.stats()
+
+
+@app.get("/api/admin/jobs")
+def job_stats():
+    """Job queue depth, oldest queued age, queue-wait times and outcome counts."""
+    return job_queue.stats()
+
+
+@app.get("/api/admin/hedging")
+def hedging_stats():
+    """LLM hedge mode, current hedge delay, LLM latency and win/fallback counts."""
+    return hedging.llm_hedge.stats()
+
+
+@app.get("/api/admin/admission")
+def admission_stats():
+    """Concurrency limits, queue lengths and rejections per endpoint."""
+    return {
+        "analyze": analyze_admission.stats(),
+        "scrape": scrape_admission.stats(),
+    }
+
+
+@app.get("/api/admin/scheduler")
+def scheduler_stats():
+    """Rate budget, queue depth and wait times per upstream and lane."""
+    return scheduler.all_stats()
+
+
+@app.get("/api/admin/cancellation")
+def cancellation_stats():
+    """Requests cancelled by client_closed / deadline and the upstream work they skipped."""
+    return cancellation.stats()
+
+
+@app.get("/api/admin/timeouts")
+def timeout_stats():
+    """Latency percentiles and the adaptive timeout chosen for each upstream endpoint."""
+    return latency.upstream_timeouts.stats()
+
+
+@app.get("/api/admin/wiki-titles")
+def wiki_titles_stats():
+    """Size, confidence and hit rate of the learned Wikipedia entity-title map."""
+    return entity_titles.stats()
+
+
+@app.get("/api/admin/http-cache")
+def http_cache_stats():
+    """Entries and fresh / revalidated hit counts of the upstream HTTP cache."""
+    return http_cache.stats()
+
+
+@app.get("/api/admin/planner")
+def planner_stats():
+    """Per-source latency, error and usefulness statistics behind the analyze plans."""
+    return source_planner.stats()
+
+
+@app.get("/api/admin/semantic-cache")
+def semantic_cache_stats():
+    """Entries, threshold and hit rate of the reworded-question answer cache."""
+    return semantic_cache.stats()
+
+
+@app.get("/api/timeseries/stats")
+def timeseries_stats():
+    """Memory and size report for the in-memory price history."""
+    return timeseries.store.stats()
+
+
+@app.get("/api/timeseries")
+def timeseries_query(key: str, start: Optional[float] = None, end: Optional[float] = None,
+                     interval: Optional[float] = None):
+    """
+    Price history for one series, e.g. key=quote:TSLA or key=polymarket:<slug>.
+    With interval (seconds) the points are resampled into OHLC buckets.
+    """
+    series = timeseries.store.get(key)
+    if series is None:
+        raise HTTPException(status_code=404, detail=f"No time series for {key}")
+    if interval is not None:
+        if interval <= 0:
+            raise HTTPException(status_code=400, detail="interval must be positive")
+        t, o, h, l, c, n = series.resample(interval, start, end)
+        data = {"t": t.tolist(), "open": o.tolist(), "high": h.tolist(),
+                "low": l.tolist(), "close": c.tolist(), "count": n.tolist()}
+    else:
+        t, v = series.range(start, end)
+        data = {"t": t.tolist(), "price": v.tolist()}
+    return encoded_response(dumps({"key": key, "interval": interval, **data}))
+
+
+def _run_scrape(question: str) -> dict:
+    """Scrape every source for a question without AI inference. Runs in a worker thread."""
+    symbol = analyze_query(question).symbol
     data = {"wikipedia": None, "finnhub": None, "polymarket": None}
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-        wiki_future = executor.submit(search_wikipedia, question)
-        poly_future = executor.submit(search_markets, question)
+    with scheduler.in_lane("standard"), \
+            concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        wiki_future = _submit(executor, search_wikipedia, question)
+        poly_future = _submit(executor, search_markets, question)
 
         data["wikipedia"] = wiki_future.result(timeout=15)
         data["polymarket"] = poly_future.result(timeout=15)
 
         if symbol:
-            quote_future = executor.submit(get_stock_quote, symbol)
-            news_future = executor.submit(get_company_news, symbol)
+            quote_future = _submit(executor, get_stock_quote, symbol)
+            news_future = _submit(executor, get_company_news, symbol)
             data["finnhub"] = {
                 "quote": quote_future.result(timeout=15),
                 "news": news_future.result(timeout=15),
             }
             data["symbol"] = symbol
+    return data
+
+
+def _scrape_failed(data: dict) -> bool:
+    """True when any section of a scrape holds a scraper error; such bodies aren't cached."""
+    wiki = data["wikipedia"]
+    return ((isinstance(wiki, str) and wiki.startswith("Wikipedia scrape failed"))
+            or _has_error(data["polymarket"])
+            or any(_has_error(v) for v in (data["finnhub"] or {}).values()))
+
+
+@app.get("/api/scrape")
+async def scrape_only(question: str, request: Request):
+    """Just scrape context without AI inference."""
+    cache_key = analyze_query(question).cache_key
+    cached = scrape_cache.get(cache_key)
+    if cached is not None:
+        return conditional_response(request, cached)
+
+    await _admit(scrape_admission)
+    start = time.monotonic()
+    try:
+        data = await run_in_threadpool(_run_scrape, question)
+    finally:
+        scrape_admission.release(time.monotonic() - start)
 
-    return data
\ No newline at end of file
+    body = dumps(data)
+    if not _scrape_failed(data):
+        scrape_cache.set(cache_key, body)
+    return conditional_response(request, body)
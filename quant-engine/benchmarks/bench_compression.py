@@ -0,0 +1,51 @@
+"""
+BENCHMARK: compressed and conditional /api/scrape responses
+- Wire size of a typical /api/scrape answer as identity, gzip and brotli.
+- Cost of compressing on every response (what a GZip middleware does) versus
+  serving the memoized variant, and of answering a revalidation with a 304.
+
+Run from quant-engine/:  python benchmarks/bench_compression.py
+"""
+
+import os
+import sys
+import timeit
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import compression
+from benchmarks.bench_json import typical_payload
+from serialization import dumps
+
+N = 2000
+
+
+def _request(**headers):
+    return SimpleNamespace(headers={k.replace("_", "-"): v for k, v in headers.items()})
+
+
+def main():
+    body = dumps(typical_payload())
+    print(f"{'encoding':<10} {'bytes':>8} {'compress':>12}")
+    print(f"{'identity':<10} {len(body):>8}")
+    for encoding in compression.ENCODINGS:
+        size = len(compression._compress(body, encoding))
+        t = timeit.timeit(lambda: compression._compress(body, encoding), number=N)
+        print(f"{encoding:<10} {size:>8} {t / N * 1e6:>9.1f} us")
+
+    best = compression.ENCODINGS[0]
+    fresh = _request(accept_encoding="gzip, br")
+    tag = compression.conditional_response(fresh, body).headers["etag"]
+    revalidate = _request(accept_encoding="gzip, br", if_none_match=tag)
+
+    every_time = timeit.timeit(lambda: compression._compress(body, best), number=N)
+    memoized = timeit.timeit(lambda: compression.conditional_response(fresh, body), number=N)
+    not_modified = timeit.timeit(lambda: compression.conditional_response(revalidate, body), number=N)
+    print(f"\n{'compress every response':<28} {every_time / N * 1e6:>9.1f} us")
+    print(f"{'memoized variant':<28} {memoized / N * 1e6:>9.1f} us")
+    print(f"{'304 revalidation':<28} {not_modified / N * 1e6:>9.1f} us  (0 body bytes)")
+
+
+if __name__ == "__main__":
+    main()
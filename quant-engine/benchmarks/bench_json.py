@@ -0,0 +1,93 @@
+"""
+BENCHMARK: response encoding cost
+- Compares the stdlib path FastAPI used before (jsonable_encoder + json.dumps)
+  against orjson, and against serving pre-encoded bytes from the cache.
+- Payload mirrors a typical /api/scrape answer: Wikipedia text, a quote,
+  five news articles and five Polymarket markets.
+
+Run from quant-engine/:  python benchmarks/bench_json.py
+"""
+
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from serialization import dumps
+
+N = 20000
+
+
+def typical_payload() -> dict:
+    news = [
+        {
+            "headline": f"Tesla headline number {i} about deliveries and margins",
+            "summary": ("Tesla delivered a record number of vehicles this quarter. " * 5)[:300],
+            "source": "Reuters",
+            "url": f"https://example.com/news/{i}",
+            "datetime": 1700000000 + i,
+        }
+        for i in range(5)
+    ]
+    markets = [
+        {
+            "question": f"Will Tesla stock close above ${300 + i * 10} this month?",
+            "description": ("Market resolves YES if TSLA closes above the strike. " * 4)[:200],
+            "outcome_yes": "0.65",
+            "outcome_no": "0.35",
+            "volume": "150000.123",
+            "liquidity": "50000.5",
+            "end_date": "2026-06-01T00:00:00Z",
+            "slug": f"will-tesla-close-above-{300 + i * 10}",
+        }
+        for i in range(5)
+    ]
+    return {
+        "wikipedia": "## Tesla, Inc.\n" + "Tesla, Inc. is an American electric vehicle company. " * 25,
+        "polymarket": markets,
+        "finnhub": {
+            "quote": {
+                "symbol": "TSLA", "current_price": 250.0, "high": 255.0, "low": 245.0,
+                "open": 248.0, "previous_close": 247.0, "change": 3.0, "change_percent": 1.21,
+            },
+            "news": news,
+        },
+        "symbol": "TSLA",
+    }
+
+
+def stdlib_encode(payload):
+    # Mirrors starlette.responses.JSONResponse.render after FastAPI's encoder pass
+    return json.dumps(
+        jsonable_encoder(payload),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def main():
+    payload = typical_payload()
+    cached = dumps(payload)
+    assert json.loads(stdlib_encode(payload)) == json.loads(cached)
+
+    cases = {
+        "stdlib (jsonable_encoder + json.dumps)": lambda: stdlib_encode(payload),
+        "orjson dumps": lambda: dumps(payload),
+        "cached bytes (no encode)": lambda: cached,
+    }
+    print(f"payload size: {len(cached)} bytes, {N} iterations")
+    baseline = None
+    for name, fn in cases.items():
+        per_call = min(timeit.repeat(fn, number=N, repeat=3)) / N * 1e6
+        baseline = baseline or per_call
+        print(f"  {name:<40} {per_call:8.2f} us/op  ({baseline / per_call:6.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
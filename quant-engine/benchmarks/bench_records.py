@@ -0,0 +1,189 @@
+"""
+BENCHMARK: dict decoders (records.py) vs slotted record types
+- Decode: upstream JSON bytes -> the objects a scraper returns (orjson parse
+  plus one dict / one slotted dataclass per item), for a Finnhub quote,
+  Finnhub news and Polymarket markets.
+- Encode: those objects -> response JSON bytes via serialization.dumps,
+  which is also what the @cached layer does on every miss.
+- Memory: bytes held by 10k news items / markets, measured with tracemalloc.
+- The slotted types are the ones records.py shipped before it went back to
+  dicts; they live here only as the baseline being compared against.
+
+Run from quant-engine/:  python benchmarks/bench_records.py
+"""
+
+import os
+import sys
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from typing import Any, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import records
+from serialization import dumps, loads
+
+N = 2000
+ITEMS = 10000
+
+
+@dataclass(slots=True)
+class Quote:
+    symbol: str
+    current_price: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    open: Optional[float]
+    previous_close: Optional[float]
+    change: Optional[float]
+    change_percent: Optional[float]
+
+    @classmethod
+    def from_finnhub(cls, symbol: str, data: dict) -> "Quote":
+        get = data.get
+        return cls(symbol.upper(), get("c"), get("h"), get("l"), get("o"),
+                   get("pc"), get("d"), get("dp"))
+
+
+@dataclass(slots=True)
+class NewsItem:
+    headline: Optional[str]
+    summary: str
+    source: Optional[str]
+    url: Optional[str]
+    datetime: Optional[int]
+
+    @classmethod
+    def from_finnhub(cls, data: dict) -> "NewsItem":
+        get = data.get
+        return cls(get("headline"), (get("summary") or "")[:records.NEWS_SUMMARY_CHARS],
+                   get("source"), get("url"), get("datetime"))
+
+
+@dataclass(slots=True)
+class Market:
+    question: str
+    description: str
+    outcome_yes: Any
+    outcome_no: Any
+    volume: Any
+    liquidity: Any
+    end_date: Optional[str]
+    slug: Optional[str]
+
+    @classmethod
+    def from_gamma(cls, data: dict) -> "Market":
+        get = data.get
+        prices = get("outcomePrices")
+        if not isinstance(prices, list):
+            prices = ()
+        return cls(
+            get("question") or get("title", "Unknown"),
+            (get("description") or "")[:records.MARKET_DESCRIPTION_CHARS],
+            prices[0] if len(prices) > 0 else get("bestBid"),
+            prices[1] if len(prices) > 1 else get("bestAsk"),
+            get("volume"),
+            get("liquidity"),
+            get("endDate"),
+            get("slug"),
+        )
+
+
+QUOTE = dumps({"c": 250.0, "d": 3.0, "dp": 1.21, "h": 255.0, "l": 245.0, "o": 248.0,
+               "pc": 247.0, "t": 1700000000})
+
+
+def upstream_news(n: int) -> bytes:
+    return dumps([
+        {
+            "category": "company", "datetime": 1700000000 + i, "id": 100000 + i,
+            "headline": f"Tesla headline number {i} about deliveries and margins",
+            "image": f"https://example.com/img/{i}.jpg", "related": "TSLA",
+            "source": "Reuters",
+            "summary": "Tesla delivered a record number of vehicles this quarter. " * 8,
+            "url": f"https://example.com/news/{i}",
+        }
+        for i in range(n)
+    ])
+
+
+def upstream_markets(n: int) -> bytes:
+    return dumps([
+        {
+            "id": str(500000 + i), "question": f"Will Tesla close above ${200 + i} this week?",
+            "description": "This market resolves to Yes if Tesla's closing price ... " * 6,
+            "outcomePrices": ["0.62", "0.38"], "volume": str(100000 + i), "liquidity": "25000",
+            "endDate": "2026-12-31T00:00:00Z", "slug": f"tesla-above-{200 + i}", "active": True,
+            "closed": False, "bestBid": 0.61, "bestAsk": 0.63,
+        }
+        for i in range(n)
+    ])
+
+
+def quote_dict(raw: bytes) -> dict:
+    return records.quote("TSLA", loads(raw))
+
+
+def quote_record(raw: bytes) -> Quote:
+    return Quote.from_finnhub("TSLA", loads(raw))
+
+
+def news_dicts(raw: bytes) -> list:
+    return [records.news_item(a) for a in loads(raw)]
+
+
+def news_records(raw: bytes) -> list:
+    return [NewsItem.from_finnhub(a) for a in loads(raw)]
+
+
+def market_dicts(raw: bytes) -> list:
+    return [records.market(m) for m in loads(raw)]
+
+
+def market_records(raw: bytes) -> list:
+    return [Market.from_gamma(m) for m in loads(raw)]
+
+
+def held_bytes(build, raw: bytes) -> int:
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    items = build(raw)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del items
+    return size
+
+
+def per_call_us(fn, *args, number=N) -> float:
+    return min(timeit.repeat(lambda: fn(*args), number=number, repeat=5)) / number * 1e6
+
+
+def main():
+    news, markets = upstream_news(20), upstream_markets(20)
+    cases = [
+        ("quote", QUOTE, quote_dict, quote_record),
+        ("20 news", news, news_dicts, news_records),
+        ("20 markets", markets, market_dicts, market_records),
+    ]
+    # Both shapes must serialize identically, or the comparison is moot
+    for _, raw, as_dicts, as_records in cases:
+        assert dumps(as_dicts(raw)) == dumps(as_records(raw))
+
+    print(f"{'':20} {'dicts':>10} {'records':>10}")
+    for name, raw, as_dicts, as_records in cases:
+        d, r = per_call_us(as_dicts, raw), per_call_us(as_records, raw)
+        print(f"{'decode ' + name:20} {d:>8.2f}us {r:>8.2f}us")
+    for name, raw, as_dicts, as_records in cases:
+        d, r = per_call_us(dumps, as_dicts(raw)), per_call_us(dumps, as_records(raw))
+        print(f"{'encode ' + name:20} {d:>8.2f}us {r:>8.2f}us")
+
+    for name, raw, as_dicts, as_records in (
+            ("10k news", upstream_news(ITEMS), news_dicts, news_records),
+            ("10k markets", upstream_markets(ITEMS), market_dicts, market_records)):
+        d, r = held_bytes(as_dicts, raw), held_bytes(as_records, raw)
+        print(f"{'memory ' + name:20} {d / 1e6:>8.2f}MB {r / 1e6:>8.2f}MB  ({d / r:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+BENCHMARK: time-to-score, full completion vs streamed early return
+- A local stand-in for the Groq API emits a typical answer at a fixed
+  time-to-first-token and per-token rate (no network, no API key).
+- Compares get_trade_confidence on the non-streamed path (wait for the whole
+  completion) against GROQ_STREAM=1 with no reasoning cap, an 80-character
+  cap, and cap 0 (return as soon as confidence_score and sentiment parse).
+
+Run from quant-engine/:  python benchmarks/bench_scoring.py [--ttft 0.2] [--tps 250]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scoring
+
+ANSWER = json.dumps({
+    "confidence_score": 72,
+    "sentiment": "bullish",
+    "reasoning": ("Deliveries beat consensus and margins stabilized, while the Polymarket "
+                  "contract implies a 65% chance of the move. Macro risk remains elevated "
+                  "into the Fed meeting, so conviction is moderate rather than high."),
+})
+CHARS_PER_TOKEN = 4
+
+
+class StandInCompletions:
+    """chat.completions with Groq's response shapes and simulated generation time."""
+
+    def __init__(self, ttft: float, tokens_per_s: float):
+        self.ttft = ttft
+        self.token_time = 1.0 / tokens_per_s
+
+    def _tokens(self):
+        return [ANSWER[i:i + CHARS_PER_TOKEN] for i in range(0, len(ANSWER), CHARS_PER_TOKEN)]
+
+    def create(self, stream=False, **kwargs):
+        if not stream:
+            time.sleep(self.ttft + self.token_time * len(self._tokens()))
+            message = SimpleNamespace(content=ANSWER)
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+        return self._stream()
+
+    def _stream(self):
+        time.sleep(self.ttft)
+        for token in self._tokens():
+            time.sleep(self.token_time)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=token))])
+
+
+def time_to_score(stream: bool, cap, runs: int) -> float:
+    scoring.GROQ_STREAM = stream
+    scoring.GROQ_REASONING_CHARS = cap
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = scoring.get_trade_confidence("Will TSLA close above 300?", "context")
+        samples.append(time.perf_counter() - start)
+        assert result["confidence_score"] == 72, result
+    return statistics.median(samples) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ttft", type=float, default=0.2, help="time to first token (s)")
+    parser.add_argument("--tps", type=float, default=250.0, help="generated tokens per second")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    scoring.GROQ_API_KEY = "stand-in"
+    scoring.client = SimpleNamespace(chat=SimpleNamespace(
+        completions=StandInCompletions(args.ttft, args.tps)))
+
+    print(f"answer: {len(ANSWER)} chars, ttft {args.ttft * 1000:.0f}ms, {args.tps:.0f} tok/s")
+    for label, stream, cap in (
+        ("full completion", False, None),
+        ("stream, no cap", True, None),
+        ("stream, cap 80", True, 80),
+        ("stream, cap 0", True, 0),
+    ):
+        print(f"{label:18} {time_to_score(stream, cap, args.runs):8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
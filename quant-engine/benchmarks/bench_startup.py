@@ -0,0 +1,78 @@
+"""
+BENCHMARK: cold-start import time
+- Runs `python -X importtime -c "import app"` in a fresh interpreter and
+  reports the total import time plus the most expensive modules.
+- Compares against the tracked baseline in startup_baseline.json and exits
+  non-zero when import time regresses past the tolerance, or when a module
+  that must stay lazy (groq, requests) is imported eagerly again.
+
+Run from quant-engine/:
+    python benchmarks/bench_startup.py            # report + compare
+    python benchmarks/bench_startup.py --update   # rewrite the baseline
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "startup_baseline.json")
+RUNS = 5
+TOLERANCE = 1.25
+MUST_STAY_LAZY = ["groq", "requests", "numpy"]
+
+
+def measure_once() -> dict:
+    """Return {module: (self_us, cumulative_us)} for one cold `import app`."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=ENGINE_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main():
+    runs = sorted((measure_once() for _ in range(RUNS)), key=lambda r: r["app"][1])
+    modules = runs[len(runs) // 2]
+    median_ms = modules["app"][1] / 1000
+    eager = [m for m in MUST_STAY_LAZY if m in modules]
+
+    print(f"import app: median {median_ms:.1f} ms over {RUNS} runs")
+    print("slowest top-level imports (cumulative):")
+    top = sorted(((v[1], k) for k, v in modules.items() if "." not in k), reverse=True)
+    for cumulative_us, name in top[:10]:
+        print(f"  {name:<30} {cumulative_us / 1000:8.1f} ms")
+
+    if "--update" in sys.argv:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({"import_app_ms": round(median_ms, 1), "must_stay_lazy": MUST_STAY_LAZY}, f, indent=2)
+            f.write("\n")
+        print(f"baseline written to {BASELINE_PATH}")
+        return 0
+
+    failed = False
+    if eager:
+        print(f"REGRESSION: imported eagerly: {', '.join(eager)}")
+        failed = True
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)["import_app_ms"]
+        print(f"baseline: {baseline:.1f} ms (tolerance x{TOLERANCE})")
+        if median_ms > baseline * TOLERANCE:
+            print("REGRESSION: import time above baseline tolerance")
+            failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+RESPONSE CACHE
+- Purpose: Keeps recently served /api/scrape and /api/analyze answers in memory.
+- Entries are the already-encoded JSON bytes, so a cache hit is written straight
+  to the socket without rebuilding or re-serializing the result dict.
+- TTLs and size are configurable through the environment.
+- Scraper results are cached through the same layer with @cached; with
+  CACHE_BACKEND=shm every cache lives in shared memory (shm_cache.py) and is
+  shared by all worker processes on the host.
+"""
+
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from serialization import dumps, loads
+
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+SCRAPE_CACHE_TTL = float(os.getenv("SCRAPE_CACHE_TTL", "60"))
+ANALYZE_CACHE_TTL = float(os.getenv("ANALYZE_CACHE_TTL", "300"))
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+
+
+class _Flight:
+    """A fetch in progress; concurrent callers for its key wait on it."""
+    __slots__ = ("done", "value")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache with a per-entry time-to-live."""
+
+    def __init__(self, ttl: float, max_entries: int = CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> _Flight, only while its fetch runs
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None if missing or expired."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl: float = None):
+        """Store value under key; evicts the least recently used entry when full."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_or_fetch(self, key, fetch, ttl: float = None, wait: float = 15.0):
+        """
+        Return the cached value, or call fetch() once for concurrent callers
+        of the same key; they wait up to `wait` seconds for its result, while
+        other keys fetch independently. fetch() returns (value, cacheable).
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] >= time.monotonic():
+                return entry[1]  # landed since the miss above
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = _Flight()
+        if not owner:
+            # Share the first caller's answer, cacheable or not; fetch alone if it timed out or raised
+            if flight.done.wait(wait) and flight.value is not None:
+                return flight.value
+            return self._fetch(key, fetch, ttl)
+        try:
+            flight.value = self._fetch(key, fetch, ttl)
+            return flight.value
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _fetch(self, key, fetch, ttl):
+        value, cacheable = fetch()
+        if cacheable:
+            self.set(key, value, ttl)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+
+_registry = []
+
+
+def make_cache(prefix: str, ttl: float):
+    """Build a cache on the configured backend and register it for clear_all()."""
+    if CACHE_BACKEND == "shm":
+        from shm_cache import SharedMemoryCache
+        c = SharedMemoryCache(ttl, prefix=f"{prefix}:")
+    else:
+        c = TTLCache(ttl)
+    _registry.append(c)
+    return c
+
+
+def _has_error(result) -> bool:
+    if isinstance(result, dict):
+        return "error" in result
+    if isinstance(result, list):
+        return any(isinstance(r, dict) and "error" in r for r in result)
+    return False
+
+
+def cached(prefix: str, ttl: float, is_error=_has_error):
+    """
+    Cache a scraper's result (encoded as JSON bytes) keyed by its arguments.
+    Concurrent misses for the same key trigger a single upstream fetch;
+    results for which is_error() is true are returned but not stored.
+    """
+    def decorator(fn):
+        store = make_cache(prefix, ttl)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = dumps([args, sorted(kwargs.items())])
+
+            def fetch():
+                result = fn(*args, **kwargs)
+                return dumps(result), not is_error(result)
+
+            return loads(store.get_or_fetch(key, fetch))
+
+        wrapper.cache = store
+        return wrapper
+    return decorator
+
+
+scrape_cache = make_cache("scrape", SCRAPE_CACHE_TTL)
+analyze_cache = make_cache("analyze", ANALYZE_CACHE_TTL)
+
+
+def clear_all():
+    """Drop every cached response and scraper result (tests and admin tooling)."""
+    for c in _registry:
+        c.clear()
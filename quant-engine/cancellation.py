@@ -0,0 +1,180 @@
+"""
+REQUEST CANCELLATION
+- Purpose: Stops work for /api/analyze requests nobody is waiting for any
+  more, so abandoned requests stop spending upstream quota, Groq tokens and
+  worker threads (most valuable during spikes, when clients give up most).
+- A CancelToken is created per request with a deadline (ANALYZE_DEADLINE).
+  run_cancellable() runs the blocking pipeline in the threadpool and polls the
+  client connection; a disconnect ("client_closed") or an expired deadline
+  cancels the token and the endpoint returns at once. The worker thread
+  keeps running until its next cancellation check, so its on_exit callback
+  (the admission release) runs only when the thread is really done.
+- The token travels with the request's context (contextvars), so it reaches
+  the source futures and the scrapers. Waits on source futures wake up on
+  cancellation, queued futures are dropped, upstream HTTP calls and the Groq
+  call are skipped, and a streaming completion is closed mid-stream.
+- Cancelled derives from BaseException, like asyncio.CancelledError, so the
+  scrapers' blanket `except Exception` handlers don't turn it into an error
+  result that could be cached.
+- Counters of cancelled requests and skipped work are exported via stats().
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from starlette.concurrency import run_in_threadpool
+
+ANALYZE_DEADLINE = float(os.getenv("ANALYZE_DEADLINE", "30"))
+DISCONNECT_POLL_S = float(os.getenv("DISCONNECT_POLL_S", "0.25"))
+
+_counters = {
+    "client_closed": 0,  # requests cancelled because the client went away
+    "deadline": 0,  # requests cancelled because they ran out of time
+    "futures_cancelled": 0,  # source calls dropped before they started
+    "upstream_skipped": 0,  # upstream HTTP calls not made
+    "llm_skipped": 0,  # Groq calls not made
+    "llm_streams_closed": 0,  # streamed completions closed early
+}
+_lock = threading.Lock()
+
+
+class Cancelled(BaseException):
+    """The request this work belongs to was cancelled."""
+
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+def count(name: str, n: int = 1):
+    if n:
+        with _lock:
+            _counters[name] += n
+
+
+class CancelToken:
+    """Cancellation signal and deadline shared by all work for one request."""
+
+    def __init__(self, deadline_s: float = None):
+        self.deadline = time.monotonic() + deadline_s if deadline_s else None
+        self.reason = None
+        self._signal = concurrent.futures.Future()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._signal.done()
+
+    def cancel(self, reason: str) -> bool:
+        """Cancel once; later calls (and their reasons) are ignored."""
+        with _lock:
+            if self._signal.done():
+                return False
+            self.reason = reason
+            self._signal.set_result(reason)
+            if reason in _counters:
+                _counters[reason] += 1
+        return True
+
+    def remaining(self):
+        """Seconds until the deadline, or None without one."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def check(self):
+        """Raise Cancelled if the token was cancelled or its deadline passed."""
+        if not self.cancelled and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.cancel("deadline")
+        if self.cancelled:
+            raise Cancelled(self.reason)
+
+    def wait(self, future, timeout: float = None):
+        """
+        future.result(timeout), but wakes up and raises Cancelled as soon as
+        the token is cancelled; never waits past the deadline.
+        """
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        concurrent.futures.wait([future, self._signal], timeout=timeout,
+                                return_when=concurrent.futures.FIRST_COMPLETED)
+        if future.done():
+            return future.result()
+        self.check()
+        raise concurrent.futures.TimeoutError()
+
+
+_NEVER = CancelToken()
+_current = contextvars.ContextVar("cancel_token", default=_NEVER)
+
+
+def current() -> CancelToken:
+    """The token of the request being served (a never-cancelled one outside requests)."""
+    return _current.get()
+
+
+@contextmanager
+def scope(token: CancelToken):
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def check(skipped: str = None):
+    """Raise Cancelled if the current request is cancelled, counting the skipped work."""
+    token = _current.get()
+    try:
+        token.check()
+    except Cancelled:
+        if skipped:
+            count(skipped)
+        raise
+
+
+async def run_cancellable(request, token: CancelToken, fn, *args, on_exit=None):
+    """
+    Run fn(*args) in the threadpool under token, cancelling it when the client
+    disconnects or the deadline passes. Raises Cancelled without waiting for
+    the worker, which stops at its next cancellation check. on_exit() is
+    called from the worker thread once fn has returned or raised.
+    """
+    def run():
+        try:
+            with scope(token):
+                return fn(*args)
+        finally:
+            if on_exit is not None:
+                on_exit()
+
+    task = asyncio.ensure_future(run_in_threadpool(run))
+    while not token.cancelled:
+        done, _ = await asyncio.wait({task}, timeout=DISCONNECT_POLL_S)
+        if done:
+            return task.result()
+        if request is not None and await request.is_disconnected():
+            token.cancel("client_closed")
+        else:
+            remaining = token.remaining()
+            if remaining is not None and remaining <= 0:
+                token.cancel("deadline")
+    # The worker raises Cancelled (or finishes) on its own; don't log it as unretrieved
+    task.add_done_callback(lambda t: t.cancelled() or t.exception())
+    raise Cancelled(token.reason)
+
+
+def stats() -> dict:
+    with _lock:
+        return dict(_counters)
+
+
+def reset():
+    with _lock:
+        for name in _counters:
+            _counters[name] = 0
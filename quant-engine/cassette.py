@@ -0,0 +1,285 @@
+"""
+UPSTREAM RECORD / REPLAY
+- Purpose: Captures real upstream traffic (Finnhub, Polymarket, Wikipedia,
+  Groq) once and serves it back later, so performance runs and regression
+  tests are reproducible without network access or API keys.
+- CASSETTE_MODE=record writes every upstream call made through
+  scraping/http.py and scoring.py; CASSETTE_MODE=replay answers those calls
+  from the cassette. CASSETTE_LATENCY=original replays with the recorded
+  timing (including per-chunk timing of streamed completions); "instant"
+  replays with no delay.
+- A cassette is two append-only files:
+    <path>.dat  zlib-compressed records: JSON header + raw response body
+    <path>.idx  fixed 28-byte entries: request digest, offset, length
+  The index is loaded into a dict on open, so a lookup is O(1) however many
+  calls were recorded. Repeated identical requests replay in recorded order.
+- Secrets (API tokens) are left out of request keys and never written.
+- Time-window params (TIME_PARAMS, e.g. Finnhub's from/to as dates or epoch
+  seconds) are keyed relative to the current day ("now-7d"), so a cassette
+  recorded on one day replays on any other.
+"""
+
+import hashlib
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+from lazy import lazy_import
+from serialization import dumps, loads
+
+requests = lazy_import("requests")
+
+CASSETTE_MODE = os.getenv("CASSETTE_MODE", "off")
+CASSETTE_PATH = os.getenv("CASSETTE_PATH", "cassettes/upstream")
+CASSETTE_LATENCY = os.getenv("CASSETTE_LATENCY", "original")
+SECRET_PARAMS = {"token", "api_key", "apikey", "key"}
+TIME_PARAMS = {"from", "to", "since", "start", "end"}
+DAY = 86400
+KEPT_HEADERS = ("content-type", "retry-after", "etag", "last-modified", "cache-control", "age", "date")
+
+_INDEX_ENTRY = struct.Struct("<16sQI")
+_HEADER_LEN = struct.Struct("<I")
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_EPOCH_RE = re.compile(r"^\d{9,10}$")
+
+
+class CassetteMiss(Exception):
+    """Replay mode got a request that was never recorded."""
+
+
+def digest(key: str) -> bytes:
+    return hashlib.blake2b(key.encode(), digest_size=16).digest()
+
+
+def relative_time(value) -> str:
+    """A date or epoch-seconds param as whole days before now ("now-7d"); other values unchanged."""
+    text = str(value)
+    now = time.time()
+    if _DATE_RE.match(text):
+        days = (datetime.fromtimestamp(now).date() - datetime.strptime(text, "%Y-%m-%d").date()).days
+    elif _EPOCH_RE.match(text):
+        days = round((now - int(text)) / DAY)
+    else:
+        return text
+    return f"now-{days}d"
+
+
+def http_key(method: str, url: str, params: dict = None, relative: bool = False) -> str:
+    """
+    Request identity: method, URL and sorted non-secret params. relative=True
+    keys TIME_PARAMS by their distance from today (for cassettes).
+    """
+    clean = sorted(
+        (k, relative_time(v) if relative and k.lower() in TIME_PARAMS else str(v))
+        for k, v in (params or {}).items() if k.lower() not in SECRET_PARAMS
+    )
+    return f"{method} {url}?{urlencode(clean)}"
+
+
+def completion_key(kwargs: dict) -> str:
+    # The request timeout varies with the caller's deadline, not the answer
+    return "groq " + dumps({k: v for k, v in kwargs.items() if k != "timeout"}).decode()
+
+
+class Cassette:
+    """One pair of .dat/.idx files opened for record or replay."""
+
+    def __init__(self, path: str, mode: str, latency: str = CASSETTE_LATENCY):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.realtime = latency == "original"
+        self._lock = threading.Lock()
+        self._index = {}
+        self._cursor = {}
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        if mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._dat = open(path + ".dat", "ab")
+            self._idx = open(path + ".idx", "ab")
+        else:
+            self._fd = os.open(path + ".dat", os.O_RDONLY)
+            self._load_index()
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _load_index(self):
+        with open(self.path + ".idx", "rb") as f:
+            data = f.read()
+        usable = len(data) - len(data) % _INDEX_ENTRY.size  # ignore a torn last entry
+        for key, offset, length in _INDEX_ENTRY.iter_unpack(data[:usable]):
+            self._index.setdefault(key, []).append((offset, length))
+
+    def __len__(self):
+        return sum(len(v) for v in self._index.values())
+
+    # -- record -------------------------------------------------------------
+
+    def record(self, key: str, header: dict, body: bytes = b""):
+        head = dumps(header)
+        blob = zlib.compress(_HEADER_LEN.pack(len(head)) + head + body)
+        with self._lock:
+            offset = self._dat.tell()
+            self._dat.write(blob)
+            self._dat.flush()
+            self._idx.write(_INDEX_ENTRY.pack(digest(key), offset, len(blob)))
+            self._idx.flush()
+            self._index.setdefault(digest(key), []).append((offset, len(blob)))
+            self.recorded += 1
+
+    # -- replay -------------------------------------------------------------
+
+    def lookup(self, key: str):
+        """(header, body) of the next recording of key; raises CassetteMiss."""
+        d = digest(key)
+        with self._lock:
+            entries = self._index.get(d)
+            if not entries:
+                self.misses += 1
+                raise CassetteMiss(f"No recording for {key[:200]}")
+            i = self._cursor.get(d, 0)
+            self._cursor[d] = i + 1
+            self.replayed += 1
+        offset, length = entries[min(i, len(entries) - 1)]
+        raw = zlib.decompress(os.pread(self._fd, length, offset))
+        (n,) = _HEADER_LEN.unpack_from(raw)
+        return loads(raw[_HEADER_LEN.size:_HEADER_LEN.size + n]), raw[_HEADER_LEN.size + n:]
+
+    def wait(self, seconds: float):
+        if self.realtime and seconds > 0:
+            time.sleep(seconds)
+
+    def close(self):
+        if self.mode == "record":
+            self._dat.close()
+            self._idx.close()
+        else:
+            os.close(self._fd)
+
+    def stats(self) -> dict:
+        return {"path": self.path, "mode": self.mode, "realtime": self.realtime,
+                "entries": len(self), "recorded": self.recorded,
+                "replayed": self.replayed, "misses": self.misses}
+
+
+class ReplayResponse:
+    """The parts of requests.Response the scrapers use."""
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.headers = requests.structures.CaseInsensitiveDict(headers)
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return loads(self.content)
+
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+
+_active = None
+
+
+def active():
+    """The cassette in use, or None when recording/replay is off."""
+    return _active
+
+
+def activate(cassette):
+    """Switch the active cassette (None to turn off); returns the previous one."""
+    global _active
+    previous, _active = _active, cassette
+    return previous
+
+
+def http_get(url: str, params: dict = None, timeout: float = 10, headers: dict = None):
+    """requests.get, recorded or replayed when a cassette is active."""
+    cassette = _active
+    if cassette is None:
+        return requests.get(url, params=params, timeout=timeout, headers=headers)
+    key = http_key("GET", url, params, relative=True)
+    if cassette.replaying:
+        header, body = cassette.lookup(key)
+        cassette.wait(header["e"])
+        return ReplayResponse(url, header["s"], header["h"], body)
+
+    start = time.monotonic()
+    resp = requests.get(url, params=params, timeout=timeout, headers=headers)
+    kept = {k: v for k, v in resp.headers.items() if k.lower() in KEPT_HEADERS}
+    cassette.record(key, {"e": round(time.monotonic() - start, 4), "s": resp.status_code,
+                          "h": kept}, resp.content)
+    return resp
+
+
+def _completion(content: str):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _replay_stream(cassette, header: dict):
+    last = 0.0
+    for offset, text in header["c"]:
+        cassette.wait(offset - last)
+        last = offset
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+def _record_stream(cassette, key: str, stream, start: float):
+    chunks = []
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            chunks.append([round(time.monotonic() - start, 4), delta or ""])
+            yield chunk
+    finally:
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+        cassette.record(key, {"e": round(time.monotonic() - start, 4), "c": chunks})
+
+
+def create_completion(client_factory, **kwargs):
+    """chat.completions.create, recorded or replayed when a cassette is active."""
+    cassette = _active
+    if cassette is None:
+        return client_factory().chat.completions.create(**kwargs)
+    key = completion_key(kwargs)
+    if cassette.replaying:
+        header, body = cassette.lookup(key)
+        if "c" in header:
+            return _replay_stream(cassette, header)
+        cassette.wait(header["e"])
+        return _completion(body.decode())
+
+    start = time.monotonic()
+    response = client_factory().chat.completions.create(**kwargs)
+    if kwargs.get("stream"):
+        return _record_stream(cassette, key, response, start)
+    content = response.choices[0].message.content or ""
+    cassette.record(key, {"e": round(time.monotonic() - start, 4)}, content.encode())
+    return response
+
+
+if CASSETTE_MODE != "off":
+    activate(Cassette(CASSETTE_PATH, CASSETTE_MODE))
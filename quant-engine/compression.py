@@ -0,0 +1,125 @@
+"""
+RESPONSE COMPRESSION & CONDITIONAL GET
+- Purpose: Shrinks large cached JSON answers on the wire and lets clients
+  (and the Cloudflare Worker) revalidate them instead of downloading again.
+- Strong ETags are a hash of the encoded body, so the same data always gets
+  the same tag. If-None-Match with a matching tag gets a 304 with no body.
+- Bodies of at least COMPRESS_MIN_BYTES are sent brotli- or gzip-encoded,
+  following the client's Accept-Encoding q-values. Compressed variants are
+  memoized by ETag, so a cache hit is never compressed twice.
+- brotli is optional: without the package, only gzip is offered.
+"""
+
+import gzip
+import hashlib
+import importlib.util
+import os
+import threading
+from collections import OrderedDict
+
+from lazy import lazy_import
+from serialization import encoded_response
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "5"))
+COMPRESS_CACHE_ENTRIES = int(os.getenv("COMPRESS_CACHE_ENTRIES", "512"))
+
+HAS_BROTLI = importlib.util.find_spec("brotli") is not None
+brotli = lazy_import("brotli") if HAS_BROTLI else None
+
+# Preferred first when the client rates them equally
+ENCODINGS = ("br", "gzip") if HAS_BROTLI else ("gzip",)
+
+_variants = OrderedDict()
+_lock = threading.Lock()
+
+
+def etag(body: bytes) -> str:
+    """Strong validator for an encoded body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def compressed(body: bytes, encoding: str, tag: str = None) -> bytes:
+    """body in `encoding`, memoized by (ETag, encoding)."""
+    key = (tag or etag(body), encoding)
+    with _lock:
+        data = _variants.get(key)
+        if data is not None:
+            _variants.move_to_end(key)
+            return data
+    data = _compress(body, encoding)
+    with _lock:
+        _variants[key] = data
+        while len(_variants) > COMPRESS_CACHE_ENTRIES:
+            _variants.popitem(last=False)
+    return data
+
+
+def negotiate(accept_encoding: str):
+    """Best supported content-coding for an Accept-Encoding header, or None."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name.strip().lower()] = q
+    star = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = weights.get(encoding, star)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _matches(if_none_match: str, tag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = tag.strip('"')
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        # Also accept our per-encoding variants ("<hash>-gzip")
+        if candidate.strip('"').split("-", 1)[0] == opaque:
+            return True
+    return False
+
+
+def conditional_response(request, body: bytes, headers: dict = None):
+    """
+    Response for an encoded JSON body honoring If-None-Match and
+    Accept-Encoding. Compressed variants carry their own ETag suffix.
+    """
+    tag = etag(body)
+    encoding = negotiate(request.headers.get("accept-encoding")) if len(body) >= COMPRESS_MIN_BYTES else None
+    headers = dict(headers or {})
+    headers["Vary"] = "Accept-Encoding"
+    headers["ETag"] = f'{tag[:-1]}-{encoding}"' if encoding else tag
+    if _matches(request.headers.get("if-none-match"), tag):
+        return encoded_response(b"", status_code=304, headers=headers)
+    if encoding is None:
+        return encoded_response(body, headers=headers)
+    headers["Content-Encoding"] = encoding
+    return encoded_response(compressed(body, encoding, tag), headers=headers)
+
+
+def clear():
+    with _lock:
+        _variants.clear()
@@ -0,0 +1,108 @@
+"""
+NEAR-DUPLICATE FILTER
+- Purpose: Collapses syndicated news stories and overlapping Wikipedia
+  paragraphs before they are sent to the LLM, so we stop paying for the same
+  text several times.
+- MinHash over word 2-gram shingles: signatures for a whole batch of texts are
+  computed in one NumPy pass (one hash-permutation matrix, min-reduced per
+  text), then pairwise similarities come from a single broadcast comparison.
+- Texts are kept greedily in order, so callers' ranking (recency, relevance)
+  decides which copy of a duplicate survives.
+"""
+
+import os
+import re
+import zlib
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.5"))
+NUM_PERM = 64
+SHINGLE_SIZE = 2
+_PRIME = 4294967311  # smallest prime above 2**32
+_SEED = 1337
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_perms = None
+
+
+def _permutations():
+    """Fixed (a, b) hash-permutation coefficients, created on first use."""
+    global _perms
+    if _perms is None:
+        rng = np.random.default_rng(_SEED)
+        a = rng.integers(1, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+        b = rng.integers(0, 2**32 - 1, size=NUM_PERM, dtype=np.uint64)
+        _perms = (a, b)
+    return _perms
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> set:
+    """Lower-cased word n-grams; short texts fall back to their single tokens."""
+    tokens = _TOKEN_RE.findall((text or "").lower())
+    if len(tokens) < size:
+        return set(tokens)
+    return {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+
+
+def signatures(texts: list):
+    """MinHash signature matrix (len(texts) x NUM_PERM) for all texts at once."""
+    a, b = _permutations()
+    hashes, offsets = [], []
+    for text in texts:
+        offsets.append(len(hashes))
+        # Empty texts get one sentinel shingle so every row has a minimum
+        hashes.extend(zlib.crc32(s.encode()) for s in (shingles(text) or {""}))
+    h = np.asarray(hashes, dtype=np.uint64)
+    # (NUM_PERM x total_shingles); a*h + b < 2**64 since a, b, h < 2**32
+    permuted = (a[:, None] * h[None, :] + b[:, None]) % np.uint64(_PRIME)
+    return np.minimum.reduceat(permuted, np.asarray(offsets), axis=1).T
+
+
+def similarity_matrix(texts: list):
+    """Estimated pairwise Jaccard similarity of the texts' shingle sets."""
+    sig = signatures(texts)
+    return (sig[:, None, :] == sig[None, :, :]).mean(axis=-1)
+
+
+def unique_indices(texts: list, threshold: float = None, limit: int = None) -> list:
+    """Indices of texts kept after dropping near-duplicates of earlier ones."""
+    threshold = DEDUP_THRESHOLD if threshold is None else threshold
+    if len(texts) < 2:
+        return list(range(len(texts)))[:limit]
+    sim = similarity_matrix(texts)
+    kept = []
+    for i in range(len(texts)):
+        if kept and sim[i, kept].max() >= threshold:
+            continue
+        kept.append(i)
+        if limit is not None and len(kept) >= limit:
+            break
+    return kept
+
+
+def dedupe(items: list, key=lambda x: x, threshold: float = None, limit: int = None) -> list:
+    """Items with near-duplicates (compared on key(item)) removed, order preserved."""
+    keep = unique_indices([key(item) for item in items], threshold, limit)
+    return [items[i] for i in keep]
+
+
+def dedupe_paragraphs(blocks: list, threshold: float = None) -> list:
+    """
+    Remove paragraphs that repeat earlier ones across several text blocks
+    (e.g. overlapping Wikipedia intros). Returns the blocks with their
+    surviving paragraphs; blocks left empty become "".
+    """
+    owners, paragraphs = [], []
+    for b, block in enumerate(blocks):
+        for para in (block or "").split("\n"):
+            if para.strip():
+                owners.append(b)
+                paragraphs.append(para)
+    keep = set(unique_indices(paragraphs, threshold))
+    out = [[] for _ in blocks]
+    for i, (b, para) in enumerate(zip(owners, paragraphs)):
+        if i in keep:
+            out[b].append(para)
+    return ["\n".join(paras) for paras in out]
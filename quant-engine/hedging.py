@@ -0,0 +1,188 @@
+"""
+HEDGED LLM CALLS
+- Purpose: Bounds /api/analyze latency against Groq's tail: a completion that
+  usually takes ~1s sometimes takes several, and until now the request simply
+  waited (or returned an error dict when the call failed).
+- LLM_HEDGE_MODE:
+    off      - one LLM call, waited for as before (default)
+    fallback - if no valid answer arrives within LLM_FALLBACK_AFTER seconds,
+               or the call fails, answer with the local pre-score
+               (prescore.py) flagged "fallback"
+    hedge    - as fallback, and once the first call is slower than the
+               LLM_HEDGE_PERCENTILE of recent LLM latency, fire a second
+               request (GROQ_HEDGE_API_KEY / GROQ_HEDGE_MODEL) and take the
+               first valid answer of the two
+- The hedge delay comes from a LatencySketch (latency.py) of successful
+  completions; until it has TIMEOUT_MIN_SAMPLES it is LLM_HEDGE_DELAY.
+  A primary call that fails outright is hedged immediately.
+- A non-streamed completion can't be recalled, so an abandoned call finishes
+  in the background; its latency still feeds the sketch. Every call carries a
+  Groq request timeout equal to the time left before the fallback, so an
+  abandoned call frees its thread at about the same moment. The pool
+  (LLM_HEDGE_WORKERS, default two calls per analyze admission slot) is sized
+  so that calls of admitted requests never queue behind abandoned ones;
+  stats() reports calls still running after their request moved on.
+"""
+
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+
+import admission
+import cancellation
+import latency
+import scoring
+
+LLM_HEDGE_MODE = os.getenv("LLM_HEDGE_MODE", "off")
+LLM_FALLBACK_AFTER = float(os.getenv("LLM_FALLBACK_AFTER", "4"))
+LLM_HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "1.5"))
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+# A primary and a hedge for every request analyze admission lets in at once
+LLM_HEDGE_WORKERS = int(os.getenv("LLM_HEDGE_WORKERS", "0")) or 2 * admission.analyze_admission.max_concurrent
+# Longest stretch between cancellation checks while waiting on the LLM
+_POLL_S = 0.25
+
+
+class LLMHedge:
+    """Races LLM calls against a deadline and each other; falls back to a local score."""
+
+    def __init__(self, mode: str = LLM_HEDGE_MODE, fallback_after: float = LLM_FALLBACK_AFTER,
+                 hedge_delay: float = LLM_HEDGE_DELAY, percentile: float = LLM_HEDGE_PERCENTILE):
+        self.mode = mode
+        self.fallback_after = fallback_after
+        self.default_delay = hedge_delay
+        self.percentile = percentile
+        self._sketch = latency.LatencySketch()
+        self._lock = threading.Lock()
+        self.workers = LLM_HEDGE_WORKERS
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="llm-hedge")
+        self._counters = {}
+        self._running = 0
+        self._abandoned = set()
+        self.reset()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode in ("fallback", "hedge")
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the first call before sending the hedge."""
+        with self._lock:
+            if self._sketch.samples < latency.TIMEOUT_MIN_SAMPLES:
+                return min(self.default_delay, self.fallback_after)
+            return min(self._sketch.quantile(self.percentile), self.fallback_after)
+
+    def answer(self, question: str, context: str, fallback) -> dict:
+        """
+        The first valid LLM answer, or fallback() flagged "fallback" when none
+        arrives within fallback_after seconds. fallback: () -> answer dict.
+        """
+        self._count("calls")
+        token = cancellation.current()
+        deadline = time.monotonic() + self.fallback_after
+        hedge_at = time.monotonic() + self.hedge_delay() if self.mode == "hedge" else None
+        pending = {self._call(question, context, False, deadline): "primary"}
+        errors = []
+        try:
+            while True:
+                now = time.monotonic()
+                if hedge_at is not None and (now >= hedge_at or not pending):
+                    hedge_at = None
+                    self._count("hedges")
+                    pending[self._call(question, context, True, deadline)] = "hedge"
+                if not pending or now >= deadline:
+                    break
+                wake = deadline if hedge_at is None else min(deadline, hedge_at)
+                done, _ = concurrent.futures.wait(list(pending), timeout=min(wake - now, _POLL_S),
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                token.check()
+                for future in done:
+                    source = pending.pop(future)
+                    result = future.result()
+                    if "error" not in result:
+                        self._count(f"{source}_wins")
+                        if source == "hedge":
+                            result["hedged"] = True
+                        return result
+                    errors.append(result["error"])
+        finally:
+            self._abandon(pending)
+
+        reason = "timeout" if pending else "error"
+        self._count(f"fallback_{reason}")
+        result = fallback()
+        result["fallback"] = True
+        result["fallback_reason"] = reason
+        if errors:
+            result["llm_errors"] = errors
+        return result
+
+    def _call(self, question: str, context: str, hedge: bool, deadline: float):
+        # Carries the request's cancel token, so an abandoned stream still closes on cancel
+        return self._executor.submit(contextvars.copy_context().run, self._timed, question, context, hedge,
+                                     deadline)
+
+    def _timed(self, question: str, context: str, hedge: bool, deadline: float) -> dict:
+        start = time.monotonic()
+        with self._lock:
+            self._running += 1
+        try:
+            # Nobody reads the answer after the deadline, so don't hold a thread for it
+            result = scoring.get_trade_confidence(question, context, hedge=hedge,
+                                                  timeout=max(deadline - start, _POLL_S))
+        finally:
+            with self._lock:
+                self._running -= 1
+        if "error" not in result:
+            with self._lock:
+                self._sketch.observe(time.monotonic() - start)
+        return result
+
+    def _abandon(self, futures):
+        """Track calls still running after their request stopped waiting on them."""
+        futures = [f for f in futures if not f.done()]
+        if not futures:
+            return
+        with self._lock:
+            self._counters["abandoned"] += len(futures)
+            self._abandoned.update(futures)
+        for future in futures:
+            future.add_done_callback(self._discard)
+
+    def _discard(self, future):
+        with self._lock:
+            self._abandoned.discard(future)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def reset(self):
+        with self._lock:
+            self._sketch = latency.LatencySketch()
+            self._counters = {name: 0 for name in (
+                "calls", "hedges", "primary_wins", "hedge_wins", "fallback_timeout", "fallback_error",
+                "abandoned")}
+
+    def stats(self) -> dict:
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "fallback_after_s": self.fallback_after,
+                "hedge_delay_s": round(delay, 3),
+                "hedge_model": scoring.GROQ_HEDGE_MODEL,
+                "workers": self.workers,
+                "llm_running": self._running,
+                "abandoned_running": len(self._abandoned),
+                "llm_samples": self._sketch.samples,
+                "llm_p50_s": round(self._sketch.quantile(0.5), 3),
+                "llm_p99_s": round(self._sketch.quantile(0.99), 3),
+                **self._counters,
+            }
+
+
+llm_hedge = LLMHedge()
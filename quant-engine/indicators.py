@@ -0,0 +1,197 @@
+"""
+TECHNICAL INDICATORS
+- Purpose: Computes RSI, MACD, Bollinger bands, ATR and VWAP from Finnhub
+  candles, so technicals no longer cost extra rate-limited upstream calls.
+- Every indicator is computed over the whole price array at once with NumPy
+  (no per-bar Python loops); inputs may also be 2-D (one row per series).
+- summarize() / format_summary() turn the latest values into the compact
+  block that /api/technicals returns and /api/analyze adds to the LLM context.
+"""
+
+import math
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# Keep the per-block rescaling factor of the vectorized EMA below 1e100
+_EMA_MAX_SCALE_LOG = 100 * math.log(10)
+
+
+def ema(values, span: int = None, alpha: float = None):
+    """
+    Exponential moving average along the last axis, seeded with the first value.
+    Evaluated block-wise in closed form: within a block the recurrence
+    e[t] = a*x[t] + (1-a)*e[t-1] becomes a scaled cumulative sum.
+    """
+    x = np.asarray(values, dtype=float)
+    if alpha is None:
+        alpha = 2.0 / (span + 1)
+    decay = 1.0 - alpha
+    n = x.shape[-1]
+    out = np.empty_like(x)
+    if n == 0:
+        return out
+    if decay == 0.0:
+        out[...] = x
+        return out
+
+    block = max(1, int(_EMA_MAX_SCALE_LOG / -math.log(decay)))
+    carry = x[..., 0]
+    start = 0
+    while start < n:
+        chunk = x[..., start:start + block]
+        k = np.arange(chunk.shape[-1])
+        grow = decay ** -k.astype(float)          # (1-a)^-k
+        shrink = decay ** (k + 1).astype(float)   # (1-a)^(k+1)
+        weighted = np.cumsum(chunk * grow, axis=-1)
+        out[..., start:start + block] = (
+            shrink * carry[..., None] + alpha * weighted * shrink / decay
+        )
+        carry = out[..., start + chunk.shape[-1] - 1]
+        start += block
+    return out
+
+
+def sma(values, period: int):
+    """Simple moving average along the last axis; first period-1 values are NaN."""
+    x = np.asarray(values, dtype=float)
+    out = np.full_like(x, np.nan)
+    if x.shape[-1] < period:
+        return out
+    csum = np.cumsum(x, axis=-1)
+    out[..., period - 1] = csum[..., period - 1]
+    out[..., period:] = csum[..., period:] - csum[..., :-period]
+    out[..., period - 1:] /= period
+    return out
+
+
+def rolling_std(values, period: int):
+    """Population standard deviation over a trailing window."""
+    x = np.asarray(values, dtype=float)
+    mean = sma(x, period)
+    mean_sq = sma(x * x, period)
+    return np.sqrt(np.maximum(mean_sq - mean * mean, 0.0))
+
+
+def rsi(close, period: int = 14):
+    """Relative Strength Index with Wilder smoothing (alpha = 1/period)."""
+    c = np.asarray(close, dtype=float)
+    out = np.full_like(c, np.nan)
+    if c.shape[-1] <= period:
+        return out
+    delta = np.diff(c, axis=-1)
+    gain = np.maximum(delta, 0.0)
+    loss = np.maximum(-delta, 0.0)
+    # Seed with the simple average of the first `period` moves, as Wilder does
+    gain[..., period - 1] = gain[..., :period].mean(axis=-1)
+    loss[..., period - 1] = loss[..., :period].mean(axis=-1)
+    avg_gain = ema(gain[..., period - 1:], alpha=1.0 / period)
+    avg_loss = ema(loss[..., period - 1:], alpha=1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = avg_gain / avg_loss
+        value = 100.0 - 100.0 / (1.0 + rs)
+    value = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), value)
+    out[..., period:] = value
+    return out
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9):
+    """Return (macd_line, signal_line, histogram)."""
+    c = np.asarray(close, dtype=float)
+    line = ema(c, fast) - ema(c, slow)
+    sig = ema(line, signal)
+    return line, sig, line - sig
+
+
+def bollinger(close, period: int = 20, k: float = 2.0):
+    """Return (upper, middle, lower) Bollinger bands."""
+    middle = sma(close, period)
+    width = k * rolling_std(close, period)
+    return middle + width, middle, middle - width
+
+
+def atr(high, low, close, period: int = 14):
+    """Average True Range with Wilder smoothing."""
+    h = np.asarray(high, dtype=float)
+    l = np.asarray(low, dtype=float)
+    c = np.asarray(close, dtype=float)
+    prev_close = np.concatenate([c[..., :1], c[..., :-1]], axis=-1)
+    true_range = np.maximum(h - l, np.maximum(np.abs(h - prev_close), np.abs(l - prev_close)))
+    out = np.full_like(c, np.nan)
+    if c.shape[-1] < period:
+        return out
+    seeded = true_range[..., period - 1:].copy()
+    seeded[..., 0] = true_range[..., :period].mean(axis=-1)
+    out[..., period - 1:] = ema(seeded, alpha=1.0 / period)
+    return out
+
+
+def vwap(high, low, close, volume):
+    """Cumulative volume-weighted average price using the typical price."""
+    typical = (np.asarray(high, dtype=float) + np.asarray(low, dtype=float)
+               + np.asarray(close, dtype=float)) / 3.0
+    v = np.asarray(volume, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.cumsum(typical * v, axis=-1) / np.cumsum(v, axis=-1)
+
+
+def _last(series):
+    value = float(series[-1]) if len(series) else float("nan")
+    return None if math.isnan(value) else round(value, 4)
+
+
+def summarize(candles: dict, windows: list = None) -> dict:
+    """
+    Latest indicator values for one candles dict (as returned by get_candles).
+    `windows` are the look-back periods used for RSI, Bollinger and ATR.
+    """
+    windows = windows or [14]
+    close = np.asarray(candles["c"], dtype=float)
+    high = np.asarray(candles["h"], dtype=float)
+    low = np.asarray(candles["l"], dtype=float)
+    volume = np.asarray(candles["v"], dtype=float)
+
+    macd_line, macd_signal, macd_hist = macd(close)
+    summary = {
+        "close": _last(close),
+        "bars": int(close.shape[-1]),
+        "macd": _last(macd_line),
+        "macd_signal": _last(macd_signal),
+        "macd_hist": _last(macd_hist),
+        "vwap": _last(vwap(high, low, close, volume)),
+    }
+    for w in windows:
+        upper, middle, lower = bollinger(close, w)
+        summary[f"rsi_{w}"] = _last(rsi(close, w))
+        summary[f"atr_{w}"] = _last(atr(high, low, close, w))
+        summary[f"bb_upper_{w}"] = _last(upper)
+        summary[f"bb_middle_{w}"] = _last(middle)
+        summary[f"bb_lower_{w}"] = _last(lower)
+    return summary
+
+
+def format_summary(symbol: str, summary: dict) -> str:
+    """Compact text block of the latest indicators for the LLM context."""
+    parts = [f"Technical Indicators for {symbol.upper()} ({summary.get('bars', 0)} bars):"]
+    close = summary.get("close")
+    windows = sorted(int(k[len("rsi_"):]) for k in summary if k.startswith("rsi_"))
+    for w in windows:
+        if summary.get(f"rsi_{w}") is not None:
+            parts.append(f"  RSI({w}): {summary[f'rsi_{w}']:.1f}")
+    if summary.get("macd") is not None and summary.get("macd_signal") is not None:
+        trend = "bullish" if summary["macd"] > summary["macd_signal"] else "bearish"
+        parts.append(
+            f"  MACD: {summary['macd']:.2f} vs signal {summary['macd_signal']:.2f} ({trend})"
+        )
+    for w in windows:
+        upper, lower = summary.get(f"bb_upper_{w}"), summary.get(f"bb_lower_{w}")
+        if close is not None and upper is not None and lower is not None and upper > lower:
+            pct_b = (close - lower) / (upper - lower)
+            parts.append(f"  Bollinger({w}): {lower:.2f}-{upper:.2f}, %B {pct_b:.2f}")
+        atr_value = summary.get(f"atr_{w}")
+        if close and atr_value is not None:
+            parts.append(f"  ATR({w}): {atr_value:.2f} ({atr_value / close * 100:.1f}% of price)")
+    if summary.get("vwap") is not None:
+        parts.append(f"  VWAP: {summary['vwap']:.2f}")
+    return "\n".join(parts)
@@ -0,0 +1,350 @@
+"""
+ASYNC JOB QUEUE
+- Purpose: Lets clients submit /api/analyze work and collect the answer later,
+  for callers that can't hold a connection for the whole scrape + LLM run and
+  for batches.
+- A job is one or more analyze requests. Jobs wait in an in-process FIFO and
+  are run by JOBS_WORKERS worker threads, each with its own event loop, that
+  call the same pipeline as /api/analyze (caches, admission, planner and
+  cancellation included). The requests of one job run concurrently.
+- Readers can long-poll: wait() parks an asyncio future on the job that the
+  worker resolves when the job finishes, so no thread is held while waiting.
+- With JOBS_DB_PATH set, jobs are also written to SQLite and finished jobs
+  can be fetched after they are dropped from memory (JOBS_RETENTION) or after
+  a restart. Several processes may share the database: a worker claims a
+  queued row with a conditional UPDATE, so each job runs once, and holds a
+  lease (owner = pid, lease_until) that a heartbeat renews every
+  JOBS_LEASE / 3 seconds. Queued jobs are picked up on start; running jobs
+  are re-queued only once their lease has expired, i.e. their owner died.
+- stats() reports queue depth, the age of the oldest queued job, queue-wait
+  times and outcome counts.
+"""
+
+import asyncio
+import collections
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from serialization import dumps, loads
+
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "2"))
+JOBS_MAX_QUEUE = int(os.getenv("JOBS_MAX_QUEUE", "1000"))
+JOBS_MAX_REQUESTS = int(os.getenv("JOBS_MAX_REQUESTS", "20"))
+JOBS_MAX_WAIT = float(os.getenv("JOBS_MAX_WAIT", "30"))
+JOBS_RETENTION = float(os.getenv("JOBS_RETENTION", "3600"))
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "")
+JOBS_LEASE = float(os.getenv("JOBS_LEASE", "60"))
+
+FINISHED = ("done", "failed")
+
+
+class QueueFull(Exception):
+    """The job queue is at JOBS_MAX_QUEUE."""
+
+
+class Job:
+    __slots__ = ("id", "requests", "status", "results", "error",
+                 "created_at", "started_at", "finished_at", "waiters")
+
+    def __init__(self, requests: list, job_id: str = None, created_at: float = None):
+        self.id = job_id or uuid.uuid4().hex
+        self.requests = requests
+        self.status = "queued"
+        self.results = None
+        self.error = None
+        self.created_at = created_at or time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.waiters = []  # (loop, future) of long-polling readers
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    def as_dict(self) -> dict:
+        out = {
+            "id": self.id,
+            "status": self.status,
+            "size": len(self.requests),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.finished:
+            out["results"] = self.results
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+def _wake(fut):
+    if not fut.done():
+        fut.set_result(None)
+
+
+class JobStore:
+    """SQLite persistence for jobs (durable mode)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, status TEXT, requests BLOB,"
+            " results BLOB, error TEXT, created_at REAL, started_at REAL, finished_at REAL,"
+            " owner TEXT, lease_until REAL)")
+        columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("owner", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:  # databases written before leases
+                self._db.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+        self._lock = threading.Lock()
+
+    def save(self, job: Job):
+        """Write a queued or finished job (no lease)."""
+        row = (job.id, job.status, dumps(job.requests),
+               dumps(job.results) if job.results is not None else None,
+               job.error, job.created_at, job.started_at, job.finished_at)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO jobs (id, status, requests, results, error, created_at, started_at,"
+                " finished_at, owner, lease_until) VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, NULL)", row)
+
+    def claim(self, job: Job, owner: str) -> bool:
+        """Mark a queued job running under owner's lease; False if another worker got it first."""
+        with self._lock:
+            cur = self._db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ?, owner = ?, lease_until = ?"
+                " WHERE id = ? AND status = 'queued'",
+                (job.started_at, owner, time.time() + JOBS_LEASE, job.id))
+        return cur.rowcount == 1
+
+    def heartbeat(self, owner: str):
+        """Extend the lease on every job owner is running."""
+        with self._lock:
+            self._db.execute("UPDATE jobs SET lease_until = ? WHERE owner = ? AND status = 'running'",
+                             (time.time() + JOBS_LEASE, owner))
+
+    @staticmethod
+    def _job(row) -> Job:
+        job = Job(loads(row[2]), job_id=row[0], created_at=row[5])
+        job.status = row[1]
+        job.results = loads(row[3]) if row[3] is not None else None
+        job.error, job.started_at, job.finished_at = row[4], row[6], row[7]
+        return job
+
+    def load(self, job_id: str):
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def reclaim(self) -> list:
+        """Reset running jobs whose lease has expired to queued; returns the ones this call reset."""
+        now = time.time()
+        expired = "status = 'running' AND (lease_until IS NULL OR lease_until < ?)"
+        jobs = []
+        with self._lock:
+            for row in self._db.execute(f"SELECT * FROM jobs WHERE {expired}", (now,)).fetchall():
+                cur = self._db.execute(
+                    "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL, lease_until = NULL"
+                    f" WHERE id = ? AND {expired}", (row[0], now))
+                if cur.rowcount == 1:
+                    job = self._job(row)
+                    job.status, job.started_at = "queued", None
+                    jobs.append(job)
+        return jobs
+
+    def unfinished(self) -> list:
+        """Queued jobs, including running ones whose owner's lease expired, oldest first."""
+        self.reclaim()
+        with self._lock:
+            rows = self._db.execute("SELECT * FROM jobs WHERE status = 'queued' ORDER BY created_at").fetchall()
+        return [self._job(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class JobQueue:
+    """In-process FIFO of analyze jobs and the worker threads that run them."""
+
+    def __init__(self, runner, workers: int = JOBS_WORKERS, db_path: str = JOBS_DB_PATH):
+        """runner: async callable taking one request dict and returning its result dict."""
+        self.runner = runner
+        self.workers = workers
+        self._jobs = {}
+        self._queue = collections.deque()
+        self._cond = threading.Condition()
+        self._threads = []
+        self._heartbeat = None
+        self._store = JobStore(db_path) if db_path else None
+        self.owner = f"{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.completed = 0
+        self.failed = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        if self._store is not None:
+            for job in self._store.unfinished():
+                self._jobs[job.id] = job
+                self._queue.append(job.id)
+
+    @property
+    def durable(self) -> bool:
+        return self._store is not None
+
+    # -- clients --------------------------------------------------------------
+
+    def submit(self, requests: list) -> Job:
+        """Queue a job of request dicts; raises QueueFull."""
+        job = Job(requests)
+        with self._cond:
+            if len(self._queue) >= JOBS_MAX_QUEUE:
+                raise QueueFull(f"job queue full ({JOBS_MAX_QUEUE} queued)")
+            self._prune()
+            self._jobs[job.id] = job
+            self._persist(job)
+            self._queue.append(job.id)
+            self._cond.notify()
+        self.start()
+        return job
+
+    def get(self, job_id: str):
+        with self._cond:
+            job = self._jobs.get(job_id)
+        if job is None and self._store is not None:
+            job = self._store.load(job_id)
+        return job
+
+    async def wait(self, job: Job, timeout: float):
+        """Return once the job has finished or timeout seconds have passed."""
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        with self._cond:
+            if job.finished:
+                return
+            waiter = (loop, fut)
+            job.waiters.append(waiter)
+        try:
+            await asyncio.wait({fut}, timeout=min(timeout, JOBS_MAX_WAIT))
+        finally:
+            with self._cond:
+                if waiter in job.waiters:
+                    job.waiters.remove(waiter)
+
+    # -- workers --------------------------------------------------------------
+
+    def start(self):
+        """Start the worker threads (idempotent)."""
+        with self._cond:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                t = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+            if self._store is not None and (self._heartbeat is None or not self._heartbeat.is_alive()):
+                self._heartbeat = threading.Thread(target=self._beat, name="job-heartbeat", daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self):
+        """Renew this queue's leases and pick up jobs whose owner stopped renewing."""
+        while True:
+            time.sleep(JOBS_LEASE / 3)
+            try:
+                self._store.heartbeat(self.owner)
+                reclaimed = self._store.reclaim()
+            except sqlite3.ProgrammingError:
+                return  # store closed
+            except sqlite3.Error:
+                continue
+            if reclaimed:
+                with self._cond:
+                    for job in reclaimed:
+                        self._jobs[job.id] = job
+                        self._queue.append(job.id)
+                    self._cond.notify_all()
+
+    def _work(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        while True:
+            with self._cond:
+                while not self._queue:
+                    self._cond.wait()
+                job = self._jobs.get(self._queue.popleft())
+                if job is None:
+                    continue
+                job.status = "running"
+                job.started_at = time.time()
+                if self._store is not None and not self._store.claim(job, self.owner):
+                    # Another process sharing the database is running it; read it from there
+                    del self._jobs[job.id]
+                    continue
+                waited = job.started_at - job.created_at
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            try:
+                self._finish(job, "done", results=loop.run_until_complete(self._run(job)))
+            except Exception as e:
+                self._finish(job, "failed", error=str(e))
+
+    async def _run(self, job: Job) -> list:
+        results = await asyncio.gather(*(self.runner(r) for r in job.requests), return_exceptions=True)
+        return [{"error": str(r)} if isinstance(r, Exception) else r for r in results]
+
+    def _finish(self, job: Job, status: str, results: list = None, error: str = None):
+        # Outcome and counters change together, so a reader never sees one without the other
+        with self._cond:
+            job.results, job.error = results, error
+            job.finished_at = time.time()
+            job.status = status
+            if status == "done":
+                self.completed += 1
+            else:
+                self.failed += 1
+            waiters, job.waiters = job.waiters, []
+        self._persist(job)
+        for loop, fut in waiters:
+            loop.call_soon_threadsafe(_wake, fut)
+
+    def _persist(self, job: Job):
+        if self._store is not None:
+            self._store.save(job)
+
+    def _prune(self):
+        """Drop finished jobs older than JOBS_RETENTION from memory (caller holds the lock)."""
+        cutoff = time.time() - JOBS_RETENTION
+        for job_id in [j.id for j in self._jobs.values() if j.finished and j.finished_at < cutoff]:
+            del self._jobs[job_id]
+
+    # -- metrics --------------------------------------------------------------
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._cond:
+            queued = [self._jobs[i] for i in self._queue if i in self._jobs]
+            started = self.completed + self.failed + sum(j.status == "running" for j in self._jobs.values())
+            return {
+                "workers": self.workers,
+                "durable": self.durable,
+                "depth": len(queued),
+                "oldest_queued_age_s": round(now - min(j.created_at for j in queued), 3) if queued else 0.0,
+                "running": sum(j.status == "running" for j in self._jobs.values()),
+                "completed": self.completed,
+                "failed": self.failed,
+                "queue_wait_avg_s": round(self._wait_total / started, 3) if started else 0.0,
+                "queue_wait_max_s": round(self._wait_max, 3),
+            }
+
+    def reset(self):
+        """Forget queued and finished jobs (tests and admin tooling)."""
+        with self._cond:
+            self._queue.clear()
+            self._jobs.clear()
+            self.completed = 0
+            self.failed = 0
+            self._wait_total = 0.0
+            self._wait_max = 0.0
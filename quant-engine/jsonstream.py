@@ -0,0 +1,149 @@
+"""
+INCREMENTAL JSON OBJECT PARSER
+- Purpose: Reads the LLM's JSON answer as it streams in, so callers can act on
+  fields (confidence_score, sentiment) before the completion finishes.
+- Tolerant of stray text around the object (```json fences, a leading
+  sentence): everything before the first "{" and after the closing "}" is
+  ignored.
+- Scalars and strings are decoded as soon as they end; nested objects/arrays
+  are collected and decoded whole. The string value currently being read is
+  available through partial(), e.g. to cap a long "reasoning" early.
+"""
+
+import json
+
+_WS = " \t\r\n"
+
+
+def _decode_string(raw: str) -> str:
+    return json.loads(f'"{raw}"')
+
+
+class ObjectStream:
+    """Feed text chunks; completed top-level fields appear in .fields."""
+
+    def __init__(self):
+        self.fields = {}
+        self.done = False
+        self._state = "start"
+        self._key = None
+        self._raw = []
+        self._escape = False
+        self._depth = 0
+        self._in_string = False
+
+    def feed(self, text: str) -> "ObjectStream":
+        """Consume a chunk; raises ValueError on malformed JSON inside the object."""
+        for ch in text:
+            if self._state == "done":
+                break
+            getattr(self, "_on_" + self._state)(ch)
+        return self
+
+    def has(self, *keys) -> bool:
+        return all(k in self.fields for k in keys)
+
+    def partial(self):
+        """(key, text so far) of the string value being read, or None."""
+        if self._state != "string":
+            return None
+        raw = "".join(self._raw)
+        if raw.endswith("\\") and not raw.endswith("\\\\"):
+            raw = raw[:-1]
+        try:
+            return self._key, _decode_string(raw)
+        except ValueError:
+            return self._key, raw
+
+    # -- states -------------------------------------------------------------
+
+    def _on_start(self, ch):
+        if ch == "{":
+            self._state = "key_or_end"
+
+    def _on_key_or_end(self, ch):
+        if ch == '"':
+            self._raw = []
+            self._state = "key"
+        elif ch == "}":
+            self._finish()
+        elif ch not in _WS and ch != ",":
+            raise ValueError(f"Expected a key, got {ch!r}")
+
+    def _on_key(self, ch):
+        if self._read_string_char(ch):
+            self._key = _decode_string("".join(self._raw))
+            self._state = "colon"
+
+    def _on_colon(self, ch):
+        if ch == ":":
+            self._state = "value"
+        elif ch not in _WS:
+            raise ValueError(f"Expected ':', got {ch!r}")
+
+    def _on_value(self, ch):
+        if ch in _WS:
+            return
+        self._raw = [] if ch == '"' else [ch]
+        if ch == '"':
+            self._state = "string"
+        elif ch in "{[":
+            self._depth, self._in_string, self._escape = 1, False, False
+            self._state = "nested"
+        else:
+            self._state = "scalar"
+
+    def _on_string(self, ch):
+        if self._read_string_char(ch):
+            self.fields[self._key] = _decode_string("".join(self._raw))
+            self._state = "after_value"
+
+    def _on_scalar(self, ch):
+        if ch in _WS or ch in ",}":
+            self.fields[self._key] = json.loads("".join(self._raw))
+            self._state = "after_value"
+            self._on_after_value(ch)
+        else:
+            self._raw.append(ch)
+
+    def _on_nested(self, ch):
+        self._raw.append(ch)
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+        elif ch == '"':
+            self._in_string = True
+        elif ch in "{[":
+            self._depth += 1
+        elif ch in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self.fields[self._key] = json.loads("".join(self._raw))
+                self._state = "after_value"
+
+    def _on_after_value(self, ch):
+        if ch == ",":
+            self._state = "key_or_end"
+        elif ch == "}":
+            self._finish()
+        elif ch not in _WS:
+            raise ValueError(f"Expected ',' or '}}', got {ch!r}")
+
+    def _read_string_char(self, ch) -> bool:
+        """Append a string character; True when the closing quote is reached."""
+        if self._escape:
+            self._escape = False
+        elif ch == "\\":
+            self._escape = True
+        elif ch == '"':
+            return True
+        self._raw.append(ch)
+        return False
+
+    def _finish(self):
+        self.done = True
+        self._state = "done"
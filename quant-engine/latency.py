@@ -0,0 +1,135 @@
+"""
+LATENCY SKETCHES & ADAPTIVE TIMEOUTS
+- Purpose: Replaces fixed timeouts (10s per upstream request) with ones that
+  follow each upstream endpoint's live latency: tight for Finnhub quotes that
+  answer in ~200ms, looser for a cold Wikipedia.
+- LatencySketch is an HDR-style histogram: log-spaced buckets from 1ms to
+  120s, each ~5% wide, so any percentile is known within ~5% in constant
+  memory and O(1) per sample. When LATENCY_WINDOW samples have accumulated,
+  all counts are halved, so old traffic fades out and percentiles track
+  the current behaviour.
+- A timeout is the TIMEOUT_PERCENTILE latency times TIMEOUT_FACTOR, clamped
+  to [TIMEOUT_MIN, TIMEOUT_MAX]. Until TIMEOUT_MIN_SAMPLES have been seen the
+  caller's default is used. Requests that time out are recorded at the
+  timeout, so a too-tight timeout pushes the percentile (and itself) up.
+"""
+
+import math
+import os
+import threading
+
+ADAPTIVE_TIMEOUTS = os.getenv("ADAPTIVE_TIMEOUTS", "1") == "1"
+TIMEOUT_PERCENTILE = float(os.getenv("TIMEOUT_PERCENTILE", "0.99"))
+TIMEOUT_FACTOR = float(os.getenv("TIMEOUT_FACTOR", "1.5"))
+TIMEOUT_MIN = float(os.getenv("TIMEOUT_MIN", "0.25"))
+TIMEOUT_MAX = float(os.getenv("TIMEOUT_MAX", "20"))
+TIMEOUT_MIN_SAMPLES = int(os.getenv("TIMEOUT_MIN_SAMPLES", "30"))
+LATENCY_WINDOW = int(os.getenv("LATENCY_WINDOW", "2000"))
+
+_LOWEST = 0.001
+_HIGHEST = 120.0
+_GROWTH = 1.05
+_LOG_GROWTH = math.log(_GROWTH)
+_BUCKETS = int(math.ceil(math.log(_HIGHEST / _LOWEST) / _LOG_GROWTH)) + 1
+
+
+class LatencySketch:
+    """Log-bucketed latency histogram with exponential forgetting."""
+
+    __slots__ = ("counts", "total", "samples", "max")
+
+    def __init__(self):
+        self.counts = [0.0] * _BUCKETS
+        self.total = 0.0  # decayed weight
+        self.samples = 0  # samples ever seen
+        self.max = 0.0
+
+    @staticmethod
+    def _bucket(seconds: float) -> int:
+        if seconds <= _LOWEST:
+            return 0
+        return min(_BUCKETS - 1, int(math.log(seconds / _LOWEST) / _LOG_GROWTH) + 1)
+
+    def observe(self, seconds: float):
+        self.counts[self._bucket(seconds)] += 1.0
+        self.total += 1.0
+        self.samples += 1
+        self.max = max(self.max, seconds)
+        if self.total >= LATENCY_WINDOW:
+            self.counts = [c / 2 for c in self.counts]
+            self.total /= 2
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (0.0 when empty)."""
+        if not self.total:
+            return 0.0
+        rank = q * self.total
+        seen = 0.0
+        for i, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank and count:
+                if i == 0:
+                    return _LOWEST
+                if i == _BUCKETS - 1:  # overflow bucket
+                    return self.max
+                return min(_LOWEST * _GROWTH ** i, self.max)
+        return self.max
+
+
+class AdaptiveTimeouts:
+    """One LatencySketch per endpoint name and the timeouts derived from them."""
+
+    def __init__(self, percentile: float = TIMEOUT_PERCENTILE, factor: float = TIMEOUT_FACTOR,
+                 bounds: tuple = (TIMEOUT_MIN, TIMEOUT_MAX), enabled: bool = ADAPTIVE_TIMEOUTS):
+        self.percentile = percentile
+        self.factor = factor
+        self.bounds = bounds
+        self.enabled = enabled
+        self._sketches = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            sketch = self._sketches.get(name)
+            if sketch is None:
+                sketch = self._sketches[name] = LatencySketch()
+            sketch.observe(seconds)
+
+    def _timeout(self, sketch, default: float) -> float:
+        if not self.enabled or sketch is None or sketch.samples < TIMEOUT_MIN_SAMPLES:
+            return default
+        low, high = self.bounds
+        return round(min(high, max(low, sketch.quantile(self.percentile) * self.factor)), 3)
+
+    def timeout(self, name: str, default: float) -> float:
+        """Timeout for the endpoint, or default while it has too few samples."""
+        with self._lock:
+            return self._timeout(self._sketches.get(name), default)
+
+    def reset(self):
+        with self._lock:
+            self._sketches.clear()
+
+    def stats(self, default: float = None) -> dict:
+        with self._lock:
+            endpoints = {}
+            for name, sketch in sorted(self._sketches.items()):
+                endpoints[name] = {
+                    "samples": sketch.samples,
+                    "p50_s": round(sketch.quantile(0.5), 4),
+                    "p90_s": round(sketch.quantile(0.9), 4),
+                    "p99_s": round(sketch.quantile(0.99), 4),
+                    "max_s": round(sketch.max, 4),
+                    "timeout_s": self._timeout(sketch, default),
+                }
+            return {
+                "enabled": self.enabled,
+                "percentile": self.percentile,
+                "factor": self.factor,
+                "bounds_s": list(self.bounds),
+                "min_samples": TIMEOUT_MIN_SAMPLES,
+                "endpoints": endpoints,
+            }
+
+
+upstream_timeouts = AdaptiveTimeouts()
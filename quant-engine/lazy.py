@@ -0,0 +1,58 @@
+"""
+LAZY IMPORTS
+- Purpose: Defers importing heavy third-party modules (groq, requests) until
+  first use, so importing app.py and answering /health stay fast on cold start.
+- lazy_import() returns a shared placeholder module per name; the first
+  attribute access imports the real module under a lock.
+"""
+
+import importlib
+import threading
+import types
+
+_lock = threading.RLock()
+_proxies = {}
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self):
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return the shared lazy placeholder for module `name`."""
+    with _lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _proxies[name] = LazyModule(name)
+        return proxy
+
+
+def is_loaded(name: str) -> bool:
+    """True once the real module behind lazy_import(name) has been imported."""
+    proxy = _proxies.get(name)
+    return proxy is not None and proxy.__dict__["_lazy_module"] is not None
+
+
+def load(name: str):
+    """Force the import now (used to warm up in the background)."""
+    return lazy_import(name)._load()
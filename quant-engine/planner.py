@@ -0,0 +1,147 @@
+"""
+SOURCE PLANNER
+- Purpose: Decides per /api/analyze request which context sources to query
+  and how long to wait for each, instead of always calling all of them.
+- Keeps online statistics per (source, question class): smoothed latency, a
+  latency sketch (latency.py), error rate, and how often the source returned
+  anything relevant. Classes are coarse: "stock" (a ticker was found) or "event".
+- Optional sources (Wikipedia, Polymarket) are skipped when history shows they
+  rarely help for the class, mostly fail, or are too slow for the latency
+  SLO; every PLANNER_EXPLORE_EVERY skips one call is let through to keep
+  the statistics current. Required sources are always called.
+- Timeouts follow observed latency (TIMEOUT_PERCENTILE x TIMEOUT_FACTOR),
+  clamped between PLANNER_MIN_TIMEOUT and the SLO. The plan is returned with the response.
+"""
+
+import os
+import threading
+
+from latency import LatencySketch, TIMEOUT_PERCENTILE, TIMEOUT_FACTOR
+
+PLANNER_ENABLED = os.getenv("PLANNER_ENABLED", "1") == "1"
+PLANNER_SLO = float(os.getenv("PLANNER_SLO", "8"))
+PLANNER_MIN_SAMPLES = int(os.getenv("PLANNER_MIN_SAMPLES", "20"))
+PLANNER_MIN_USEFULNESS = float(os.getenv("PLANNER_MIN_USEFULNESS", "0.1"))
+PLANNER_MAX_ERROR_RATE = float(os.getenv("PLANNER_MAX_ERROR_RATE", "0.5"))
+PLANNER_EXPLORE_EVERY = int(os.getenv("PLANNER_EXPLORE_EVERY", "10"))
+PLANNER_MIN_TIMEOUT = float(os.getenv("PLANNER_MIN_TIMEOUT", "1"))
+# Used until a source has PLANNER_MIN_SAMPLES observations (the old fixed value)
+DEFAULT_TIMEOUT = 15.0
+# EWMA weight of the newest sample
+SMOOTHING = 0.1
+
+
+def question_class(symbol) -> str:
+    return "stock" if symbol else "event"
+
+
+class SourceStats:
+    """Smoothed latency / error / usefulness for one source and question class."""
+
+    __slots__ = ("samples", "latency", "sketch", "error_rate", "useful_rate", "skipped")
+
+    def __init__(self):
+        self.samples = 0
+        self.latency = 0.0
+        self.sketch = LatencySketch()
+        self.error_rate = 0.0
+        self.useful_rate = 0.0
+        self.skipped = 0
+
+    def observe(self, latency: float, error: bool, useful: bool):
+        self.sketch.observe(latency)
+        if self.samples == 0:
+            self.latency = latency
+            self.error_rate = float(error)
+            self.useful_rate = float(useful)
+        else:
+            self.latency += SMOOTHING * (latency - self.latency)
+            self.error_rate += SMOOTHING * (float(error) - self.error_rate)
+            self.useful_rate += SMOOTHING * (float(useful) - self.useful_rate)
+        self.samples += 1
+
+    def timeout(self, slo: float) -> float:
+        if self.samples < PLANNER_MIN_SAMPLES:
+            return DEFAULT_TIMEOUT
+        tail = self.sketch.quantile(TIMEOUT_PERCENTILE) * TIMEOUT_FACTOR
+        return round(min(slo, max(PLANNER_MIN_TIMEOUT, tail)), 3)
+
+    def as_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "latency_s": round(self.latency, 3),
+            "p99_s": round(self.sketch.quantile(0.99), 3),
+            "error_rate": round(self.error_rate, 3),
+            "useful_rate": round(self.useful_rate, 3),
+        }
+
+
+class SourcePlanner:
+    """Online per-source statistics and the per-request call/skip decisions."""
+
+    def __init__(self, slo: float = PLANNER_SLO, enabled: bool = PLANNER_ENABLED):
+        self.slo = slo
+        self.enabled = enabled
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _get(self, source: str, cls: str) -> SourceStats:
+        key = (source, cls)
+        stats = self._stats.get(key)
+        if stats is None:
+            stats = self._stats.setdefault(key, SourceStats())
+        return stats
+
+    def _decide(self, stats: SourceStats, required: bool):
+        if not self.enabled:
+            return True, "planner disabled"
+        if stats.samples < PLANNER_MIN_SAMPLES:
+            return True, "warming up"
+        if required:
+            return True, "required"
+        if stats.skipped >= PLANNER_EXPLORE_EVERY:
+            return True, "explore"
+        if stats.useful_rate < PLANNER_MIN_USEFULNESS:
+            return False, "rarely useful"
+        if stats.error_rate > PLANNER_MAX_ERROR_RATE:
+            return False, "mostly failing"
+        if stats.latency > self.slo:
+            return False, "slower than SLO"
+        return True, "useful"
+
+    def plan(self, cls: str, sources: dict) -> dict:
+        """
+        sources maps name -> required. Returns
+        {"class", "slo_s", "sources": {name: {"call", "timeout_s", "reason"}}}.
+        """
+        decisions = {}
+        with self._lock:
+            for name, required in sources.items():
+                stats = self._get(name, cls)
+                call, reason = self._decide(stats, required)
+                stats.skipped = 0 if call else stats.skipped + 1
+                decisions[name] = {
+                    "call": call,
+                    "timeout_s": stats.timeout(self.slo) if self.enabled else DEFAULT_TIMEOUT,
+                    "reason": reason,
+                }
+        return {"class": cls, "slo_s": self.slo, "sources": decisions}
+
+    def record(self, source: str, cls: str, latency: float, error: bool = False, useful: bool = True):
+        """Feed back one finished call."""
+        with self._lock:
+            self._get(source, cls).observe(latency, error, useful and not error)
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            out = {"enabled": self.enabled, "slo_s": self.slo, "sources": {}}
+            for (source, cls), stats in sorted(self._stats.items()):
+                out["sources"].setdefault(source, {})[cls] = stats.as_dict()
+            return out
+
+
+source_planner = SourcePlanner()
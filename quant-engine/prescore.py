@@ -0,0 +1,201 @@
+"""
+QUANTITATIVE PRE-SCORE
+- Purpose: A deterministic, millisecond-cost probability for a trade question,
+  built from the structured Finnhub quote, Polymarket odds and news counts.
+- Liquid Polymarket prices are already calibrated probabilities, so the score
+  is a liquidity-weighted blend (in log-odds space) of the market's YES price
+  and a squashed price-move signal, followed by optional Platt scaling.
+- PRESCORE_MODE controls how /api/analyze uses it:
+    off  - not computed (default)
+    seed - computed and passed to the LLM as extra context; disagreements flagged
+    skip - returned directly, without an LLM call, when confidence is high enough
+- A Polymarket price is used only when the market is about the question: it
+  must name the question's entity and share at least PRESCORE_MIN_MARKET_MATCH
+  of its keywords. Without the question to check against, the market alone
+  can't reach the skip threshold.
+- Questions are read for direction ("will X fall below ..."): the price move
+  and a market worded the other way round are flipped, so the probability is
+  always that of the asked outcome.
+"""
+
+import math
+import os
+
+from query import TICKER_NAMES, analyze
+
+PRESCORE_MODE = os.getenv("PRESCORE_MODE", "off")
+PRESCORE_SKIP_CONFIDENCE = float(os.getenv("PRESCORE_SKIP_CONFIDENCE", "0.8"))
+# Liquidity (USD) at which a Polymarket price gets half of the blend weight
+POLY_LIQUIDITY_HALF = float(os.getenv("PRESCORE_LIQUIDITY_HALF", "25000"))
+# Platt scaling "a,b" applied to the blended log-odds: p = sigmoid(a*z + b)
+PRESCORE_CALIBRATION = tuple(
+    float(v) for v in os.getenv("PRESCORE_CALIBRATION", "1.0,0.0").split(",")
+)
+# Daily move (percent) that saturates the price-move signal
+MOVE_SCALE_PCT = 5.0
+MOVE_MAX_LOGIT = 1.5
+DISAGREEMENT = 0.35
+# Share of the question's keywords a Polymarket question must contain
+PRESCORE_MIN_MARKET_MATCH = float(os.getenv("PRESCORE_MIN_MARKET_MATCH", "0.5"))
+BEARISH_WORDS = frozenset({"fall", "falls", "drop", "drops", "decline", "crash", "below", "under",
+                           "down", "lose", "plunge", "sink", "dip", "bearish", "short", "lower",
+                           "selloff", "sell-off", "tank"})
+_COMPANY_NAMES = {}
+for _name, _ticker in TICKER_NAMES.items():
+    _COMPANY_NAMES.setdefault(_ticker, set()).add(_name)
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _logit(p: float) -> float:
+    p = min(max(p, 1e-4), 1 - 1e-4)
+    return math.log(p / (1 - p))
+
+
+def _sigmoid(z: float) -> float:
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def is_bearish(text: str) -> bool:
+    """True when a question asks about a move down ("will X fall below ...")."""
+    return any(t in BEARISH_WORDS for t in analyze(text or "").tokens)
+
+
+def market_match(question: str, market_question: str) -> float:
+    """Share of the question's keywords in the market question; 0.0 if it misses the entity."""
+    analysis = analyze(question)
+    text = (market_question or "").lower()
+    entities = {n.lower() for n in analysis.proper_nouns}
+    for ticker in analysis.tickers:
+        entities |= {ticker.lower()} | _COMPANY_NAMES.get(ticker, set())
+    if entities and not any(e in text for e in entities):
+        return 0.0
+    keywords = [k for k in analysis.keywords if k]
+    if not keywords:
+        return 0.0
+    return sum(k in text for k in keywords) / len(keywords)
+
+
+def extract_features(quote: dict = None, markets: list = None, news: list = None,
+                     question: str = None) -> dict:
+    """
+    Numeric features from the raw scraper outputs (error entries are ignored).
+    With the question, only a matching market is used and directions are aligned.
+    """
+    features = {
+        "poly_yes": None,
+        "poly_liquidity": 0.0,
+        "poly_volume": 0.0,
+        "poly_markets": 0,
+        "poly_match": None,
+        "change_percent": None,
+        "news_count": 0,
+        "bearish": is_bearish(question) if question else False,
+    }
+    valid_markets = [m for m in (markets or []) if "error" not in m and _float(m.get("outcome_yes")) is not None]
+    features["poly_markets"] = len(valid_markets)
+    top = match = None
+    if question is None:
+        # search_markets returns markets ordered by relevance; use the top one
+        top = valid_markets[0] if valid_markets else None
+    else:
+        for m in valid_markets:
+            match = market_match(question, m.get("question"))
+            if match >= PRESCORE_MIN_MARKET_MATCH:
+                top = m
+                break
+    if top is not None:
+        yes = _float(top.get("outcome_yes"))
+        if question is not None and is_bearish(top.get("question")) != features["bearish"]:
+            yes = 1 - yes  # the market asks the opposite of the question
+        features["poly_yes"] = yes
+        features["poly_match"] = round(match, 3) if match is not None else None
+        features["poly_liquidity"] = _float(top.get("liquidity")) or 0.0
+        features["poly_volume"] = _float(top.get("volume")) or 0.0
+    if quote and "error" not in quote:
+        features["change_percent"] = _float(quote.get("change_percent"))
+    features["news_count"] = sum(1 for n in (news or []) if "error" not in n)
+    return features
+
+
+def score(features: dict) -> dict:
+    """Blend features into a calibrated probability plus a confidence in [0, 1]."""
+    poly_weight = 0.0
+    poly_logit = 0.0
+    if features.get("poly_yes") is not None:
+        liquidity = features.get("poly_liquidity") or 0.0
+        poly_weight = liquidity / (liquidity + POLY_LIQUIDITY_HALF)
+        poly_logit = _logit(features["poly_yes"])
+
+    move = features.get("change_percent")
+    move_signal = math.tanh(move / MOVE_SCALE_PCT) if move is not None else 0.0
+    if features.get("bearish"):
+        move_signal = -move_signal  # a falling price supports "will it fall?"
+    move_logit = MOVE_MAX_LOGIT * move_signal
+
+    z = poly_weight * poly_logit + (1 - poly_weight) * move_logit
+    a, b = PRESCORE_CALIBRATION
+    probability = _sigmoid(a * z + b)
+
+    # How much hard evidence backs the number: a liquid, decisive market or a
+    # strong move; news coverage adds a little support to either.
+    poly_evidence = poly_weight * abs(2 * features["poly_yes"] - 1) if features.get("poly_yes") is not None else 0.0
+    if features.get("poly_match") is None:
+        # Unverified market: it can support a skip but never carry one alone
+        poly_evidence = min(poly_evidence, 0.9 * PRESCORE_SKIP_CONFIDENCE)
+    evidence = max(poly_evidence, 0.6 * abs(move_signal))
+    coverage = min(features.get("news_count", 0), 5) / 5
+    confidence = min(1.0, evidence * (0.85 + 0.25 * coverage))
+
+    # Sentiment is about the asset: "yes, it falls" is bearish
+    up = 1 - probability if features.get("bearish") else probability
+    if up > 0.55:
+        sentiment = "bullish"
+    elif up < 0.45:
+        sentiment = "bearish"
+    else:
+        sentiment = "neutral"
+
+    return {
+        "probability": round(probability, 4),
+        "confidence": round(confidence, 4),
+        "confidence_score": int(round(probability * 100)),
+        "sentiment": sentiment,
+        "features": features,
+    }
+
+
+def describe(result: dict) -> str:
+    """One-line human/LLM readable summary of a pre-score."""
+    f = result["features"]
+    parts = [f"Quantitative pre-score: {result['probability'] * 100:.0f}% "
+             f"(confidence {result['confidence']:.2f})"]
+    if f.get("poly_yes") is not None:
+        parts.append(f"Polymarket YES {f['poly_yes']:.2f} with ${f['poly_liquidity']:,.0f} liquidity")
+    if f.get("change_percent") is not None:
+        parts.append(f"price change {f['change_percent']:+.2f}%")
+    parts.append(f"{f.get('news_count', 0)} recent news articles")
+    return "; ".join(parts)
+
+
+def as_answer(result: dict) -> dict:
+    """Shape a pre-score like an LLM answer for the skip fast path."""
+    return {
+        "confidence_score": result["confidence_score"],
+        "sentiment": result["sentiment"],
+        "reasoning": describe(result) + ".",
+        "source": "prescore",
+    }
+
+
+def disagrees(result: dict, llm_answer: dict) -> bool:
+    """True when a confident pre-score and the LLM's score are far apart."""
+    llm_score = _float(llm_answer.get("confidence_score"))
+    if llm_score is None or result["confidence"] < PRESCORE_SKIP_CONFIDENCE:
+        return False
+    return abs(llm_score / 100 - result["probability"]) > DISAGREEMENT
@@ -0,0 +1,158 @@
+"""
+QUERY ANALYSIS
+- Purpose: Parses a question once and shares the result with every consumer,
+  instead of each scraper re-tokenizing it with its own rules.
+- QueryAnalysis holds normalized tokens, search keywords, proper nouns,
+  tickers (every one mentioned, in order, up to MAX_SYMBOLS for analysis),
+  crypto mentions and the derived per-source queries (the ticker
+  for Finnhub, the Wikipedia title query and the Polymarket search string).
+- analyze() is memoized by question text, so the app, the scrapers and the
+  caches all reuse one instance per distinct question.
+- cache_key is a canonical form of the question (case, punctuation and
+  spacing removed) so trivially different phrasings share cache entries.
+  Ticker and proper-noun detection is case-sensitive, so the key also
+  carries the resolved symbols and proper nouns: "will nvda beat earnings"
+  and "Will NVDA beat earnings?" resolve differently and must not share.
+"""
+
+import os
+import re
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Optional, Tuple
+
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "4096"))
+# Most tickers a single question is analyzed for
+MAX_SYMBOLS = int(os.getenv("MAX_SYMBOLS", "5"))
+
+QUESTION_WORDS = {'will', 'what', 'when', 'where', 'how', 'is', 'are', 'can',
+                  'do', 'does', 'should', 'would', 'could', 'the', 'a', 'an', 'by'}
+STOP_WORDS = {'will', 'what', 'when', 'where', 'which', 'would', 'could', 'should',
+              'does', 'have', 'been', 'that', 'this', 'with', 'from', 'about',
+              'the', 'and', 'for', 'not', 'but', 'are', 'was', 'were'}
+
+# Long names: simple substring match
+CRYPTO_LONG = [
+    "bitcoin", "ethereum", "solana", "dogecoin", "cardano", "ripple",
+    "polkadot", "avalanche", "litecoin", "chainlink", "monero", "stellar",
+    "cosmos", "algorand", "fantom", "aptos", "uniswap", "aave", "arbitrum",
+    "near protocol", "shiba", "pepe", "cryptocurrency", "crypto",
+]
+# Short tickers: word boundary match to avoid 'eth' in 'whether', 'sol' in 'solution'
+CRYPTO_SHORT = [
+    "btc", "eth", "sol", "doge", "ada", "xrp", "dot", "avax", "ltc",
+    "link", "xmr", "trx", "xlm", "atom", "algo", "ftm", "apt", "sui",
+    "shib", "uni", "arb", "tron",
+]
+_CRYPTO_SHORT_RE = re.compile(r"\b(" + "|".join(CRYPTO_SHORT) + r")\b")
+
+TICKER_NAMES = {
+    "tesla": "TSLA", "apple": "AAPL", "google": "GOOGL", "alphabet": "GOOGL",
+    "amazon": "AMZN", "microsoft": "MSFT", "nvidia": "NVDA", "meta": "META",
+    "netflix": "NFLX", "disney": "DIS", "amd": "AMD", "intel": "INTC",
+    "coinbase": "COIN", "palantir": "PLTR", "uber": "UBER",
+    "spacex": "TSLA", "elon": "TSLA", "musk": "TSLA",
+}
+
+KNOWN_TICKERS = frozenset(TICKER_NAMES.values())
+
+_DOLLAR_TICKER_RE = re.compile(r"\$([A-Z]{1,5})")
+# Bare uppercase tickers ("NVDA"); only known ones, so "CEO" or "GDP" never match
+_BARE_TICKER_RE = re.compile(r"\b([A-Z]{2,5})\b")
+# Company names as whole words, so "intelligence" isn't Intel or "metaverse" Meta
+_COMPANY_NAME_RE = re.compile(
+    r"\b(" + "|".join(re.escape(n) for n in sorted(TICKER_NAMES, key=len, reverse=True)) + r")\b")
+_TOKEN_RE = re.compile(r"\$?[a-z0-9]+(?:['.-][a-z0-9]+)*")
+
+
+@dataclass(frozen=True, slots=True)
+class QueryAnalysis:
+    question: str
+    tokens: Tuple[str, ...]
+    keywords: Tuple[str, ...]
+    proper_nouns: Tuple[str, ...]
+    tickers: Tuple[str, ...]
+    crypto: Tuple[str, ...]
+    cache_key: str
+    # True when the first ticker was written explicitly as $TICKER
+    explicit_ticker: bool = False
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        """Stock tickers to analyze: explicit $TICKERs first, none for crypto questions without one."""
+        if self.crypto and not self.explicit_ticker:
+            return ()
+        return self.tickers[:MAX_SYMBOLS]
+
+    @property
+    def symbol(self) -> Optional[str]:
+        """The primary stock ticker (the first of symbols), or None."""
+        symbols = self.symbols
+        return symbols[0] if symbols else None
+
+    @property
+    def wiki_query(self) -> str:
+        """Wikipedia search string: proper nouns only (domain terms add noise), else the question."""
+        return " ".join(self.proper_nouns) if self.proper_nouns else self.question
+
+    @property
+    def market_query(self) -> str:
+        """Polymarket text-search string."""
+        return " ".join(self.keywords[:5])
+
+
+def _proper_nouns(words: list) -> tuple:
+    nouns = []
+    for i, w in enumerate(words):
+        clean = re.sub(r"[^a-zA-Z0-9'-]", "", w)
+        if not clean:
+            continue
+        if clean[0].isupper() and len(clean) > 1:
+            if i == 0 and clean.lower() in QUESTION_WORDS:
+                continue
+            nouns.append(clean)
+    return tuple(nouns)
+
+
+def _mentioned_tickers(question: str, lower: str) -> list:
+    """Named companies and bare known tickers, in order of first mention."""
+    mentions = [(m.start(), TICKER_NAMES[m.group(1)]) for m in _COMPANY_NAME_RE.finditer(lower)]
+    mentions.extend((m.start(), m.group(1)) for m in _BARE_TICKER_RE.finditer(question)
+                    if m.group(1) in KNOWN_TICKERS)
+    return [ticker for _, ticker in sorted(mentions)]
+
+
+def _crypto_mentions(lower: str) -> tuple:
+    found = [kw for kw in CRYPTO_LONG if kw in lower]
+    found.extend(m.group(1) for m in _CRYPTO_SHORT_RE.finditer(lower))
+    return tuple(dict.fromkeys(found))
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def analyze(question: str) -> QueryAnalysis:
+    """Parse a question (memoized by its exact text)."""
+    question = question or ""
+    lower = question.lower()
+    words = question.split()
+
+    dollar = _DOLLAR_TICKER_RE.findall(question.upper())
+    named = _mentioned_tickers(question, lower)
+    keywords = tuple(
+        w.lower().strip('.,!?') for w in words
+        if len(w) > 2 and w.lower().strip('.,!?') not in STOP_WORDS
+    )
+    tokens = tuple(_TOKEN_RE.findall(lower))
+
+    analysis = QueryAnalysis(
+        question=question,
+        tokens=tokens,
+        keywords=keywords,
+        proper_nouns=_proper_nouns(words),
+        tickers=tuple(dict.fromkeys(dollar + named)),
+        crypto=_crypto_mentions(lower),
+        cache_key="",
+        explicit_ticker=bool(dollar),
+    )
+    # Entity lookups (Wikipedia, the entity map) are case-insensitive once detected
+    resolved = f"{','.join(analysis.symbols)}|{','.join(n.lower() for n in analysis.proper_nouns)}"
+    return replace(analysis, cache_key=f"{' '.join(tokens)}|{resolved}")
@@ -4,27 +4,88 @@ SCORING & AI INFERENCE LOGIC
 - Purpose: Takes the giant block of scraped context and the user's question, constructs 
   a strict prompt, and sends it to the LLM.
 - Parses the LLM's response to extract the specific confidence score and sentiment.
+- The groq package and client are created lazily on first use (or by the
+  background warm-up in app.py), keeping module import cheap.
+- The answer is read with an incremental parser (jsonstream.py), so stray
+  markdown around the JSON no longer fails the request. Completions are capped
+  at GROQ_MAX_TOKENS and, when not streamed, request the provider's JSON mode.
+- With GROQ_STREAM=1 the completion is streamed and we stop reading as soon
+  as confidence_score and sentiment are in and the reasoning is complete or
+  has reached GROQ_REASONING_CHARS (0 = don't wait for reasoning at all).
+- A streamed completion is closed as soon as its request is cancelled
+  (cancellation.py).
+- Completions go through cassette.py, so they can be recorded and replayed
+  (replay needs no API key).
+- Hedge requests (hedging.py) can use their own key and model
+  (GROQ_HEDGE_API_KEY, GROQ_HEDGE_MODEL) so they don't share a rate limit
+  or a slow model with the call they back up.
 """
 
 import os
-import json
-from groq import Groq
+import threading
 from dotenv import load_dotenv
 
+import cancellation
+import cassette
+from jsonstream import ObjectStream
+from lazy import lazy_import
+
+groq = lazy_import("groq")
+
 # Load your secret keys from the .env file
 load_dotenv()
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
+GROQ_MODEL = "llama-3.3-70b-versatile"
+GROQ_MAX_TOKENS = int(os.getenv("GROQ_MAX_TOKENS", "256"))
+GROQ_JSON_MODE = os.getenv("GROQ_JSON_MODE", "1") == "1"
+GROQ_STREAM = os.getenv("GROQ_STREAM", "0") == "1"
+# Unset: wait for the whole reasoning; N: stop reading after N characters of it
+_reasoning_chars = os.getenv("GROQ_REASONING_CHARS", "")
+GROQ_REASONING_CHARS = int(_reasoning_chars) if _reasoning_chars else None
+GROQ_HEDGE_API_KEY = os.getenv("GROQ_HEDGE_API_KEY", "")
+GROQ_HEDGE_MODEL = os.getenv("GROQ_HEDGE_MODEL", "") or GROQ_MODEL
+REQUIRED_FIELDS = ("confidence_score", "sentiment")
+
+# The Groq clients are built on first use by get_client() / get_hedge_client()
+client = None
+hedge_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Return the shared Groq client, creating it on first call."""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                client = groq.Groq(api_key=GROQ_API_KEY)
+    return client
+
+
+def get_hedge_client():
+    """Client for hedge requests: its own when GROQ_HEDGE_API_KEY is set, else the shared one."""
+    global hedge_client
+    if not GROQ_HEDGE_API_KEY:
+        return get_client()
+    if hedge_client is None:
+        with _client_lock:
+            if hedge_client is None:
+                hedge_client = groq.Groq(api_key=GROQ_HEDGE_API_KEY)
+    return hedge_client
 
-# Initialize the Groq client
-client = Groq(api_key=GROQ_API_KEY)
 
-def get_trade_confidence(question: str, context: str) -> dict:
+def get_trade_confidence(question: str, context: str, hedge: bool = False, timeout: float = None) -> dict:
     """
     Sends the user's trade question and scraped context to Groq.
     Forces the AI to return a JSON object with a confidence score.
+    hedge=True sends it with the hedge key and model; timeout (seconds)
+    overrides the client's request timeout.
     """
-    if not GROQ_API_KEY:
+    replaying = cassette.active() is not None and cassette.active().replaying
+    api_key = (GROQ_HEDGE_API_KEY or GROQ_API_KEY) if hedge else GROQ_API_KEY
+    if not api_key and not replaying:
         return {"error": "Missing GROQ_API_KEY in .env"}
+    client_factory, model = (get_hedge_client, GROQ_HEDGE_MODEL) if hedge else (get_client, GROQ_MODEL)
 
     # We use a system prompt to force the AI to act like a quant and return pure JSON
     system_prompt = """
@@ -36,23 +97,88 @@ def get_trade_confidence(question: str, context: str) -> dict:
     """
 
     user_prompt = f"Question: {question}\nContext: {context}"
+    messages = [
+        {"role": "system", "content": system_prompt},
+        {"role": "user", "content": user_prompt}
+    ]
 
     try:
-        response = client.chat.completions.create(
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ],
-            # Using Llama 3 8B because it is blazing fast on Groq
-            model="llama-3.3-70b-versatile", 
-            temperature=0.2, # Low temperature for more analytical/consistent answers
-        )
-
-        # Extract the text response and parse it as JSON
-        ai_response_text = response.choices[0].message.content.strip()
-        
-        # Parse the string into a Python dictionary
-        return json.loads(ai_response_text)
+        if GROQ_STREAM:
+            parser = _stream_answer(messages, client_factory, model, timeout)
+        else:
+            extra = {"response_format": {"type": "json_object"}} if GROQ_JSON_MODE else {}
+            if timeout is not None:
+                extra["timeout"] = timeout
+            response = cassette.create_completion(
+                client_factory,
+                messages=messages,
+                # Using Llama 3 8B because it is blazing fast on Groq
+                model=model,
+                temperature=0.2, # Low temperature for more analytical/consistent answers
+                max_tokens=GROQ_MAX_TOKENS,
+                **extra,
+            )
+            parser = ObjectStream().feed(response.choices[0].message.content or "")
+        return _answer(parser)
 
     except Exception as e:
-        return {"error": f"Groq inference failed: {str(e)}"}
\ No newline at end of file
+        return {"error": f"Groq inference failed: {str(e)}"}
+
+
+def _has_enough(parser: ObjectStream) -> bool:
+    """Score and sentiment parsed, and the reasoning finished or long enough."""
+    if parser.done:
+        return True
+    if GROQ_REASONING_CHARS is None or not parser.has(*REQUIRED_FIELDS):
+        return False
+    if GROQ_REASONING_CHARS == 0 or "reasoning" in parser.fields:
+        return True
+    partial = parser.partial()
+    return partial is not None and partial[0] == "reasoning" and len(partial[1]) >= GROQ_REASONING_CHARS
+
+
+def _stream_answer(messages: list, client_factory=get_client, model: str = GROQ_MODEL,
+                   timeout: float = None) -> ObjectStream:
+    """Read a streamed completion only until _has_enough(); returns the parser."""
+    extra = {"timeout": timeout} if timeout is not None else {}
+    stream = cassette.create_completion(
+        client_factory,
+        messages=messages,
+        model=model,
+        temperature=0.2,
+        max_tokens=GROQ_MAX_TOKENS,
+        stream=True,
+        **extra,
+    )
+    parser = ObjectStream()
+    token = cancellation.current()
+    try:
+        for chunk in stream:
+            if token.cancelled:
+                cancellation.count("llm_streams_closed")
+                raise cancellation.Cancelled(token.reason)
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parser.feed(delta)
+                if _has_enough(parser):
+                    break
+    finally:
+        # Stop the provider generating (and billing) tokens we won't read
+        close = getattr(stream, "close", None)
+        if close:
+            close()
+    return parser
+
+
+def _answer(parser: ObjectStream) -> dict:
+    """The parsed answer; a cut-off reasoning is kept up to the cap."""
+    result = dict(parser.fields)
+    if not parser.done:
+        if not parser.has(*REQUIRED_FIELDS):
+            raise ValueError("response did not contain a complete JSON answer")
+        partial = parser.partial()
+        if partial is not None and partial[0] == "reasoning":
+            result["reasoning"] = partial[1]
+    if GROQ_REASONING_CHARS and isinstance(result.get("reasoning"), str):
+        result["reasoning"] = result["reasoning"][:GROQ_REASONING_CHARS]
+    return result
@@ -0,0 +1,176 @@
+"""
+WIKIPEDIA ENTITY TITLES
+- Purpose: Remembers which Wikipedia articles a recurring entity query
+  ("Elon Musk", "Tesla", "Federal Reserve") resolves to, so search_wikipedia
+  can fetch the extracts directly instead of running list=search first.
+- Learned from two sources:
+    search results   entity query -> the result titles, with a confidence
+                     from how closely the top title matches the query
+    redirects        alias -> canonical title (confidence 1.0), reported by
+                     the extract fetch (redirects=1)
+- An entry is used only when its confidence is at least
+  WIKI_TITLE_MIN_CONFIDENCE and it is younger than WIKI_TITLE_TTL. Expired
+  entries fall back to a search, which re-learns them; a search that
+  confirms the same titles raises confidence, and a known title whose page
+  comes back empty halves it.
+- The map is saved as JSON to WIKI_TITLES_PATH (atomically, every
+  WIKI_TITLES_SAVE_EVERY changes and at shutdown) and loaded on start, so it
+  survives restarts. An empty path keeps it in memory only.
+"""
+
+import os
+import re
+import threading
+import time
+
+from serialization import dumps, loads
+
+WIKI_TITLES_PATH = os.getenv("WIKI_TITLES_PATH", "data/wiki_titles.json")
+WIKI_TITLE_TTL = float(os.getenv("WIKI_TITLE_TTL", str(7 * 24 * 3600)))
+WIKI_TITLE_MIN_CONFIDENCE = float(os.getenv("WIKI_TITLE_MIN_CONFIDENCE", "0.7"))
+WIKI_TITLES_MAX = int(os.getenv("WIKI_TITLES_MAX", "10000"))
+WIKI_TITLES_SAVE_EVERY = int(os.getenv("WIKI_TITLES_SAVE_EVERY", "25"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str) -> str:
+    """Case-, punctuation- and possessive-insensitive form of an entity or title."""
+    return " ".join(w for w in _WORD_RE.findall(text.lower().replace("'s", "")))
+
+
+def match_confidence(query: str, title: str) -> float:
+    """How surely `title` is the article meant by `query`."""
+    q, t = normalize(query), normalize(title)
+    if not q or not t:
+        return 0.0
+    if q == t:
+        return 0.95
+    q_words, t_words = set(q.split()), set(t.split())
+    if q_words <= t_words or t_words <= q_words:
+        return 0.8
+    return 0.5 * len(q_words & t_words) / len(q_words | t_words)
+
+
+class EntityTitles:
+    """Persistent entity query -> Wikipedia titles map."""
+
+    def __init__(self, path: str = WIKI_TITLES_PATH):
+        self.path = path
+        self._entries = {}  # key -> {"titles", "confidence", "source", "learned_at", "hits"}
+        self._lock = threading.Lock()
+        self._dirty = 0
+        self.hits = 0
+        self.misses = 0
+        self.load()
+
+    # -- lookups --------------------------------------------------------------
+
+    def lookup(self, query: str, max_results: int):
+        """Known titles for an entity query, or None when unknown, unsure or due for refresh."""
+        key = normalize(query)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is None or entry["confidence"] < WIKI_TITLE_MIN_CONFIDENCE
+                    or now - entry["learned_at"] > WIKI_TITLE_TTL):
+                self.misses += 1
+                return None
+            entry["hits"] += 1
+            self.hits += 1
+            return entry["titles"][:max_results]
+
+    # -- learning -------------------------------------------------------------
+
+    def learn_search(self, query: str, titles: list):
+        """Record the titles a search returned; repeat answers raise confidence."""
+        key = normalize(query)
+        if not key or not titles:
+            return
+        confidence = match_confidence(query, titles[0])
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry["titles"][:1] == titles[:1]:
+                confidence = max(confidence, min(1.0, entry["confidence"] + 0.1))
+            self._put(key, list(titles), confidence, "search", entry["hits"] if entry else 0)
+
+    def learn_redirects(self, redirects: list):
+        """Record Wikipedia redirects ({"from": alias, "to": canonical title})."""
+        with self._lock:
+            for r in redirects or ():
+                source, target = r.get("from"), r.get("to")
+                if source and target:
+                    entry = self._entries.get(normalize(source))
+                    self._put(normalize(source), [target], 1.0, "redirect", entry["hits"] if entry else 0)
+
+    def demote(self, query: str):
+        """A known title led nowhere: halve its confidence so the next request searches."""
+        with self._lock:
+            entry = self._entries.get(normalize(query))
+            if entry is not None:
+                entry["confidence"] /= 2
+                self._dirty += 1
+
+    def _put(self, key: str, titles: list, confidence: float, source: str, hits: int):
+        self._entries.pop(key, None)
+        self._entries[key] = {"titles": titles, "confidence": round(confidence, 3),
+                              "source": source, "learned_at": time.time(), "hits": hits}
+        while len(self._entries) > WIKI_TITLES_MAX:
+            del self._entries[next(iter(self._entries))]  # oldest learned first
+        self._dirty += 1
+        if self._dirty >= WIKI_TITLES_SAVE_EVERY:
+            self._save_locked()
+
+    # -- persistence ----------------------------------------------------------
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "rb") as f:
+                entries = loads(f.read())
+        except (OSError, ValueError):
+            return  # a damaged file only costs some searches
+        with self._lock:
+            self._entries = {k: v for k, v in entries.items() if isinstance(v, dict) and v.get("titles")}
+
+    def save(self):
+        with self._lock:
+            self._save_locked()
+
+    def _save_locked(self):
+        self._dirty = 0
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = f"{self.path}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(dumps(self._entries))
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # persistence is best effort; the in-memory map keeps working
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._dirty = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            confident = sum(e["confidence"] >= WIKI_TITLE_MIN_CONFIDENCE for e in self._entries.values())
+            return {
+                "entries": len(self._entries),
+                "confident": confident,
+                "redirects": sum(e["source"] == "redirect" for e in self._entries.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "min_confidence": WIKI_TITLE_MIN_CONFIDENCE,
+                "ttl_s": WIKI_TITLE_TTL,
+                "path": self.path or None,
+            }
+
+
+titles = EntityTitles()
@@ -1,73 +1,147 @@
 """
 FINNHUB SCRAPER
 - Interacts with: Finnhub API.
-- Purpose: Fetches real-time stock quotes, company news, and financial sentiment.
+- Purpose: Fetches real-time stock quotes, company news, OHLCV candles and
+  financial sentiment.
+- Questions about several tickers get one comparative context: quotes and
+  news for all of them are fetched concurrently (sharing the Finnhub rate
+  scheduler) and summarized as a relative-performance table.
 - Requires: Finnhub API key (loaded from .env).
 """
 
+import concurrent.futures
+import contextvars
 import os
-import requests
 from dotenv import load_dotenv
 from datetime import datetime, timedelta
 
+import dedup
+from cache import cached
+from lazy import lazy_import
+import records
+from scraping import http
+from scraping.news_store import store as news_store
+from timeseries import store as timeseries, quote_key
+
+requests = lazy_import("requests")
+
 load_dotenv()
 FINNHUB_API_KEY = os.getenv("FINNHUB_API_KEY", "")
 BASE_URL = "https://finnhub.io/api/v1"
+QUOTE_CACHE_TTL = float(os.getenv("QUOTE_CACHE_TTL", "15"))
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "300"))
+CANDLES_CACHE_TTL = float(os.getenv("CANDLES_CACHE_TTL", "300"))
+# Articles considered before near-duplicate syndicated stories are collapsed
+NEWS_WINDOW = int(os.getenv("NEWS_WINDOW", "30"))
+NEWS_LIMIT = 5
+# Headlines per symbol in a multi-symbol comparison
+COMPARE_NEWS_PER_SYMBOL = int(os.getenv("COMPARE_NEWS_PER_SYMBOL", "2"))
 
 
+@cached("finnhub:quote", QUOTE_CACHE_TTL)
 def get_stock_quote(symbol: str) -> dict:
     """Get real-time stock quote for a symbol."""
     try:
-        resp = requests.get(
+        resp = http.get(
             f"{BASE_URL}/quote",
             params={"symbol": symbol.upper(), "token": FINNHUB_API_KEY},
             timeout=10,
+            upstream="finnhub",
         )
         resp.raise_for_status()
         data = resp.json()
-        return {
-            "symbol": symbol.upper(),
-            "current_price": data.get("c"),
-            "high": data.get("h"),
-            "low": data.get("l"),
-            "open": data.get("o"),
-            "previous_close": data.get("pc"),
-            "change": data.get("d"),
-            "change_percent": data.get("dp"),
-        }
+        timeseries.record(quote_key(symbol), data.get("c"), data.get("t") or None)
+        return records.quote(symbol, data)
     except Exception as e:
         return {"error": f"Finnhub quote failed: {str(e)}"}
 
 
+def _fetch_news(symbol: str, since: float) -> list:
+    """Company news published from `since` (epoch seconds, day granularity) to today."""
+    resp = http.get(
+        f"{BASE_URL}/company-news",
+        params={
+            "symbol": symbol,
+            "from": datetime.fromtimestamp(since).strftime("%Y-%m-%d"),
+            "to": datetime.now().strftime("%Y-%m-%d"),
+            "token": FINNHUB_API_KEY,
+        },
+        timeout=10,
+        upstream="finnhub",
+    )
+    resp.raise_for_status()
+    return [records.news_item(a) for a in resp.json()]
+
+
+@cached("finnhub:news", NEWS_CACHE_TTL)
 def get_company_news(symbol: str, days_back: int = 7) -> list:
-    """Get recent company news for a symbol."""
-    today = datetime.now().strftime("%Y-%m-%d")
-    past = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
+    """
+    Get recent company news for a symbol: the top 5 distinct stories.
+    After the first call only articles newer than the symbol's last sync are
+    downloaded (see news_store.py).
+    """
+    symbol = symbol.upper()
+    try:
+        articles = news_store.sync(symbol, days_back, lambda since: _fetch_news(symbol, since))
+    except Exception as e:
+        return [{"error": f"Finnhub news failed: {str(e)}"}]
+    return dedup.dedupe(
+        articles[:NEWS_WINDOW],
+        key=lambda a: f"{a['headline'] or ''} {a['summary']}",
+        limit=NEWS_LIMIT,
+    )
+
+
+@cached("finnhub:candles", CANDLES_CACHE_TTL)
+def get_candles(symbol: str, resolution: str = "D", days_back: int = 180) -> dict:
+    """Get OHLCV candles for a symbol as parallel arrays (t, o, h, l, c, v)."""
+    now = int(datetime.now().timestamp())
+    past = int((datetime.now() - timedelta(days=days_back)).timestamp())
     try:
-        resp = requests.get(
-            f"{BASE_URL}/company-news",
+        resp = http.get(
+            f"{BASE_URL}/stock/candle",
             params={
                 "symbol": symbol.upper(),
+                "resolution": resolution,
                 "from": past,
-                "to": today,
+                "to": now,
                 "token": FINNHUB_API_KEY,
             },
             timeout=10,
+            upstream="finnhub",
         )
         resp.raise_for_status()
-        articles = resp.json()[:5]  # Top 5 articles
-        return [
-            {
-                "headline": a.get("headline"),
-                "summary": a.get("summary", "")[:300],
-                "source": a.get("source"),
-                "url": a.get("url"),
-                "datetime": a.get("datetime"),
-            }
-            for a in articles
-        ]
+        data = resp.json()
+        if data.get("s") != "ok":
+            return {"error": f"No candle data for {symbol.upper()}"}
+        return {
+            "symbol": symbol.upper(),
+            "resolution": resolution,
+            "t": data.get("t", []),
+            "o": data.get("o", []),
+            "h": data.get("h", []),
+            "l": data.get("l", []),
+            "c": data.get("c", []),
+            "v": data.get("v", []),
+        }
     except Exception as e:
-        return [{"error": f"Finnhub news failed: {str(e)}"}]
+        return {"error": f"Finnhub candles failed: {str(e)}"}
+
+
+def get_market_news(limit: int = NEWS_LIMIT) -> list:
+    """Top distinct general market headlines (Finnhub /news, category "general")."""
+    try:
+        resp = http.get(
+            f"{BASE_URL}/news",
+            params={"category": "general", "token": FINNHUB_API_KEY},
+            timeout=10,
+            upstream="finnhub",
+        )
+        resp.raise_for_status()
+        articles = [records.news_item(a) for a in resp.json()[:NEWS_WINDOW]]
+        return dedup.dedupe(articles, key=lambda a: f"{a['headline'] or ''} {a['summary']}", limit=limit)
+    except Exception as e:
+        return [{"error": f"Finnhub market news failed: {str(e)}"}]
 
 
 def get_market_sentiment(symbol: str) -> str:
@@ -92,4 +166,55 @@ def get_market_sentiment(symbol: str) -> str:
         else:
             parts.append(f"  {n['error']}")
 
-    return "\n".join(parts)
\ No newline at end of file
+    return "\n".join(parts)
+
+
+def get_quotes_and_news(symbols: list) -> dict:
+    """{symbol: (quote, news)} for several symbols, fetched concurrently."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, 2 * len(symbols))) as executor:
+        # Each task carries the caller's context (scheduler lane, cancellation)
+        quotes = {s: executor.submit(contextvars.copy_context().run, get_stock_quote, s) for s in symbols}
+        news = {s: executor.submit(contextvars.copy_context().run, get_company_news, s) for s in symbols}
+        return {s: (quotes[s].result(), news[s].result()) for s in symbols}
+
+
+def _fmt(value, pattern: str) -> str:
+    return pattern.format(value) if isinstance(value, (int, float)) else "n/a"
+
+
+def get_comparative_context(symbols: list) -> str:
+    """Relative-performance table plus top headlines for several symbols, as text context."""
+    symbols = [s.upper() for s in symbols]
+    data = get_quotes_and_news(symbols)
+
+    quotes = {s: q for s, (q, _) in data.items()}
+    ranked = sorted(
+        (s for s in symbols if "error" not in quotes[s] and quotes[s].get("change_percent") is not None),
+        key=lambda s: quotes[s]["change_percent"], reverse=True,
+    )
+    parts = [f"Relative Performance of {', '.join(symbols)} (today):",
+             f"  {'Rank':<5}{'Symbol':<8}{'Price':>11}{'Change':>10}   Day range"]
+    for rank, s in enumerate(ranked, 1):
+        q = quotes[s]
+        parts.append(
+            f"  {rank:<5}{s:<8}{_fmt(q.get('current_price'), '${:,.2f}'):>11}"
+            f"{_fmt(q.get('change_percent'), '{:+.2f}%'):>10}   "
+            f"{_fmt(q.get('low'), '{:,.2f}')}-{_fmt(q.get('high'), '{:,.2f}')}"
+        )
+    for s in symbols:
+        if s not in ranked:
+            parts.append(f"  {'-':<5}{s:<8}{quotes[s].get('error', 'no quote data')}")
+    if len(ranked) >= 2:
+        lead, lag = ranked[0], ranked[-1]
+        spread = quotes[lead]["change_percent"] - quotes[lag]["change_percent"]
+        parts.append(f"  {lead} leads {lag} by {spread:.2f} percentage points")
+
+    parts.append("\nRecent News:")
+    for s in symbols:
+        for n in data[s][1][:COMPARE_NEWS_PER_SYMBOL]:
+            if "error" in n:
+                parts.append(f"  {s}: {n['error']}")
+            else:
+                parts.append(f"  - {s}: {n['headline']}")
+
+    return "\n".join(parts)
@@ -0,0 +1,98 @@
+"""
+UPSTREAM HTTP
+- Purpose: The single path every scraper uses to call an upstream API.
+- Applies the upstream's rate scheduler (scheduler.py) before each request and
+  feeds 429 / Retry-After responses back into it, retrying while the caller's
+  lane deadline allows.
+- Responses go through the upstream HTTP cache (http_cache.py): fresh entries
+  are served without a request, stale ones are revalidated conditionally.
+- Calls made for a cancelled request (cancellation.py) are skipped, and the
+  rate-scheduler wait never outlasts the request's deadline.
+- Each request's timeout adapts to the endpoint's live latency percentiles
+  (latency.py); the caller's timeout applies until enough samples exist.
+- Requests are recorded to / replayed from the active cassette (cassette.py)
+  when CASSETTE_MODE is set.
+"""
+
+import time
+from urllib.parse import urlparse
+
+import cancellation
+import cassette
+from latency import upstream_timeouts
+from lazy import lazy_import
+from scraping.http_cache import HTTP_CACHE_ENABLED, cache as http_cache
+from scraping.scheduler import get_scheduler, current_lane, LANE_DEADLINES
+
+requests = lazy_import("requests")
+
+MAX_429_RETRIES = 2
+
+
+def _retry_after(resp):
+    value = resp.headers.get("Retry-After")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def endpoint_name(url: str, upstream: str = None, endpoint: str = None) -> str:
+    """Latency-tracking name: "<upstream>:<endpoint or URL path>"."""
+    parsed = urlparse(url)
+    return f"{upstream or parsed.netloc}:{endpoint or parsed.path}"
+
+
+def get(url: str, params: dict = None, timeout: float = 10, upstream: str = None,
+        endpoint: str = None):
+    """
+    requests.get through the HTTP cache and the upstream's scheduler; returns the
+    response. endpoint names the call for latency tracking when the URL path
+    alone doesn't (e.g. MediaWiki's api.php modules).
+    """
+    cancellation.check("upstream_skipped")
+    name = endpoint_name(url, upstream, endpoint)
+    if not HTTP_CACHE_ENABLED:
+        return _fetch(name, url, params, timeout, upstream)
+    key, entry = http_cache.lookup(url, params)
+    if entry is not None and entry.fresh:
+        return entry.response
+    resp = _fetch(name, url, params, timeout, upstream, entry.validators() if entry else None)
+    if entry is not None and resp.status_code == 304:
+        return http_cache.revalidated_by(entry, resp)
+    return http_cache.store(key, resp)
+
+
+def _send(name: str, url: str, params: dict, timeout: float, headers: dict):
+    """One request with the endpoint's adaptive timeout; feeds its latency back."""
+    timeout = upstream_timeouts.timeout(name, timeout)
+    start = time.monotonic()
+    try:
+        resp = cassette.http_get(url, params, timeout, headers)
+    except requests.Timeout:
+        # Censored sample: the real latency was at least the timeout
+        upstream_timeouts.observe(name, timeout)
+        raise
+    if resp.status_code != 429:
+        upstream_timeouts.observe(name, time.monotonic() - start)
+    return resp
+
+
+def _fetch(name: str, url: str, params: dict, timeout: float, upstream: str, headers: dict = None):
+    scheduler = get_scheduler(upstream) if upstream else None
+    if scheduler is None:
+        return _send(name, url, params, timeout, headers)
+
+    deadline = time.monotonic() + LANE_DEADLINES[current_lane()]
+    request_deadline = cancellation.current().deadline
+    if request_deadline is not None:
+        deadline = min(deadline, request_deadline)
+    for attempt in range(MAX_429_RETRIES + 1):
+        scheduler.acquire(timeout=max(0.0, deadline - time.monotonic()))
+        cancellation.check("upstream_skipped")
+        resp = _send(name, url, params, timeout, headers)
+        if resp.status_code != 429:
+            scheduler.report_success()
+            return resp
+        scheduler.report_429(_retry_after(resp))
+    return resp
@@ -0,0 +1,202 @@
+"""
+UPSTREAM HTTP CACHE
+- Purpose: Honors the cache validators Wikipedia and Gamma send, so repeated
+  scrapes of the same URL stop downloading and re-parsing full bodies.
+- Entries are keyed by URL plus sorted params (the cassette request key, so
+  API tokens are left out) and keep the body, its parsed JSON, and the
+  ETag / Last-Modified / Cache-Control of the last 200 response.
+- A fresh entry (within Cache-Control max-age or Expires, less Age) is served
+  locally without touching the network or the rate scheduler. A stale entry
+  with validators is revalidated with If-None-Match / If-Modified-Since; a 304
+  reuses the stored body and parsed JSON and refreshes its freshness.
+- no-store responses are never kept. Responses without validators or a
+  freshness lifetime are not worth keeping and are skipped too.
+- Cached JSON is shared between callers and must be treated as read-only.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+
+from cassette import ReplayResponse, http_key
+from serialization import loads
+
+HTTP_CACHE_ENABLED = os.getenv("HTTP_CACHE_ENABLED", "1") == "1"
+HTTP_CACHE_MAX_ENTRIES = int(os.getenv("HTTP_CACHE_MAX_ENTRIES", "1024"))
+
+# Headers a 304 may update on the stored response
+_REFRESHED = ("cache-control", "expires", "etag", "last-modified", "date", "age")
+
+
+def _header(headers, name: str):
+    value = headers.get(name)
+    if value is None and isinstance(headers, dict):  # plain dicts are case-sensitive
+        value = next((v for k, v in headers.items() if k.lower() == name), None)
+    return value if isinstance(value, str) else None
+
+
+def _http_date(value: str):
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def cache_directives(value: str) -> dict:
+    """Cache-Control header as {directive: value or True}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+
+def freshness_lifetime(headers) -> float:
+    """Seconds a response stays fresh, from max-age or Expires, minus its Age."""
+    directives = cache_directives(_header(headers, "cache-control"))
+    if "no-cache" in directives:
+        return 0.0
+    lifetime = None
+    if "max-age" in directives:
+        try:
+            lifetime = float(directives["max-age"])
+        except ValueError:
+            lifetime = 0.0
+    else:
+        expires = _http_date(_header(headers, "expires"))
+        if expires is not None:
+            date = _http_date(_header(headers, "date")) or time.time()
+            lifetime = expires - date
+    if lifetime is None:
+        return 0.0
+    try:
+        age = float(_header(headers, "age") or 0)
+    except ValueError:
+        age = 0.0
+    return max(0.0, lifetime - age)
+
+
+class CachedResponse(ReplayResponse):
+    """A stored response; json() returns the body parsed once, at first use."""
+
+    def __init__(self, url: str, status_code: int, headers: dict, content: bytes):
+        super().__init__(url, status_code, headers, content)
+        self._json = None
+        self._parsed = False
+        self._parse_lock = threading.Lock()
+
+    def json(self):
+        if not self._parsed:
+            with self._parse_lock:
+                if not self._parsed:
+                    self._json = loads(self.content)
+                    self._parsed = True
+        return self._json
+
+
+class Entry:
+    __slots__ = ("response", "etag", "last_modified", "expires_at")
+
+    def __init__(self, response: CachedResponse, headers):
+        self.response = response
+        self.refresh(headers)
+
+    def refresh(self, headers):
+        self.etag = _header(headers, "etag")
+        self.last_modified = _header(headers, "last-modified")
+        self.expires_at = time.monotonic() + freshness_lifetime(headers)
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+    def validators(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    """Bounded LRU of upstream GET responses."""
+
+    def __init__(self, max_entries: int = HTTP_CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def lookup(self, url: str, params: dict = None):
+        """(key, entry or None) for a GET; counts a hit when the entry is fresh."""
+        key = http_key("GET", url, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return key, None
+            self._entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+        return key, entry
+
+    def store(self, key: str, resp):
+        """Keep a 200 response when its headers allow it; returns what to hand the caller."""
+        if resp.status_code != 200:
+            return resp
+        directives = cache_directives(_header(resp.headers, "cache-control"))
+        if "no-store" in directives:
+            self.discard(key)
+            return resp
+        entry = Entry(None, resp.headers)
+        if not (entry.etag or entry.last_modified or entry.fresh):
+            return resp
+        headers = {k: v for k, v in resp.headers.items() if isinstance(v, str)}
+        entry.response = CachedResponse(resp.url, 200, headers, resp.content)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry.response
+
+    def revalidated_by(self, entry: Entry, resp) -> CachedResponse:
+        """Apply a 304 to an entry and return its stored response."""
+        updates = {k: v for k, v in resp.headers.items()
+                   if isinstance(v, str) and k.lower() in _REFRESHED}
+        entry.response.headers.update(updates)
+        entry.refresh(entry.response.headers)
+        with self._lock:
+            self.revalidated += 1
+        return entry.response
+
+    def discard(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.revalidated = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": HTTP_CACHE_ENABLED,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "fresh_hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+            }
+
+
+cache = HttpCache()
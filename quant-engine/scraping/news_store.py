@@ -0,0 +1,128 @@
+"""
+INCREMENTAL NEWS STORE
+- Purpose: Stops get_company_news re-downloading and re-parsing the whole
+  lookback window for every refresh of an active symbol.
+- Keeps the articles seen per symbol plus a high-watermark (newest article
+  datetime) and the time of the last sync. A refresh asks upstream only for
+  the delta since the last sync and merges it in; a full-window fetch happens
+  only for new symbols or a longer lookback than the store covers.
+- Stored articles that fall out of the lookback are evicted on each sync, and
+  the number of tracked symbols is capped (least recently synced goes first).
+"""
+
+import os
+import threading
+import time
+
+from records import article_key
+
+NEWS_STORE_MAX_SYMBOLS = int(os.getenv("NEWS_STORE_MAX_SYMBOLS", "500"))
+NEWS_STORE_MAX_ITEMS = int(os.getenv("NEWS_STORE_MAX_ITEMS", "200"))
+DAY = 86400
+
+
+class SymbolNews:
+    """Articles for one symbol, newest first, with sync bookkeeping."""
+
+    __slots__ = ("items", "ids", "watermark", "synced_at", "lookback", "lock")
+
+    def __init__(self):
+        self.items = []
+        self.ids = set()
+        self.watermark = 0
+        self.synced_at = None
+        self.lookback = 0
+        self.lock = threading.Lock()
+
+    def evict(self, cutoff: float):
+        """Drop stored articles published before cutoff (epoch seconds)."""
+        kept = [a for a in self.items if (a.get("datetime") or 0) >= cutoff]
+        if len(kept) != len(self.items):
+            self.items = kept
+            self.ids = {article_key(a) for a in kept}
+
+    def merge(self, articles: list) -> int:
+        """Prepend unseen articles (upstream order is newest first); returns how many were new."""
+        fresh = []
+        for a in articles:
+            key = article_key(a)
+            if key in self.ids:
+                continue
+            self.ids.add(key)
+            fresh.append(a)
+            self.watermark = max(self.watermark, a.get("datetime") or 0)
+        if fresh:
+            self.items = (fresh + self.items)[:NEWS_STORE_MAX_ITEMS]
+            if len(self.ids) > len(self.items):
+                self.ids = {article_key(a) for a in self.items}
+        return len(fresh)
+
+
+class NewsStore:
+    """Per-symbol incremental news state."""
+
+    def __init__(self, max_symbols: int = NEWS_STORE_MAX_SYMBOLS):
+        self.max_symbols = max_symbols
+        self._symbols = {}
+        self._lock = threading.Lock()
+        self.full_fetches = 0
+        self.delta_fetches = 0
+
+    def _entry(self, symbol: str) -> SymbolNews:
+        with self._lock:
+            entry = self._symbols.get(symbol)
+            if entry is None:
+                if len(self._symbols) >= self.max_symbols:
+                    stalest = min(self._symbols, key=lambda s: self._symbols[s].synced_at or 0)
+                    del self._symbols[stalest]
+                entry = self._symbols[symbol] = SymbolNews()
+            return entry
+
+    def sync(self, symbol: str, days_back: int, fetch) -> list:
+        """
+        Bring symbol's articles up to date and return them, newest first.
+        fetch(since) must return upstream articles published on or after the
+        epoch time `since`; its exceptions propagate and leave the store as it was.
+        """
+        entry = self._entry(symbol)
+        with entry.lock:
+            now = time.time()
+            full = entry.synced_at is None or days_back > entry.lookback
+            # Day-granular upstream windows: re-read from the start of the last sync day
+            since = now - days_back * DAY if full else entry.synced_at - entry.synced_at % DAY
+            articles = fetch(since)
+            lookback = max(entry.lookback, days_back)
+            entry.evict(now - lookback * DAY)
+            entry.merge(articles)
+            entry.synced_at = now
+            entry.lookback = lookback
+            if full:
+                self.full_fetches += 1
+            else:
+                self.delta_fetches += 1
+            if days_back < lookback:
+                cutoff = now - days_back * DAY
+                return [a for a in entry.items if (a.get("datetime") or 0) >= cutoff]
+            return list(entry.items)
+
+    def get(self, symbol: str):
+        return self._symbols.get(symbol)
+
+    def clear(self):
+        with self._lock:
+            self._symbols.clear()
+            self.full_fetches = 0
+            self.delta_fetches = 0
+
+    def stats(self) -> dict:
+        symbols = list(self._symbols.values())
+        return {
+            "symbols": len(symbols),
+            "max_symbols": self.max_symbols,
+            "articles": sum(len(e.items) for e in symbols),
+            "full_fetches": self.full_fetches,
+            "delta_fetches": self.delta_fetches,
+        }
+
+
+store = NewsStore()
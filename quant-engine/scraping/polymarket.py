@@ -4,28 +4,39 @@ POLYMARKET SCRAPER
 - Purpose: Fetches live betting odds and market sentiment for specific events.
 """
 
-import requests
+import os
+
+from cache import cached
+from lazy import lazy_import
+from query import analyze
+import records
+from scraping import http
+from timeseries import store as timeseries, market_key
+
+requests = lazy_import("requests")
 
 API_URL = "https://clob.polymarket.com"
 GAMMA_URL = "https://gamma-api.polymarket.com"
+MARKETS_CACHE_TTL = float(os.getenv("MARKETS_CACHE_TTL", "60"))
 
 
 def search_markets(query: str, limit: int = 20) -> list:
     """Search Polymarket for relevant prediction markets using native text search."""
+    return _search(list(analyze(query).keywords), limit)
+
+
+# Keyed by the question's keywords, so rephrasings share entries
+@cached("polymarket:markets", MARKETS_CACHE_TTL)
+def _search(keywords: list, limit: int) -> list:
     try:
-        # Extract keywords for search
-        stop_words = {'will', 'what', 'when', 'where', 'which', 'would', 'could', 'should',
-                      'does', 'have', 'been', 'that', 'this', 'with', 'from', 'about',
-                      'the', 'and', 'for', 'not', 'but', 'are', 'was', 'were'}
-        keywords = [w.lower().strip('.,!?') for w in query.split()
-                    if len(w) > 2 and w.lower().strip('.,!?') not in stop_words]
         search_query = ' '.join(keywords[:5])
 
         # Use Gamma API's native text search
-        resp = requests.get(
+        resp = http.get(
             f"{GAMMA_URL}/markets",
             params={"closed": "false", "limit": limit, "query": search_query},
             timeout=10,
+            upstream="polymarket",
         )
         resp.raise_for_status()
         markets = resp.json()
@@ -42,26 +53,35 @@ def search_markets(query: str, limit: int = 20) -> list:
         relevant.sort(key=lambda x: x[0], reverse=True)
         relevant = [m for _, m in relevant]
 
-        return [
-            {
-                "question": m.get("question") or m.get("title", "Unknown"),
-                "description": (m.get("description") or "")[:200],
-                "outcome_yes": m.get("outcomePrices", [None, None])[0]
-                if isinstance(m.get("outcomePrices"), list) and len(m.get("outcomePrices", [])) > 0
-                else m.get("bestBid"),
-                "outcome_no": m.get("outcomePrices", [None, None])[1]
-                if isinstance(m.get("outcomePrices"), list) and len(m.get("outcomePrices", [])) > 1
-                else m.get("bestAsk"),
-                "volume": m.get("volume"),
-                "liquidity": m.get("liquidity"),
-                "end_date": m.get("endDate"), "slug": m.get("slug"),
-            }
-            for m in relevant[:5]
-        ]
+        results = [records.market(m) for m in relevant[:5]]
+        for r in results:
+            if r["slug"] and r["outcome_yes"] is not None:
+                timeseries.record(market_key(r["slug"]), r["outcome_yes"])
+        return results
     except Exception as e:
         return [{"error": f"Polymarket search failed: {str(e)}"}]
 
 
+def get_top_markets(limit: int = 10) -> list:
+    """Open markets with the highest total trading volume."""
+    try:
+        resp = http.get(
+            f"{GAMMA_URL}/markets",
+            params={"closed": "false", "limit": limit, "order": "volumeNum", "ascending": "false"},
+            timeout=10,
+            upstream="polymarket",
+            endpoint="top-markets",
+        )
+        resp.raise_for_status()
+        results = [records.market(m) for m in resp.json()]
+        for r in results:
+            if r["slug"] and r["outcome_yes"] is not None:
+                timeseries.record(market_key(r["slug"]), r["outcome_yes"])
+        return results
+    except Exception as e:
+        return [{"error": f"Polymarket top markets failed: {str(e)}"}]
+
+
 def get_polymarket_context(query: str) -> str:
     """Get Polymarket data as a text summary for context."""
     markets = search_markets(query)
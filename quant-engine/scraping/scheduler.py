@@ -0,0 +1,205 @@
+"""
+UPSTREAM REQUEST SCHEDULER
+- Purpose: Keeps each upstream API inside its rate budget (Finnhub's free tier
+  allows 60 calls/minute) instead of letting every caller race into 429s.
+- One token bucket per upstream, shared by priority lanes:
+    interactive - /api/analyze (served first)
+    standard    - /api/scrape and other direct API calls
+    batch       - prefetch, snapshots and background jobs
+- Callers queue with a deadline; only the highest-priority waiter may take a
+  token. A 429 pauses the upstream for Retry-After (or an exponential backoff)
+  and halves the rate, which then recovers additively on success.
+- Lane is chosen per request through a context variable (see in_lane()).
+"""
+
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+LANES = ("interactive", "standard", "batch")
+LANE_PRIORITY = {lane: i for i, lane in enumerate(LANES)}
+LANE_DEADLINES = {
+    "interactive": float(os.getenv("SCHEDULER_INTERACTIVE_DEADLINE", "5")),
+    "standard": float(os.getenv("SCHEDULER_STANDARD_DEADLINE", "10")),
+    "batch": float(os.getenv("SCHEDULER_BATCH_DEADLINE", "60")),
+}
+MAX_BACKOFF = 60.0
+
+_current_lane = contextvars.ContextVar("scheduler_lane", default="interactive")
+
+
+class SchedulerTimeout(Exception):
+    """Raised when a request could not get a rate-limit slot before its deadline."""
+
+
+def current_lane() -> str:
+    return _current_lane.get()
+
+
+@contextmanager
+def in_lane(lane: str):
+    """Run upstream calls made in this context (and copied contexts) in `lane`."""
+    if lane not in LANE_PRIORITY:
+        raise ValueError(f"Unknown scheduler lane: {lane}")
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class _LaneStats:
+    __slots__ = ("depth", "acquired", "timeouts", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.depth = 0
+        self.acquired = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "queue_depth": self.depth,
+            "acquired": self.acquired,
+            "timeouts": self.timeouts,
+            "avg_wait_ms": round(self.wait_total / self.acquired * 1000, 2) if self.acquired else 0.0,
+            "max_wait_ms": round(self.wait_max * 1000, 2),
+        }
+
+
+class RateScheduler:
+    """Token-bucket rate limiter with priority lanes and adaptive backoff."""
+
+    def __init__(self, name: str, rate_per_minute: float, burst: int = 10):
+        self.name = name
+        self.configured_rate = rate_per_minute
+        self.rate = rate_per_minute
+        self.burst = burst
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._consecutive_429 = 0
+        self._throttled = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {lane: _LaneStats() for lane in LANES}
+
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._last_refill = now
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate / 60.0)
+
+    def acquire(self, lane: str = None, timeout: float = None) -> float:
+        """Block until a token is granted; returns the time waited in seconds."""
+        lane = lane or current_lane()
+        timeout = LANE_DEADLINES[lane] if timeout is None else timeout
+        stats = self._stats[lane]
+        start = time.monotonic()
+        deadline = start + timeout
+        entry = (LANE_PRIORITY[lane], next(self._seq))
+        with self._cond:
+            heapq.heappush(self._waiters, entry)
+            stats.depth += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if (self._waiters[0] == entry and self._tokens >= 1
+                            and now >= self._paused_until):
+                        self._tokens -= 1
+                        heapq.heappop(self._waiters)
+                        waited = now - start
+                        stats.acquired += 1
+                        stats.wait_total += waited
+                        stats.wait_max = max(stats.wait_max, waited)
+                        self._cond.notify_all()
+                        return waited
+                    if now >= deadline:
+                        self._waiters.remove(entry)
+                        heapq.heapify(self._waiters)
+                        stats.timeouts += 1
+                        self._cond.notify_all()
+                        raise SchedulerTimeout(
+                            f"{self.name} rate limit: no slot within {timeout:.1f}s ({lane} lane)"
+                        )
+                    next_token = max(0.0, (1 - self._tokens) * 60.0 / self.rate)
+                    wake = max(next_token, self._paused_until - now)
+                    self._cond.wait(min(max(wake, 0.001), deadline - now))
+            finally:
+                stats.depth -= 1
+
+    def report_429(self, retry_after: float = None):
+        """Upstream said slow down: pause and halve the rate."""
+        with self._cond:
+            self._consecutive_429 += 1
+            self._throttled += 1
+            if retry_after is None:
+                retry_after = min(MAX_BACKOFF, 2.0 ** self._consecutive_429)
+            self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+            self.rate = max(1.0, self.rate / 2)
+            self._tokens = 0.0
+
+    def report_success(self):
+        """Additive recovery toward the configured rate."""
+        if self.rate >= self.configured_rate and not self._consecutive_429:
+            return
+        with self._cond:
+            self._consecutive_429 = 0
+            self.rate = min(self.configured_rate, self.rate + self.configured_rate * 0.05)
+
+    def reset(self):
+        """Full bucket, no pause, configured rate and zeroed counters."""
+        with self._cond:
+            self.rate = self.configured_rate
+            self._tokens = float(self.burst)
+            self._last_refill = time.monotonic()
+            self._paused_until = 0.0
+            self._consecutive_429 = 0
+            self._throttled = 0
+            self._stats = {lane: _LaneStats() for lane in LANES}
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            self._refill(time.monotonic())
+            return {
+                "rate_per_minute": round(self.rate, 2),
+                "configured_rate_per_minute": self.configured_rate,
+                "tokens": round(self._tokens, 2),
+                "paused_for_s": round(max(0.0, self._paused_until - time.monotonic()), 2),
+                "throttled": self._throttled,
+                "lanes": {lane: s.as_dict() for lane, s in self._stats.items()},
+            }
+
+
+def _from_env(name: str, default_rate: float = None):
+    rate = os.getenv(f"{name.upper()}_RATE_PER_MIN")
+    rate = float(rate) if rate else default_rate
+    if not rate:
+        return None
+    burst = int(os.getenv(f"{name.upper()}_RATE_BURST", "10"))
+    return RateScheduler(name, rate, burst)
+
+
+# Finnhub is limited by default; others only when <NAME>_RATE_PER_MIN is set
+schedulers = {
+    name: s for name, s in (
+        ("finnhub", _from_env("finnhub", 60)),
+        ("polymarket", _from_env("polymarket")),
+        ("wikipedia", _from_env("wikipedia")),
+    ) if s is not None
+}
+
+
+def get_scheduler(upstream: str):
+    return schedulers.get(upstream)
+
+
+def all_stats() -> dict:
+    return {name: s.stats() for name, s in schedulers.items()}
@@ -3,72 +3,86 @@ WIKIPEDIA SCRAPER
 - Interacts with: Wikipedia API.
 - Purpose: Fetches background context, historical facts, or biographical info
   relevant to the user's question.
+- Entity queries seen before resolve to their article titles through the
+  learned entity map (entity_titles.py), skipping the search call.
 """
 
-import re
-import requests
+import os
+
+import dedup
+from cache import cached
+from lazy import lazy_import
+from query import analyze
+import records
+from scraping import http
+from scraping.entity_titles import titles as entity_titles
+
+requests = lazy_import("requests")
+
+WIKI_CACHE_TTL = float(os.getenv("WIKI_CACHE_TTL", "3600"))
 
 
 def _extract_wiki_query(question: str) -> str:
     """Extract entity names and key terms for Wikipedia search."""
-    words = question.split()
-    question_words = {'will', 'what', 'when', 'where', 'how', 'is', 'are', 'can',
-                      'do', 'does', 'should', 'would', 'could', 'the', 'a', 'an', 'by'}
-    proper_nouns = []
-    for i, w in enumerate(words):
-        clean = re.sub(r'[^a-zA-Z0-9\'-]', '', w)
-        if not clean:
-            continue
-        if clean[0].isupper() and len(clean) > 1:
-            if i == 0 and clean.lower() in question_words:
-                continue
-            proper_nouns.append(clean)
-
-    domain_terms = ['trillionaire', 'billionaire', 'net worth', 'wealth',
-                    'president', 'ceo', 'founder', 'market cap', 'ipo']
-    important = []
-    lower_q = question.lower()
-    for term in domain_terms:
-        if term in lower_q:
-            important.append(term)
-
-    if proper_nouns:
-        # Use just proper nouns for Wikipedia — domain terms cause noise
-        return ' '.join(proper_nouns)
-    return question
+    return analyze(question).wiki_query
 
 
 def search_wikipedia(query: str, max_results: int = 3) -> str:
     """Search Wikipedia and return summary text for the top results."""
-    wiki_query = _extract_wiki_query(query)
+    return _search(analyze(query).wiki_query, max_results)
+
+
+# Keyed by the derived search string, so questions about the same entities share entries
+@cached("wikipedia:search", WIKI_CACHE_TTL,
+        is_error=lambda text: text.startswith("Wikipedia scrape failed"))
+def _search(wiki_query: str, max_results: int) -> str:
+    try:
+        titles = entity_titles.lookup(wiki_query, max_results)
+        extracts = _extracts(titles) if titles else None
+        if titles and not any(extracts):
+            entity_titles.demote(wiki_query)
+            titles = None
+        if not titles:
+            titles = _search_titles(wiki_query, max_results)
+            if not titles:
+                return f"No Wikipedia results for: {wiki_query}"
+            extracts = _extracts(titles)
+        summaries = [
+            records.render_summary(title, extract)
+            for title, extract in zip(titles, extracts) if extract
+        ]
+
+        return "\n\n".join(summaries) if summaries else "No summaries found."
+
+    except Exception as e:
+        return f"Wikipedia scrape failed: {str(e)}"
+
+
+def _search_titles(wiki_query: str, max_results: int) -> list:
+    """Titles of the top search results; teaches the entity map what the query means."""
     search_url = "https://en.wikipedia.org/w/api.php"
     search_params = {
         "action": "query",
         "list": "search",
         "srsearch": wiki_query,
         "srlimit": max_results,
+        "srprop": "redirecttitle",
         "format": "json",
     }
+    resp = http.get(search_url, params=search_params, timeout=10, upstream="wikipedia",
+                    endpoint="search")
+    resp.raise_for_status()
+    results = resp.json().get("query", {}).get("search", [])
+    titles = [r["title"] for r in results]
+    entity_titles.learn_search(wiki_query, titles)
+    entity_titles.learn_redirects(
+        [{"from": r["redirecttitle"], "to": r["title"]} for r in results if r.get("redirecttitle")])
+    return titles
 
-    try:
-        resp = requests.get(search_url, params=search_params, timeout=10)
-        resp.raise_for_status()
-        results = resp.json().get("query", {}).get("search", [])
-
-        if not results:
-            return f"No Wikipedia results for: {query}"
 
-        summaries = []
-        for r in results:
-            title = r["title"]
-            summary = _get_page_summary(title)
-            if summary:
-                summaries.append(f"## {title}\n{summary}")
-
-        return "\n\n".join(summaries) if summaries else "No summaries found."
-
-    except Exception as e:
-        return f"Wikipedia scrape failed: {str(e)}"
+def _extracts(titles: list) -> list:
+    # Intros of related pages often repeat each other; keep the first copy
+    return dedup.dedupe_paragraphs([_get_page_summary(t) for t in titles])
 
 
 def _get_page_summary(title: str) -> str:
@@ -80,17 +94,17 @@ def _get_page_summary(title: str) -> str:
         "prop": "extracts",
         "exintro": True,
         "explaintext": True,
+        "redirects": 1,
         "format": "json",
     }
     try:
-        resp = requests.get(url, params=params, timeout=10)
+        resp = http.get(url, params=params, timeout=10, upstream="wikipedia", endpoint="extracts")
         resp.raise_for_status()
-        pages = resp.json().get("query", {}).get("pages", {})
+        data = resp.json().get("query", {})
+        entity_titles.learn_redirects(data.get("redirects"))
+        pages = data.get("pages", {})
         for page in pages.values():
-            extract = page.get("extract", "")
-            if len(extract) > 1500:
-                extract = extract[:1500] + "..."
-            return extract
+            return records.wiki_extract(page)
         return ""
     except Exception:
         return ""
\ No newline at end of file
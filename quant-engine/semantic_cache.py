@@ -0,0 +1,222 @@
+"""
+SEMANTIC ANSWER CACHE
+- Purpose: Reuses a recent /api/analyze answer for a question that is worded
+  differently but asks the same thing ("Will TSLA close above 300 this
+  week?" / "Tesla above $300 by Friday?"), which exact-key caching misses.
+- Questions are embedded locally with a signed feature-hashing vectorizer over
+  their words (NumPy only): company names map to tickers, stop words are
+  dropped, and tickers, numbers and direction words ("above", "below") weigh
+  more, so "above 300" and "below 300" stay apart.
+- Recent vectors live in one preallocated matrix; a lookup is a single
+  matrix-vector product for cosine similarity plus a top-1 pick.
+- An answer is reused only when similarity >= SEMANTIC_CACHE_THRESHOLD, the
+  resolved symbol and the rest of the request match, and the entry is younger
+  than SEMANTIC_CACHE_TTL. The oldest entry is overwritten when full.
+- Three things a bag of words can't weigh must match exactly: the question's
+  time window ("today", "this week", "next week", "December", "Q3",
+  "12/31", "in 2026"), whether it is negated ("will X not close
+  above ...") and its numbers ("above 200" vs "above 250", "$1.5k" =
+  "1500"). All join the scope; the words also stay in the vector.
+"""
+
+import os
+import re
+import threading
+import time
+import zlib
+
+from lazy import lazy_import
+from query import STOP_WORDS, QUESTION_WORDS, TICKER_NAMES
+
+np = lazy_import("numpy")
+
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "1") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.85"))
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "512"))
+SEMANTIC_CACHE_TTL = float(os.getenv("SEMANTIC_CACHE_TTL", os.getenv("ANALYZE_CACHE_TTL", "300")))
+DIM = 4096
+
+DIRECTION_WORDS = {"above", "below", "over", "under", "up", "down", "rise", "fall",
+                   "beat", "miss", "higher", "lower", "gain", "lose", "bullish", "bearish"}
+NEGATION_WORDS = {"not", "no", "never", "cannot"}
+# Negation and time-window words are kept: they change what is being asked
+_IGNORED = (STOP_WORDS | QUESTION_WORDS | {"by", "to", "of", "in", "on", "at"}) - NEGATION_WORDS - {"this", "next"}
+_WORD_RE = re.compile(r"[a-z0-9]+(?:\.[0-9]+)?")
+_NEGATION_RE = re.compile(
+    r"\b(?:not|no|never|cannot|(?:won|isn|doesn|don|can|aren|didn|wasn|weren|hasn|haven|wouldn)'?t)\b")
+
+_MONTHS = ("january", "february", "march", "april", "june", "july", "august",
+           "september", "october", "november", "december")
+_MONTH_ABBREVIATIONS = {m[:3]: m for m in _MONTHS} | {"sept": "september"}
+_WEEKDAYS = r"(?:mon|tues|wednes|thurs|fri|satur|sun)day"
+# (pattern, window) in order; every match contributes, so "December 2026" is two parts
+_WINDOWS = [
+    (re.compile(r"\b(?:today|tonight|end of (?:the )?day|eod)\b"), "today"),
+    (re.compile(r"\btomorrow\b"), "tomorrow"),
+    (re.compile(r"\bnext week\b"), "next-week"),
+    (re.compile(r"\b(?:this week|end of (?:the )?week|weekend|" + _WEEKDAYS + r")\b"), "this-week"),
+    (re.compile(r"\bnext month\b"), "next-month"),
+    (re.compile(r"\b(?:this month|end of (?:the )?month)\b"), "this-month"),
+    (re.compile(r"\bnext quarter\b"), "next-quarter"),
+    (re.compile(r"\b(?:this quarter|end of (?:the )?quarter)\b"), "this-quarter"),
+    (re.compile(r"\bnext year\b"), "next-year"),
+    (re.compile(r"\b(?:this year|end of (?:the )?year|year[- ]end)\b"), "this-year"),
+]
+_MONTH_RE = re.compile(r"\b(" + "|".join(_MONTHS) + "|" + "|".join(_MONTH_ABBREVIATIONS) + r")\b")
+# "may" is usually the verb; only read it as the month next to a date word
+_MAY_RE = re.compile(r"\b(?:in|by|of|during|before|end of) may\b|\bmay \d{1,2}\b")
+_QUARTER_RE = re.compile(r"\bq([1-4])\b")
+_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}(?:/\d{2,4})?)\b")
+# A bare 20xx is often a price target; only read it as a year after a date word
+_YEAR_RE = re.compile(r"\b(?:in|by|of|during|for|before|after|end of|" + "|".join(_MONTHS) + r")\s+(20\d{2})\b")
+# Numbers already read as part of the time window ("may 5" included)
+_WINDOW_NUMBER_RE = re.compile(
+    _DATE_RE.pattern + "|" + _QUARTER_RE.pattern + "|" + _YEAR_RE.pattern
+    + r"|\b(?:" + "|".join(_MONTHS) + "|" + "|".join(_MONTH_ABBREVIATIONS) + r"|may)\s+\d{1,2}\b")
+_NUMBER_RE = re.compile(r"(?<![\w.])\$?(\d[\d,]*(?:\.\d+)?)\s?(k|m|bn?|%)?(?![\w.])")
+_MULTIPLIERS = {"k": 1e3, "m": 1e6, "b": 1e9, "bn": 1e9}
+
+
+def time_window(question: str) -> str:
+    """Canonical time window(s) a question asks about, e.g. "december|y2026"; "" if none."""
+    lower = question.lower()
+    parts = {window for pattern, window in _WINDOWS if pattern.search(lower)}
+    parts.update(_MONTH_ABBREVIATIONS.get(m, m) for m in _MONTH_RE.findall(lower))
+    if _MAY_RE.search(lower):
+        parts.add("may")
+    parts.update(f"q{q}" for q in _QUARTER_RE.findall(lower))
+    parts.update(f"d{d}" for d in _DATE_RE.findall(lower))
+    parts.update(f"y{y}" for y in _YEAR_RE.findall(lower))
+    return "|".join(sorted(parts))
+
+
+def negated(question: str) -> bool:
+    return bool(_NEGATION_RE.search(question.lower()))
+
+
+def numbers(question: str) -> str:
+    """Canonical price targets and other figures, e.g. "300|5%"; dates and years are left out."""
+    lower = _WINDOW_NUMBER_RE.sub(" ", question.lower())
+    parts = set()
+    for value, suffix in _NUMBER_RE.findall(lower):
+        number = float(value.replace(",", "")) * _MULTIPLIERS.get(suffix, 1)
+        parts.add(f"{number:g}%" if suffix == "%" else f"{number:g}")
+    return "|".join(sorted(parts))
+
+
+def question_scope(question: str) -> str:
+    """What must match exactly, beyond the request scope, for two questions to share an answer."""
+    return f"{time_window(question)}#{'neg' if negated(question) else ''}#{numbers(question)}"
+
+
+def features(question: str) -> dict:
+    """Weighted bag of normalized words."""
+    weights = {}
+    for word in _WORD_RE.findall(question.lower()):
+        if word in _IGNORED:
+            continue
+        if word in TICKER_NAMES:
+            word = TICKER_NAMES[word].lower()
+            weight = 2.0
+        elif word.replace(".", "").isdigit() or word in DIRECTION_WORDS:
+            weight = 2.0
+        elif word.upper() in TICKER_NAMES.values():
+            weight = 2.0
+        else:
+            weight = 1.0
+        weights[word] = max(weights.get(word, 0.0), weight)
+    return weights
+
+
+def embed(question: str):
+    """Unit-length hashed vector for a question (all zeros if it has no features)."""
+    vec = np.zeros(DIM, dtype=np.float32)
+    for word, weight in features(question).items():
+        h = zlib.crc32(word.encode())
+        vec[h % DIM] += weight if (h >> 31) & 1 else -weight
+    norm = float(np.linalg.norm(vec))
+    return vec / norm if norm else vec
+
+
+def _scope_id(scope: str) -> int:
+    return zlib.crc32(scope.encode())
+
+
+class SemanticCache:
+    """Ring of recent question vectors with their encoded answers."""
+
+    def __init__(self, threshold: float = SEMANTIC_CACHE_THRESHOLD,
+                 size: int = SEMANTIC_CACHE_SIZE, ttl: float = SEMANTIC_CACHE_TTL):
+        self.threshold = threshold
+        self.size = size
+        self.ttl = ttl
+        self._matrix = None  # allocated on first add, with _scopes / _created
+        self._scopes = None
+        self._created = None
+        self._meta = [None] * size  # (scope, question, body)
+        self._next = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, question: str, scope: str):
+        """Best cached (body, question, similarity) for a matching scope, or None."""
+        scope = f"{scope}#{question_scope(question)}"
+        vec = embed(question)
+        now = time.monotonic()
+        with self._lock:
+            if self._matrix is None or not vec.any():
+                self.misses += 1
+                return None
+            live = (self._scopes == _scope_id(scope)) & (self._created >= now - self.ttl)
+            sims = np.where(live, self._matrix @ vec, -1.0)
+            best = int(np.argmax(sims))
+            similarity = float(sims[best])
+            # Scope ids are hashes: confirm the full scope on the winner
+            if similarity < self.threshold or self._meta[best][0] != scope:
+                self.misses += 1
+                return None
+            self.hits += 1
+            _, cached_question, body = self._meta[best]
+            return body, cached_question, round(similarity, 4)
+
+    def add(self, question: str, scope: str, body: bytes):
+        scope = f"{scope}#{question_scope(question)}"
+        vec = embed(question)
+        if not vec.any():
+            return
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.size, DIM), dtype=np.float32)
+                self._scopes = np.zeros(self.size, dtype=np.int64)
+                self._created = np.full(self.size, -np.inf)
+            i = self._next
+            self._matrix[i] = vec
+            self._scopes[i] = _scope_id(scope)
+            self._created[i] = time.monotonic()
+            self._meta[i] = (scope, question, body)
+            self._next = (i + 1) % self.size
+
+    def clear(self):
+        with self._lock:
+            if self._matrix is not None:
+                self._matrix[:] = 0
+                self._created[:] = -np.inf
+            self._meta = [None] * self.size
+            self._next = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": sum(m is not None for m in self._meta),
+                "size": self.size,
+                "threshold": self.threshold,
+                "ttl_s": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+semantic_cache = SemanticCache()
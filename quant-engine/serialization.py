@@ -0,0 +1,36 @@
+"""
+JSON SERIALIZATION
+- Purpose: One place that turns our result dicts into JSON bytes.
+- Uses orjson, which is several times faster than the stdlib encoder FastAPI
+  falls back to, and returns bytes that can be cached and written out as-is.
+"""
+
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+
+def dumps(content) -> bytes:
+    """Encode a result (dict / list / str) to compact JSON bytes."""
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def loads(body):
+    """Decode JSON bytes or str produced by dumps()."""
+    return orjson.loads(body)
+
+
+class FastJSONResponse(JSONResponse):
+    """Default response class for the app: renders with orjson."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def encoded_response(body: bytes, status_code: int = 200, headers: dict = None) -> Response:
+    """Write already-encoded JSON bytes straight to the client."""
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
@@ -0,0 +1,309 @@
+"""
+SHARED-MEMORY CACHE
+- Purpose: One cache shared by every uvicorn worker process on a host, so an
+  upstream answer fetched by one worker is a hit for all of them.
+- Backed by a multiprocessing.shared_memory segment split into fixed-size
+  slots, organised as a 4-way set-associative hash table.
+- Reads are lock-free (per-slot seqlock); writes take striped fcntl
+  byte-range locks plus an in-process thread lock. Fetch de-duplication locks
+  one byte per key (offset from the key hash), so only callers of the same
+  key wait on each other.
+- Slots hold a whole /api/scrape body by default (32 KiB); a larger value is
+  served uncached, counted in `oversize` and logged.
+- Selected with CACHE_BACKEND=shm (see cache.make_cache).
+"""
+
+import hashlib
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+
+try:
+    import fcntl
+except ImportError:  # Windows dev boxes: fall back to in-process locking only
+    fcntl = None
+
+SHM_CACHE_NAME = os.getenv("SHM_CACHE_NAME", "brightbet-cache")
+SHM_CACHE_SLOTS = int(os.getenv("SHM_CACHE_SLOTS", "2048"))
+SHM_CACHE_SLOT_SIZE = int(os.getenv("SHM_CACHE_SLOT_SIZE", "32768"))
+
+MAGIC = b"BBCACHE1"
+SEGMENT_HEADER = struct.Struct("<8sII")  # magic, slots, slot_size
+SEGMENT_HEADER_SIZE = 64
+# seq, key hash, expires (epoch seconds), key length, value length
+SLOT_HEADER = struct.Struct("<IQdII")
+WAYS = 4
+LOCK_STRIPES = 256
+READ_RETRIES = 3
+# Per-key fetch locks sit past the bucket stripes in the lock file's byte range
+FETCH_LOCK_BASE = 2 * LOCK_STRIPES
+
+log = logging.getLogger(__name__)
+
+
+def _hash_key(key: bytes) -> int:
+    """Process-independent 64-bit key hash (hash() is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class _Segment:
+    """A mapped shared-memory table plus the locks guarding its buckets."""
+
+    def __init__(self, name: str, slots: int, slot_size: int):
+        slots = max(WAYS, slots - slots % WAYS)
+        size = SEGMENT_HEADER_SIZE + slots * slot_size
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+            SEGMENT_HEADER.pack_into(self.shm.buf, 0, MAGIC, slots, slot_size)
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            magic, slots, slot_size = SEGMENT_HEADER.unpack_from(self.shm.buf, 0)
+            if magic != MAGIC:
+                raise RuntimeError(f"Shared memory segment {name!r} is not a cache segment")
+        # The segment outlives any single worker; only unlink() removes it.
+        try:
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except Exception:
+            pass
+
+        self.name = name
+        self.buf = self.shm.buf
+        self.slots = slots
+        self.slot_size = slot_size
+        self.buckets = slots // WAYS
+        self._thread_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self._fetch_locks = {}  # key hash -> [thread lock, users], only while in use
+        self._fetch_locks_guard = threading.Lock()
+        self._lock_fd = None
+        if fcntl is not None:
+            path = os.path.join(tempfile.gettempdir(), f"{name}.lock")
+            self._lock_fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    # -- locking -----------------------------------------------------------
+    def _acquire(self, lock: threading.Lock, offset: int, deadline: float = None) -> bool:
+        """Take the thread lock, then the byte at offset of the lock file (fcntl locks are per process)."""
+        timeout = -1 if deadline is None else max(0.0, deadline - time.monotonic())
+        if not lock.acquire(timeout=timeout):
+            return False
+        if self._lock_fd is None:
+            return True
+        while True:
+            try:
+                fcntl.lockf(self._lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, offset)
+                return True
+            except OSError:
+                if deadline is not None and time.monotonic() >= deadline:
+                    lock.release()
+                    return False
+                time.sleep(0.002)
+
+    def _release(self, lock: threading.Lock, offset: int):
+        if self._lock_fd is not None:
+            fcntl.lockf(self._lock_fd, fcntl.LOCK_UN, 1, offset)
+        lock.release()
+
+    @contextmanager
+    def bucket_lock(self, key_hash: int):
+        stripe = (key_hash % self.buckets) % LOCK_STRIPES
+        self._acquire(self._thread_locks[stripe], stripe)
+        try:
+            yield
+        finally:
+            self._release(self._thread_locks[stripe], stripe)
+
+    @contextmanager
+    def fetch_lock(self, key_hash: int, deadline: float):
+        """Cross-process single-flight lock for one key; yields False if the wait timed out."""
+        with self._fetch_locks_guard:
+            entry = self._fetch_locks.setdefault(key_hash, [threading.Lock(), 0])
+            entry[1] += 1
+        offset = FETCH_LOCK_BASE + (key_hash >> 2)  # stays inside a signed 64-bit off_t
+        acquired = self._acquire(entry[0], offset, deadline)
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                self._release(entry[0], offset)
+            with self._fetch_locks_guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._fetch_locks[key_hash]
+
+    # -- slots ---------------------------------------------------------------
+    def _slot_offset(self, index: int) -> int:
+        return SEGMENT_HEADER_SIZE + index * self.slot_size
+
+    def _bucket_slots(self, key_hash: int):
+        first = (key_hash % self.buckets) * WAYS
+        return range(first, first + WAYS)
+
+    def read(self, key: bytes, key_hash: int, now: float):
+        """Lock-free lookup; returns the value bytes or None."""
+        for index in self._bucket_slots(key_hash):
+            off = self._slot_offset(index)
+            for _ in range(READ_RETRIES):
+                seq, h, expires, key_len, val_len = SLOT_HEADER.unpack_from(self.buf, off)
+                if seq & 1:
+                    continue  # writer in progress
+                if h != key_hash or expires < now or key_len != len(key):
+                    break
+                start = off + SLOT_HEADER.size
+                payload = bytes(self.buf[start:start + key_len + val_len])
+                if struct.unpack_from("<I", self.buf, off)[0] != seq:
+                    continue  # torn read, retry
+                if payload[:key_len] == key:
+                    return payload[key_len:]
+                break
+        return None
+
+    def write(self, key: bytes, key_hash: int, value: bytes, expires: float, now: float) -> bool:
+        """Store value in the key's bucket; caller holds bucket_lock."""
+        if SLOT_HEADER.size + len(key) + len(value) > self.slot_size:
+            return False
+        victim, victim_expires = None, None
+        for index in self._bucket_slots(key_hash):
+            _, h, slot_expires, key_len, _ = SLOT_HEADER.unpack_from(self.buf, self._slot_offset(index))
+            if h == key_hash and key_len == len(key):
+                victim = index
+                break
+            if slot_expires < now:
+                victim, victim_expires = index, float("-inf")
+            elif victim_expires is None or slot_expires < victim_expires:
+                victim, victim_expires = index, slot_expires
+
+        off = self._slot_offset(victim)
+        seq = struct.unpack_from("<I", self.buf, off)[0]
+        busy = (seq + 1) & 0xFFFFFFFF
+        struct.pack_into("<I", self.buf, off, busy)  # odd: readers back off
+        start = off + SLOT_HEADER.size
+        self.buf[start:start + len(key)] = key
+        self.buf[start + len(key):start + len(key) + len(value)] = value
+        SLOT_HEADER.pack_into(self.buf, off, busy, key_hash, expires, len(key), len(value))
+        struct.pack_into("<I", self.buf, off, (busy + 1) & 0xFFFFFFFF)
+        return True
+
+    def clear_slot(self, index: int):
+        off = self._slot_offset(index)
+        seq = struct.unpack_from("<I", self.buf, off)[0]
+        busy = (seq + 1) & 0xFFFFFFFF
+        struct.pack_into("<I", self.buf, off, busy)
+        SLOT_HEADER.pack_into(self.buf, off, busy, 0, 0.0, 0, 0)
+        struct.pack_into("<I", self.buf, off, (busy + 1) & 0xFFFFFFFF)
+
+    def slot_key(self, index: int) -> bytes:
+        off = self._slot_offset(index)
+        _, _, _, key_len, _ = SLOT_HEADER.unpack_from(self.buf, off)
+        start = off + SLOT_HEADER.size
+        return bytes(self.buf[start:start + key_len])
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+
+_segments = {}
+_segments_lock = threading.Lock()
+
+
+def _segment(name: str, slots: int, slot_size: int) -> _Segment:
+    with _segments_lock:
+        seg = _segments.get(name)
+        if seg is None:
+            seg = _segments[name] = _Segment(name, slots, slot_size)
+        return seg
+
+
+class SharedMemoryCache:
+    """Cross-process TTL cache of bytes values, namespaced by key prefix."""
+
+    def __init__(self, ttl: float, prefix: str = "", name: str = SHM_CACHE_NAME,
+                 slots: int = SHM_CACHE_SLOTS, slot_size: int = SHM_CACHE_SLOT_SIZE):
+        self.ttl = ttl
+        self.prefix = prefix.encode()
+        self._seg = _segment(name, slots, slot_size)
+        self.hits = 0
+        self.misses = 0
+        self.oversize = 0
+
+    def _key(self, key) -> bytes:
+        return self.prefix + (key if isinstance(key, bytes) else str(key).encode())
+
+    def get(self, key):
+        """Return the cached bytes for key, or None if missing or expired."""
+        k = self._key(key)
+        value = self._seg.read(k, _hash_key(k), time.time())
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key, value: bytes, ttl: float = None):
+        """Store value under key; values larger than a slot are skipped."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        k = self._key(key)
+        h = _hash_key(k)
+        now = time.time()
+        with self._seg.bucket_lock(h):
+            stored = self._seg.write(k, h, value, now + ttl, now)
+        if not stored:
+            self.oversize += 1
+            log.warning("shm cache %s: %d-byte value does not fit a %d-byte slot; not cached "
+                        "(raise SHM_CACHE_SLOT_SIZE)", self.prefix.decode(), len(value), self._seg.slot_size)
+
+    def get_or_fetch(self, key, fetch, ttl: float = None, wait: float = 15.0):
+        """
+        Return the cached value, or call fetch() once across all processes.
+        Other callers wait (up to `wait` seconds) for the first fetch to land.
+        fetch() returns (value_bytes, cacheable).
+        """
+        value = self.get(key)
+        if value is not None:
+            return value
+        k = self._key(key)
+        with self._seg.fetch_lock(_hash_key(k), time.monotonic() + wait) as owner:
+            if owner:
+                value = self.get(key)
+                if value is not None:
+                    return value
+            value, cacheable = fetch()
+            if cacheable:
+                self.set(key, value, ttl)
+            return value
+
+    def clear(self):
+        """Drop every entry under this cache's prefix."""
+        seg = self._seg
+        for index in range(seg.slots):
+            if seg.slot_key(index).startswith(self.prefix):
+                _, h, _, _, _ = SLOT_HEADER.unpack_from(seg.buf, seg._slot_offset(index))
+                with seg.bucket_lock(h):
+                    if seg.slot_key(index).startswith(self.prefix):
+                        seg.clear_slot(index)
+        self.hits = 0
+        self.misses = 0
+        self.oversize = 0
+
+
+def unlink(name: str = SHM_CACHE_NAME):
+    """Remove the shared segment (e.g. from a deploy script); workers must be stopped."""
+    with _segments_lock:
+        seg = _segments.pop(name, None)
+    if seg is not None:
+        seg.close()
+    try:
+        shm = shared_memory.SharedMemory(name=name)
+    except FileNotFoundError:
+        return
+    shm.close()
+    shm.unlink()
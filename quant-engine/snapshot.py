@@ -0,0 +1,221 @@
+"""
+MARKET SNAPSHOT
+- Purpose: Serves broad market context (index quotes, the top Polymarket
+  markets by volume, general market headlines) to polling dashboards without
+  any upstream call on the request path.
+- Each component is refreshed on its own interval (SNAPSHOT_<COMPONENT>_INTERVAL)
+  in the scheduler's batch lane, so snapshot traffic never competes with
+  interactive requests for rate budget.
+- By default refreshes are driven by reads: a read that finds components
+  due is answered with the current body and starts one background refresh
+  of them (stale-while-revalidate); only the very first build is waited
+  for. With SNAPSHOT_ENABLED=1 a background thread does the refreshing
+  instead; it starts on the first read and stops after SNAPSHOT_IDLE_STOP
+  seconds without one. Either way idle workers spend no upstream quota.
+- After every refresh the whole snapshot is serialized once and the bytes are
+  swapped in with a single reference assignment; readers only ever fetch the
+  current bytes, so any number of them is served at memory speed.
+- The snapshot carries a version (bumped on every rebuild) and generation
+  timestamps for the snapshot and each component. A component whose refresh
+  fails keeps its last good data and is marked stale with the error.
+"""
+
+import concurrent.futures
+import contextvars
+import os
+import threading
+import time
+
+from scraping import scheduler
+from scraping.finnHub import get_stock_quote, get_market_news
+from scraping.polymarket import get_top_markets
+from serialization import dumps
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "0") == "1"
+SNAPSHOT_IDLE_STOP = float(os.getenv("SNAPSHOT_IDLE_STOP", "600"))
+SNAPSHOT_SYMBOLS = [s.strip().upper() for s in os.getenv("SNAPSHOT_SYMBOLS", "SPY,QQQ,DIA,IWM").split(",")
+                    if s.strip()]
+SNAPSHOT_MARKETS = int(os.getenv("SNAPSHOT_MARKETS", "10"))
+SNAPSHOT_NEWS = int(os.getenv("SNAPSHOT_NEWS", "10"))
+INTERVALS = {
+    "indices": float(os.getenv("SNAPSHOT_INDICES_INTERVAL", "30")),
+    "markets": float(os.getenv("SNAPSHOT_MARKETS_INTERVAL", "120")),
+    "news": float(os.getenv("SNAPSHOT_NEWS_INTERVAL", "300")),
+}
+
+
+def _failed(value) -> bool:
+    if isinstance(value, dict):
+        return "error" in value
+    if isinstance(value, list):
+        return bool(value) and all(isinstance(v, dict) and "error" in v for v in value)
+    return value is None
+
+
+def index_quotes() -> list:
+    """Quotes for SNAPSHOT_SYMBOLS, fetched concurrently; failed symbols are left out."""
+    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(SNAPSHOT_SYMBOLS) or 1)) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, get_stock_quote, s)
+                   for s in SNAPSHOT_SYMBOLS]
+        quotes = [f.result() for f in futures]
+    good = [q for q in quotes if "error" not in q]
+    return good if good or not quotes else [quotes[0]]
+
+
+class Component:
+    __slots__ = ("name", "fetch", "interval", "data", "generated_at", "refreshed_at", "error")
+
+    def __init__(self, name: str, fetch, interval: float):
+        self.name = name
+        self.fetch = fetch
+        self.interval = interval
+        self.data = None
+        self.generated_at = None  # wall clock of the data being served
+        self.refreshed_at = None  # monotonic time of the last attempt
+        self.error = None
+
+    def due(self, now: float) -> bool:
+        return self.refreshed_at is None or now - self.refreshed_at >= self.interval
+
+    def as_dict(self) -> dict:
+        out = {"generated_at": self.generated_at, "interval_s": self.interval,
+               "stale": self.error is not None, "data": self.data}
+        if self.error is not None:
+            out["error"] = self.error
+        return out
+
+
+class MarketSnapshot:
+    """Periodically refreshed, pre-serialized market overview."""
+
+    def __init__(self, components: dict):
+        self.components = {name: Component(name, fetch, interval)
+                           for name, (fetch, interval) in components.items()}
+        self.version = 0
+        self.generated_at = None
+        self._body = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        self._revalidator = None
+        self._last_read = None  # monotonic
+        self.reads = 0
+
+    def body(self):
+        """Current encoded snapshot, or None before the first build."""
+        self.reads += 1
+        self._last_read = time.monotonic()
+        return self._body
+
+    def refresh(self, force: bool = False) -> bytes:
+        """Refresh due (or all) components and rebuild the body if anything changed."""
+        with self._refresh_lock, scheduler.in_lane("batch"):
+            now = time.monotonic()
+            due = [c for c in self.components.values() if force or c.due(now)]
+            for component in due:
+                self._refresh_component(component)
+            if due or self._body is None:
+                self._rebuild()
+            return self._body
+
+    def revalidate(self):
+        """Refresh due components on a background thread, unless one already is; never blocks."""
+        now = time.monotonic()
+        if not any(c.due(now) for c in self.components.values()):
+            return
+        with self._thread_lock:
+            if self._revalidator is not None and self._revalidator.is_alive():
+                return
+            self._revalidator = threading.Thread(target=self._revalidate, name="snapshot-revalidate",
+                                                 daemon=True)
+            self._revalidator.start()
+
+    def _revalidate(self):
+        try:
+            self.refresh()
+        except Exception:
+            pass  # keep serving the last snapshot; the next read retries
+
+    def _refresh_component(self, component: Component):
+        component.refreshed_at = time.monotonic()
+        try:
+            data = component.fetch()
+        except Exception as e:
+            data = {"error": str(e)}
+        if _failed(data):
+            component.error = data["error"] if isinstance(data, dict) else data[0]["error"]
+            if component.data is None:
+                component.data = data
+            return
+        component.data = data
+        component.error = None
+        component.generated_at = time.time()
+
+    def _rebuild(self):
+        self.version += 1
+        self.generated_at = time.time()
+        self._body = dumps({
+            "version": self.version,
+            "generated_at": self.generated_at,
+            "components": {name: c.as_dict() for name, c in self.components.items()},
+        })
+
+    def _next_wait(self) -> float:
+        now = time.monotonic()
+        return max(0.5, min(c.interval - (now - c.refreshed_at) if c.refreshed_at is not None else 0.0
+                            for c in self.components.values()))
+
+    def _idle(self) -> bool:
+        return self._last_read is None or time.monotonic() - self._last_read >= SNAPSHOT_IDLE_STOP
+
+    def _run(self):
+        while not self._stop.is_set() and not self._idle():
+            try:
+                self.refresh()
+            except Exception:
+                pass  # keep serving the last snapshot; retry on the next tick
+            self._stop.wait(self._next_wait())
+
+    def start(self):
+        """Start the refresher thread (idempotent); it exits once reads stop for SNAPSHOT_IDLE_STOP."""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                if self._last_read is None:
+                    self._last_read = time.monotonic()
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name="market-snapshot", daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def reset(self):
+        with self._refresh_lock:
+            for c in self.components.values():
+                c.data = c.generated_at = c.refreshed_at = c.error = None
+            self.version = 0
+            self.generated_at = None
+            self._body = None
+            self._last_read = None
+            self.reads = 0
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "generated_at": self.generated_at,
+            "bytes": len(self._body) if self._body is not None else 0,
+            "reads": self.reads,
+            "idle_stop_s": SNAPSHOT_IDLE_STOP,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "components": {name: {"interval_s": c.interval, "generated_at": c.generated_at,
+                                  "stale": c.error is not None}
+                           for name, c in self.components.items()},
+        }
+
+
+snapshot = MarketSnapshot({
+    "indices": (index_quotes, INTERVALS["indices"]),
+    "markets": (lambda: get_top_markets(SNAPSHOT_MARKETS), INTERVALS["markets"]),
+    "news": (lambda: get_market_news(SNAPSHOT_NEWS), INTERVALS["news"]),
+})
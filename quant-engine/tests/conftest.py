@@ -7,6 +7,48 @@ from unittest.mock import patch, MagicMock
 from fastapi.testclient import TestClient
 
 
+@pytest.fixture(autouse=True, scope="session")
+def _isolated_files(tmp_path_factory):
+    """Keep persisted state (the Wikipedia entity map) out of the working tree."""
+    from scraping import entity_titles
+    entity_titles.titles.path = str(tmp_path_factory.mktemp("state") / "wiki_titles.json")
+
+
+@pytest.fixture(autouse=True)
+def _reset_caches():
+    """Keep cached responses and recorded prices from leaking between tests."""
+    import cache
+    import cancellation
+    import compression
+    import hedging
+    import latency
+    import snapshot
+    import timeseries
+    from planner import source_planner
+    from semantic_cache import semantic_cache
+    from scraping import scheduler, news_store, http_cache, entity_titles
+    cache.clear_all()
+    timeseries.store.clear()
+    news_store.store.clear()
+    source_planner.reset()
+    semantic_cache.clear()
+    compression.clear()
+    cancellation.reset()
+    hedging.llm_hedge.reset()
+    latency.upstream_timeouts.reset()
+    snapshot.snapshot.reset()
+    entity_titles.titles.clear()
+    http_cache.cache.clear()
+    from app import job_queue
+    job_queue.reset()
+    for s in scheduler.schedulers.values():
+        s.reset()
+    yield
+    cache.clear_all()
+    timeseries.store.clear()
+    news_store.store.clear()
+
+
 @pytest.fixture
 def client():
     """FastAPI test client."""
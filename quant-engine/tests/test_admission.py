@@ -0,0 +1,118 @@
+"""
+Tests for admission.py and the 503 / Retry-After behaviour of app.py.
+"""
+
+import asyncio
+import threading
+
+import pytest
+from unittest.mock import patch
+
+
+def _make(**kwargs):
+    from admission import AdmissionController
+    params = dict(max_concurrent=1, max_queue=1, max_queue_time=0.2)
+    params.update(kwargs)
+    return AdmissionController("test", **params)
+
+
+class TestAdmissionController:
+    def test_admits_up_to_limit(self):
+        c = _make(max_concurrent=2)
+
+        async def run():
+            await c.acquire()
+            await c.acquire()
+        asyncio.run(run())
+        assert c.stats()["active"] == 2
+
+    def test_queue_full_rejected(self):
+        from admission import Overloaded
+        c = _make(max_queue=0)
+
+        async def run():
+            await c.acquire()
+            with pytest.raises(Overloaded) as exc:
+                await c.acquire()
+            assert exc.value.retry_after >= 1
+        asyncio.run(run())
+        assert c.rejected == 1
+
+    def test_queue_wait_times_out(self):
+        from admission import Overloaded
+        c = _make(max_queue_time=0.05)
+
+        async def run():
+            await c.acquire()
+            with pytest.raises(Overloaded):
+                await c.acquire()
+        asyncio.run(run())
+        assert c.timed_out == 1
+        assert c.stats()["queued"] == 0
+
+    def test_queued_request_admitted_on_release(self):
+        c = _make(max_queue_time=2)
+
+        async def run():
+            await c.acquire()
+            waiter = asyncio.ensure_future(c.acquire())
+            await asyncio.sleep(0.01)
+            assert c.stats()["queued"] == 1
+            c.release(0.1)
+            await waiter
+        asyncio.run(run())
+        assert c.stats()["active"] == 1
+        assert c.admitted == 2
+
+    def test_release_from_other_thread_wakes_waiter(self):
+        c = _make(max_queue_time=2)
+
+        async def run():
+            await c.acquire()
+            threading.Timer(0.05, c.release, args=(0.05,)).start()
+            await c.acquire()
+        asyncio.run(run())
+        assert c.admitted == 2
+
+    def test_adaptive_limit_shrinks_when_slow(self):
+        c = _make(max_concurrent=8, target_latency=1.0, adaptive=True)
+        c._active = 10
+        for _ in range(10):
+            c.release(4.0)
+        assert c.limit < 8
+
+    def test_retry_after_uses_throughput(self):
+        c = _make()
+        c._throughput = 2.0
+        c._active = 1
+        c._waiters.extend([None] * 5)
+        assert c.retry_after() == 3
+
+
+class TestEndpointsOverCapacity:
+    def test_analyze_returns_503_with_retry_after(self, client):
+        from admission import Overloaded
+        with patch("app.analyze_admission.acquire", side_effect=Overloaded("analyze over capacity", 4)):
+            resp = client.post("/api/analyze", json={"question": "Will it rain?"})
+        assert resp.status_code == 503
+        assert resp.headers["Retry-After"] == "4"
+
+    def test_scrape_returns_503(self, client):
+        from admission import Overloaded
+        with patch("app.scrape_admission.acquire", side_effect=Overloaded("scrape over capacity", 2)):
+            resp = client.get("/api/scrape", params={"question": "Will it rain?"})
+        assert resp.status_code == 503
+
+    @patch("app.search_markets", return_value=[])
+    @patch("app.search_wikipedia", return_value="Wiki")
+    def test_slot_released_after_request(self, mock_wiki, mock_markets, client):
+        from admission import scrape_admission
+        client.get("/api/scrape", params={"question": "Will it rain?"})
+        stats = scrape_admission.stats()
+        assert stats["active"] == 0
+        assert stats["avg_latency_s"] is not None
+
+    def test_admin_endpoint(self, client):
+        data = client.get("/api/admin/admission").json()
+        assert set(data) == {"analyze", "scrape"}
+        assert data["analyze"]["limit"] >= 1
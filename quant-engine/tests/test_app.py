@@ -202,6 +202,46 @@ class TestAnalyzeEndpoint:
         assert resp.status_code == 422  # validation error
 
 
+class TestMultiSymbolAnalyze:
+    SCORE = {"confidence_score": 60, "sentiment": "bullish", "reasoning": "r"}
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="No relevant Polymarket data found.")
+    @patch("app.search_wikipedia", return_value="Wiki")
+    @patch("app.get_market_sentiment")
+    @patch("app.get_comparative_context", return_value="Relative Performance of NVDA, AMD, INTC (today):")
+    def test_tickers_from_question(self, mock_compare, mock_single, mock_wiki, mock_poly, mock_score, client):
+        mock_score.return_value = dict(self.SCORE)
+        data = client.post("/api/analyze", json={"question": "Will NVDA outperform AMD and INTC?"}).json()
+        mock_compare.assert_called_once_with(["NVDA", "AMD", "INTC"])
+        mock_single.assert_not_called()
+        assert data["symbol"] == "NVDA"
+        assert data["symbols"] == ["NVDA", "AMD", "INTC"]
+        assert "Relative Performance" in mock_score.call_args[0][1]
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="")
+    @patch("app.get_comparative_context", return_value="Relative Performance")
+    def test_symbol_list_in_request(self, mock_compare, mock_wiki, mock_poly, mock_score, client):
+        mock_score.return_value = dict(self.SCORE)
+        data = client.post("/api/analyze", json={
+            "question": "Which chip stock wins this week?", "symbol": ["amd", " NVDA", "AMD"]}).json()
+        mock_compare.assert_called_once_with(["AMD", "NVDA"])
+        assert data["symbols"] == ["AMD", "NVDA"]
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="")
+    @patch("app.get_market_sentiment", return_value="Stock Quote for TSLA:")
+    def test_single_symbol_list_uses_single_context(self, mock_single, mock_wiki, mock_poly, mock_score, client):
+        mock_score.return_value = dict(self.SCORE)
+        data = client.post("/api/analyze", json={"question": "Up?", "symbol": ["TSLA"]}).json()
+        mock_single.assert_called_once_with("TSLA")
+        assert data["symbol"] == "TSLA"
+        assert "symbols" not in data
+
+
 # ---------------------------------------------------------------------------
 # GET /api/scrape
 # ---------------------------------------------------------------------------
@@ -237,6 +277,82 @@ class TestScrapeEndpoint:
         assert data["finnhub"] is None
         assert "symbol" not in data
 
+    @patch("app.get_company_news", return_value=[{"headline": "News"}])
+    @patch("app.get_stock_quote")
+    @patch("app.search_markets", return_value=[])
+    @patch("app.search_wikipedia", return_value="Wiki data")
+    def test_scrape_with_error_not_cached(self, mock_wiki, mock_markets, mock_quote, mock_news, client):
+        mock_quote.return_value = {"error": "Finnhub quote failed: 429"}
+        first = client.get("/api/scrape", params={"question": "Tesla stock"}).json()
+        assert first["finnhub"]["quote"]["error"].endswith("429")
+
+        mock_quote.return_value = {"current_price": 250}
+        second = client.get("/api/scrape", params={"question": "Tesla stock"}).json()
+        assert second["finnhub"]["quote"]["current_price"] == 250
+        assert mock_quote.call_count == 2
+
+        client.get("/api/scrape", params={"question": "Tesla stock"})
+        assert mock_quote.call_count == 2
+
     def test_scrape_missing_question(self, client):
         resp = client.get("/api/scrape")
         assert resp.status_code == 422
+
+
+# ---------------------------------------------------------------------------
+# POST /api/technicals
+# ---------------------------------------------------------------------------
+def _fake_candles(symbol, resolution="D", days_back=180):
+    closes = [100 + i + (i % 3) for i in range(60)]
+    return {
+        "symbol": symbol.upper(), "resolution": resolution,
+        "t": list(range(60)), "o": closes, "h": [c + 1 for c in closes],
+        "l": [c - 1 for c in closes], "c": closes, "v": [1000] * 60,
+    }
+
+
+class TestTechnicalsEndpoint:
+    @patch("app.get_candles", side_effect=_fake_candles)
+    def test_many_symbols_and_windows(self, mock_candles, client):
+        resp = client.post(
+            "/api/technicals",
+            json={"symbols": ["tsla", "AAPL", "TSLA"], "windows": [14, 20]},
+        )
+        assert resp.status_code == 200
+        data = resp.json()
+        assert [r["symbol"] for r in data["results"]] == ["TSLA", "AAPL"]
+        assert data["windows"] == [14, 20]
+        ind = data["results"][0]["indicators"]
+        assert ind["rsi_14"] is not None and ind["bb_upper_20"] is not None
+        assert "candles" not in data["results"][0]
+
+    @patch("app.get_candles", return_value={"error": "No candle data for ZZZZ"})
+    def test_upstream_error_per_symbol(self, mock_candles, client):
+        resp = client.post("/api/technicals", json={"symbols": ["ZZZZ"]})
+        assert resp.status_code == 200
+        assert resp.json()["results"][0]["error"] == "No candle data for ZZZZ"
+
+    def test_empty_symbols_rejected(self, client):
+        resp = client.post("/api/technicals", json={"symbols": []})
+        assert resp.status_code == 400
+
+    def test_bad_window_rejected(self, client):
+        resp = client.post("/api/technicals", json={"symbols": ["TSLA"], "windows": [1]})
+        assert resp.status_code == 400
+
+    @patch("app.get_candles", side_effect=_fake_candles)
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="Poly")
+    @patch("app.search_wikipedia", return_value="Wiki")
+    @patch("app.get_market_sentiment", return_value="Finnhub")
+    def test_analyze_includes_technicals(
+        self, mock_sentiment, mock_wiki, mock_poly, mock_score, mock_candles, client
+    ):
+        mock_score.return_value = {"confidence_score": 70, "sentiment": "bullish", "reasoning": "."}
+        resp = client.post(
+            "/api/analyze",
+            json={"question": "Will Tesla hit 300?", "include_technicals": True},
+        )
+        assert resp.status_code == 200
+        assert "RSI(14)" in mock_score.call_args[0][1]
+        assert resp.json()["sources"]["technicals"].startswith("Technical Indicators for TSLA")
@@ -0,0 +1,172 @@
+"""
+Tests for cache.py and serialization.py — encoded response caching.
+"""
+
+import concurrent.futures
+import json
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+
+class TestTTLCache:
+    def _make(self, ttl=60, max_entries=10):
+        from cache import TTLCache
+        return TTLCache(ttl, max_entries=max_entries)
+
+    def test_set_and_get(self):
+        c = self._make()
+        c.set("k", b'{"a":1}')
+        assert c.get("k") == b'{"a":1}'
+        assert c.hits == 1
+
+    def test_missing_key(self):
+        c = self._make()
+        assert c.get("nope") is None
+        assert c.misses == 1
+
+    def test_expired_entry(self):
+        c = self._make(ttl=10)
+        with patch("cache.time.monotonic", return_value=100.0):
+            c.set("k", b"v")
+        with patch("cache.time.monotonic", return_value=111.0):
+            assert c.get("k") is None
+        assert len(c) == 0
+
+    def test_zero_ttl_disables_caching(self):
+        c = self._make(ttl=0)
+        c.set("k", b"v")
+        assert c.get("k") is None
+
+    def test_lru_eviction(self):
+        c = self._make(max_entries=2)
+        c.set("a", b"1")
+        c.set("b", b"2")
+        c.get("a")
+        c.set("c", b"3")
+        assert c.get("b") is None
+        assert c.get("a") == b"1"
+        assert c.get("c") == b"3"
+
+    def test_concurrent_misses_fetch_once(self):
+        c = self._make()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.2)
+            return b"v", False
+
+        with concurrent.futures.ThreadPoolExecutor(4) as pool:
+            results = list(pool.map(lambda _: c.get_or_fetch("k", fetch), range(4)))
+        assert results == [b"v"] * 4
+        assert len(calls) == 1
+        assert c._flights == {}
+
+    def test_slow_fetch_does_not_block_other_keys(self):
+        c = self._make()
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return b"slow", True
+
+        with concurrent.futures.ThreadPoolExecutor(1) as pool:
+            pending = pool.submit(c.get_or_fetch, "slow", slow)
+            time.sleep(0.05)
+            # A key that shared "slow"'s lock when fetch locks were striped 64 ways
+            fast = next(f"fast{i}" for i in range(100000) if hash(f"fast{i}") % 64 == hash("slow") % 64)
+            started = time.monotonic()
+            assert c.get_or_fetch(fast, lambda: (b"fast", True)) == b"fast"
+            assert time.monotonic() - started < 1
+            release.set()
+            assert pending.result() == b"slow"
+
+
+class TestSerialization:
+    def test_dumps_returns_compact_bytes(self):
+        from serialization import dumps
+        body = dumps({"a": [1, 2], "b": None})
+        assert isinstance(body, bytes)
+        assert json.loads(body) == {"a": [1, 2], "b": None}
+
+    def test_dumps_non_str_keys(self):
+        from serialization import dumps
+        assert json.loads(dumps({1: "x"})) == {"1": "x"}
+
+    def test_loads_roundtrip(self):
+        from serialization import dumps, loads
+        payload = {"headline": "Tesla ✦", "price": 250.5}
+        assert loads(dumps(payload)) == payload
+
+
+class TestCachedEndpoints:
+    @patch("app.search_markets", return_value=[])
+    @patch("app.search_wikipedia", return_value="Wiki")
+    def test_scrape_served_from_cache(self, mock_wiki, mock_markets, client):
+        first = client.get("/api/scrape", params={"question": "Will it rain?"})
+        second = client.get("/api/scrape", params={"question": "Will it rain?"})
+        assert first.content == second.content
+        assert second.headers["content-type"] == "application/json"
+        assert mock_wiki.call_count == 1
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="Poly")
+    @patch("app.search_wikipedia", return_value="Wiki")
+    def test_analyze_served_from_cache(self, mock_wiki, mock_poly, mock_score, client):
+        mock_score.return_value = {"confidence_score": 60, "sentiment": "neutral", "reasoning": "."}
+        body = {"question": "Will it rain tomorrow?"}
+        first = client.post("/api/analyze", json=body)
+        second = client.post("/api/analyze", json=body)
+        assert first.json() == second.json()
+        assert mock_score.call_count == 1
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="Poly")
+    @patch("app.search_wikipedia", return_value="Wiki")
+    def test_analyze_errors_not_cached(self, mock_wiki, mock_poly, mock_score, client):
+        mock_score.return_value = {"error": "Groq inference failed: boom"}
+        body = {"question": "Will it rain tomorrow?"}
+        client.post("/api/analyze", json=body)
+        client.post("/api/analyze", json=body)
+        assert mock_score.call_count == 2
+
+
+class TestCachedDecorator:
+    def test_result_cached_by_arguments(self):
+        from cache import cached
+        calls = []
+
+        @cached("test:double", 60)
+        def double(x, factor=2):
+            calls.append(x)
+            return {"value": x * factor}
+
+        assert double(2) == {"value": 4}
+        assert double(2) == {"value": 4}
+        assert double(2, factor=3) == {"value": 6}
+        assert calls == [2, 2]
+
+    def test_errors_not_cached(self):
+        from cache import cached
+        calls = []
+
+        @cached("test:fail", 60)
+        def fail():
+            calls.append(1)
+            return [{"error": "upstream down"}]
+
+        fail()
+        fail()
+        assert len(calls) == 2
+
+    @patch("scraping.finnHub.requests.get")
+    def test_scraper_hits_upstream_once(self, mock_get, sample_stock_quote):
+        mock_get.return_value.json.return_value = sample_stock_quote
+        from scraping.finnHub import get_stock_quote
+
+        get_stock_quote("AAPL")
+        get_stock_quote("AAPL")
+        assert mock_get.call_count == 1
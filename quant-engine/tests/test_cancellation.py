@@ -0,0 +1,171 @@
+"""
+Tests for cancellation.py — stopping work for abandoned /api/analyze requests.
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+import cancellation
+from cancellation import CancelToken, Cancelled
+
+
+class _Disconnected:
+    async def is_disconnected(self):
+        return True
+
+
+class TestCancelToken:
+    def test_wait_wakes_on_cancel(self):
+        token = CancelToken()
+        never = concurrent.futures.Future()
+        threading.Timer(0.05, token.cancel, args=("client_closed",)).start()
+        start = time.monotonic()
+        with pytest.raises(Cancelled) as info:
+            token.wait(never, timeout=5)
+        assert info.value.reason == "client_closed"
+        assert time.monotonic() - start < 1
+        assert cancellation.stats()["client_closed"] == 1
+
+    def test_wait_stops_at_deadline(self):
+        token = CancelToken(deadline_s=0.05)
+        with pytest.raises(Cancelled) as info:
+            token.wait(concurrent.futures.Future(), timeout=5)
+        assert info.value.reason == "deadline"
+
+    def test_wait_timeout_and_result(self):
+        token = CancelToken()
+        with pytest.raises(concurrent.futures.TimeoutError):
+            token.wait(concurrent.futures.Future(), timeout=0.01)
+        done = concurrent.futures.Future()
+        done.set_result(3)
+        token.cancel("client_closed")
+        assert token.wait(done) == 3
+
+    def test_cancel_once(self):
+        token = CancelToken()
+        assert token.cancel("client_closed")
+        assert not token.cancel("deadline")
+        assert token.reason == "client_closed"
+
+
+class TestPropagation:
+    @patch("scraping.finnHub.requests.get")
+    def test_upstream_call_skipped(self, mock_get):
+        from scraping import http
+        token = CancelToken()
+        token.cancel("client_closed")
+        with cancellation.scope(token), pytest.raises(Cancelled):
+            http.get("https://gamma-api.polymarket.com/markets", params={"query": "x"})
+        mock_get.assert_not_called()
+        assert cancellation.stats()["upstream_skipped"] == 1
+
+    def test_scraper_does_not_swallow_cancellation(self):
+        from scraping.wikipedia import search_wikipedia
+        token = CancelToken()
+        token.cancel("deadline")
+        with cancellation.scope(token), pytest.raises(Cancelled):
+            search_wikipedia("Tesla stock")
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    @patch("scoring.GROQ_STREAM", True)
+    def test_stream_closed_on_cancel(self, mock_client):
+        from scoring import get_trade_confidence
+        from tests.test_scoring import _FakeStream, LONG_ANSWER
+        stream = _FakeStream(LONG_ANSWER)
+        mock_client.chat.completions.create.return_value = stream
+        token = CancelToken()
+        token.cancel("client_closed")
+        with cancellation.scope(token), pytest.raises(Cancelled):
+            get_trade_confidence("q", "c")
+        assert stream.closed
+        assert cancellation.stats()["llm_streams_closed"] == 1
+
+
+class TestRunCancellable:
+    def test_disconnect_returns_without_waiting_for_worker(self):
+        stopped = threading.Event()
+
+        def work():
+            try:
+                cancellation.current().wait(concurrent.futures.Future(), timeout=5)
+            finally:
+                stopped.set()
+
+        async def run():
+            token = CancelToken()
+            with pytest.raises(Cancelled) as info:
+                await cancellation.run_cancellable(_Disconnected(), token, work)
+            return info.value.reason
+
+        start = time.monotonic()
+        assert asyncio.run(run()) == "client_closed"
+        assert time.monotonic() - start < 1
+        assert stopped.wait(1)
+
+    def test_on_exit_waits_for_worker(self):
+        release, exited = threading.Event(), threading.Event()
+
+        def work():
+            release.wait(5)
+
+        async def run():
+            token = CancelToken()
+            with pytest.raises(Cancelled):
+                await cancellation.run_cancellable(_Disconnected(), token, work, on_exit=exited.set)
+            return exited.is_set()
+
+        assert asyncio.run(run()) is False  # cancelled, but the worker is still running
+        release.set()
+        assert exited.wait(1)
+
+    def test_result_passed_through(self):
+        async def run():
+            return await cancellation.run_cancellable(None, CancelToken(), lambda x: x * 2, 21)
+        assert asyncio.run(run()) == 42
+
+
+class TestAnalyzeEndpoint:
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="No relevant Polymarket data found.")
+    @patch("app.search_wikipedia")
+    @patch("cancellation.ANALYZE_DEADLINE", 0.2)
+    def test_deadline_returns_504_and_skips_llm(self, mock_wiki, mock_poly, mock_score, client):
+        release = threading.Event()
+        mock_wiki.side_effect = lambda q: release.wait(5) and "late"
+        try:
+            start = time.monotonic()
+            resp = client.post("/api/analyze", json={"question": "How does inflation work?"})
+        finally:
+            release.set()
+        assert resp.status_code == 504
+        assert time.monotonic() - start < 2
+        mock_score.assert_not_called()
+        assert cancellation.stats()["deadline"] == 1
+
+    @patch("app._run_analysis")
+    @patch("cancellation.ANALYZE_DEADLINE", 0.2)
+    def test_admission_slot_held_until_worker_exits(self, mock_run, client):
+        from admission import analyze_admission
+        release = threading.Event()
+        # Work that doesn't check the token, like a non-streamed Groq call
+        mock_run.side_effect = lambda request: release.wait(5) and {}
+        try:
+            assert client.post("/api/analyze", json={"question": "How does inflation work?"}).status_code == 504
+            assert analyze_admission.stats()["active"] == 1
+        finally:
+            release.set()
+        deadline = time.monotonic() + 2
+        while analyze_admission.stats()["active"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert analyze_admission.stats()["active"] == 0
+
+    def test_stats_endpoint(self, client):
+        resp = client.get("/api/admin/cancellation")
+        assert resp.status_code == 200
+        assert set(resp.json()) >= {"client_closed", "deadline", "upstream_skipped", "llm_skipped"}
@@ -0,0 +1,250 @@
+"""
+Tests for cassette.py — recording and replaying upstream traffic.
+"""
+
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from serialization import dumps
+
+
+def _response(payload, status=200, headers=None):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = headers or {"Content-Type": "application/json"}
+    resp.content = dumps(payload)
+    resp.json.return_value = payload
+    return resp
+
+
+@pytest.fixture
+def recorder(tmp_path):
+    import cassette
+    c = cassette.Cassette(str(tmp_path / "run"), "record")
+    previous = cassette.activate(c)
+    yield c
+    cassette.activate(previous)
+    c.close()
+
+
+def _replayer(path, latency="instant"):
+    import cassette
+    return cassette.Cassette(path, "replay", latency)
+
+
+class TestHttpRecordReplay:
+    @patch("scraping.finnHub.requests.get")
+    def test_roundtrip_without_network(self, mock_get, recorder):
+        import cassette
+        mock_get.return_value = _response({"c": 250.0}, headers={"ETag": '"abc"', "X-Noise": "1"})
+        cassette.http_get("https://finnhub.io/api/v1/quote", {"symbol": "TSLA", "token": "secret"})
+        recorder.close()
+
+        replay = _replayer(recorder.path)
+        cassette.activate(replay)
+        mock_get.side_effect = AssertionError("network used during replay")
+        # Different token, same request
+        resp = cassette.http_get("https://finnhub.io/api/v1/quote", {"token": "other", "symbol": "TSLA"})
+        assert resp.status_code == 200
+        assert resp.json() == {"c": 250.0}
+        assert resp.headers["etag"] == '"abc"'
+        assert "X-Noise" not in resp.headers
+        replay.close()
+
+    @patch("scraping.finnHub.requests.get")
+    def test_time_params_replay_on_another_day(self, mock_get, recorder):
+        import cassette
+        from datetime import datetime
+        recorded_at = 1_760_000_000.0
+        later = recorded_at + 3 * 86400 + 5000
+
+        def params(now):
+            day = lambda t: datetime.fromtimestamp(t).strftime("%Y-%m-%d")
+            return [
+                ("https://finnhub.io/api/v1/stock/candle", {"symbol": "TSLA", "from": int(now - 180 * 86400),
+                                                             "to": int(now)}),
+                ("https://finnhub.io/api/v1/company-news", {"symbol": "TSLA", "from": day(now - 7 * 86400),
+                                                             "to": day(now)}),
+            ]
+
+        mock_get.side_effect = lambda url, **kw: _response({"url": url})
+        with patch("cassette.time.time", return_value=recorded_at):
+            for url, p in params(recorded_at):
+                cassette.http_get(url, p)
+        recorder.close()
+
+        replay = _replayer(recorder.path)
+        cassette.activate(replay)
+        mock_get.side_effect = AssertionError("network used during replay")
+        with patch("cassette.time.time", return_value=later):
+            for url, p in params(later):
+                assert cassette.http_get(url, p).json() == {"url": url}
+            with pytest.raises(cassette.CassetteMiss):
+                cassette.http_get(url, dict(p, **{"from": "2001-01-01"}))
+        replay.close()
+
+    def test_cache_key_keeps_absolute_times(self):
+        import cassette
+        assert "from=2026-01-02" in cassette.http_key("GET", "u", {"from": "2026-01-02"})
+
+    def test_secrets_not_written(self, recorder, tmp_path):
+        import cassette
+        with patch("scraping.finnHub.requests.get", return_value=_response({})):
+            cassette.http_get("https://example.com/x", {"token": "SUPERSECRET"})
+        recorder.close()
+        import zlib
+        record = zlib.decompress((tmp_path / "run.dat").read_bytes())
+        assert b"SUPERSECRET" not in record
+
+    @patch("scraping.finnHub.requests.get")
+    def test_repeated_requests_replay_in_order(self, mock_get, recorder):
+        import cassette
+        mock_get.side_effect = [_response({"n": 1}), _response({"n": 2})]
+        for _ in range(2):
+            cassette.http_get("https://example.com/n")
+        recorder.close()
+
+        replay = _replayer(recorder.path)
+        cassette.activate(replay)
+        assert [cassette.http_get("https://example.com/n").json()["n"] for _ in range(3)] == [1, 2, 2]
+        replay.close()
+
+    def test_miss_raises(self, recorder):
+        import cassette
+        recorder.close()
+        replay = _replayer(recorder.path)
+        cassette.activate(replay)
+        with pytest.raises(cassette.CassetteMiss):
+            cassette.http_get("https://example.com/never")
+        assert replay.stats()["misses"] == 1
+        replay.close()
+
+    @patch("scraping.finnHub.requests.get")
+    def test_original_latency_replayed(self, mock_get, recorder):
+        import cassette
+        mock_get.return_value = _response({})
+        with patch("cassette.time.monotonic", side_effect=[10.0, 10.25]):
+            cassette.http_get("https://example.com/slow")
+        recorder.close()
+
+        replay = _replayer(recorder.path, latency="original")
+        cassette.activate(replay)
+        with patch("cassette.time.sleep") as mock_sleep:
+            cassette.http_get("https://example.com/slow")
+        mock_sleep.assert_called_once_with(0.25)
+        replay.close()
+
+    def test_torn_index_entry_ignored(self, recorder):
+        import cassette
+        with patch("scraping.finnHub.requests.get", return_value=_response({"ok": 1})):
+            cassette.http_get("https://example.com/a")
+        recorder.close()
+        with open(recorder.path + ".idx", "ab") as f:
+            f.write(b"\x00" * 5)
+        replay = _replayer(recorder.path)
+        assert len(replay) == 1
+        replay.close()
+
+
+class TestCompletionRecordReplay:
+    ANSWER = {"confidence_score": 81, "sentiment": "bullish", "reasoning": "Strong."}
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    def test_completion_replayed_without_key(self, mock_client, mock_groq_response, recorder):
+        import cassette
+        from scoring import get_trade_confidence
+        mock_client.chat.completions.create.return_value = mock_groq_response(json.dumps(self.ANSWER))
+        assert get_trade_confidence("q", "c") == self.ANSWER
+        recorder.close()
+
+        cassette.activate(_replayer(recorder.path))
+        mock_client.chat.completions.create.side_effect = AssertionError("network used")
+        with patch("scoring.GROQ_API_KEY", ""):
+            assert get_trade_confidence("q", "c") == self.ANSWER
+        cassette.active().close()
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    def test_request_timeout_not_part_of_key(self, mock_client, mock_groq_response, recorder):
+        import cassette
+        from scoring import get_trade_confidence
+        mock_client.chat.completions.create.return_value = mock_groq_response(json.dumps(self.ANSWER))
+        get_trade_confidence("q", "c", timeout=3.7)
+        recorder.close()
+
+        cassette.activate(_replayer(recorder.path))
+        mock_client.chat.completions.create.side_effect = AssertionError("network used")
+        assert get_trade_confidence("q", "c", timeout=1.2) == self.ANSWER
+        cassette.active().close()
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    @patch("scoring.GROQ_STREAM", True)
+    @patch("scoring.GROQ_REASONING_CHARS", None)
+    def test_streamed_completion_replayed(self, mock_client, recorder):
+        import cassette
+        from scoring import get_trade_confidence
+        text = json.dumps(self.ANSWER)
+
+        def chunks():
+            for i in range(0, len(text), 5):
+                chunk = MagicMock()
+                chunk.choices[0].delta.content = text[i:i + 5]
+                yield chunk
+
+        mock_client.chat.completions.create.return_value = chunks()
+        assert get_trade_confidence("q", "c") == self.ANSWER
+        recorder.close()
+
+        cassette.activate(_replayer(recorder.path))
+        mock_client.chat.completions.create.side_effect = AssertionError("network used")
+        assert get_trade_confidence("q", "c") == self.ANSWER
+        cassette.active().close()
+
+
+class TestAppReplay:
+    PAYLOADS = {
+        "finnhub.io/api/v1/quote": {"c": 250.0, "h": 255.0, "l": 245.0, "o": 248.0,
+                                    "pc": 247.0, "d": 3.0, "dp": 1.21, "t": 1700000000},
+        "finnhub.io/api/v1/company-news": [{"headline": "Tesla news", "summary": "S",
+                                            "source": "R", "url": "u", "datetime": 1}],
+        "gamma-api.polymarket.com/markets": [],
+        "en.wikipedia.org/w/api.php": {"query": {"search": []}},
+    }
+
+    def _fake_get(self, url, params=None, timeout=None, headers=None):
+        for fragment, payload in self.PAYLOADS.items():
+            if fragment in url:
+                return _response(payload)
+        raise AssertionError(url)
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    @patch("scraping.finnHub.requests.get")
+    def test_analyze_run_replays_offline(self, mock_get, mock_client, mock_groq_response, client, recorder):
+        import cache
+        import cassette
+        from scraping import news_store
+        from semantic_cache import semantic_cache
+
+        mock_get.side_effect = self._fake_get
+        mock_client.chat.completions.create.return_value = mock_groq_response(
+            json.dumps({"confidence_score": 66, "sentiment": "bullish", "reasoning": "r"}))
+        recorded = client.post("/api/analyze", json={"question": "Will Tesla hit 300?"}).json()
+        recorder.close()
+
+        cache.clear_all()
+        news_store.store.clear()
+        semantic_cache.clear()
+        cassette.activate(_replayer(recorder.path))
+        mock_get.side_effect = AssertionError("network used during replay")
+        mock_client.chat.completions.create.side_effect = AssertionError("network used during replay")
+        with patch("scoring.GROQ_API_KEY", ""):
+            replayed = client.post("/api/analyze", json={"question": "Will Tesla hit 300?"}).json()
+        cassette.active().close()
+
+        assert replayed["confidence_score"] == 66
+        assert replayed["sources"] == recorded["sources"]
@@ -0,0 +1,92 @@
+"""
+Tests for compression.py — compressed /api/scrape answers with ETags.
+"""
+
+import gzip
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+BIG = b'{"wikipedia":"' + b"Tesla, Inc. is an American electric vehicle company. " * 60 + b'"}'
+
+
+def _request(**headers):
+    return SimpleNamespace(headers={k.replace("_", "-"): v for k, v in headers.items()})
+
+
+class TestNegotiate:
+    def test_prefers_br_then_gzip(self):
+        from compression import negotiate, HAS_BROTLI
+        assert negotiate("gzip, deflate, br") == ("br" if HAS_BROTLI else "gzip")
+        assert negotiate("gzip") == "gzip"
+
+    def test_q_values(self):
+        from compression import negotiate
+        assert negotiate("br;q=0.1, gzip;q=0.9") == "gzip"
+        assert negotiate("gzip;q=0") is None
+        assert negotiate("identity") is None
+        assert negotiate("") is None
+
+
+class TestConditionalResponse:
+    def test_small_body_not_compressed(self):
+        from compression import conditional_response, etag
+        resp = conditional_response(_request(accept_encoding="gzip"), b'{"a":1}')
+        assert resp.body == b'{"a":1}'
+        assert resp.headers["etag"] == etag(b'{"a":1}')
+        assert "content-encoding" not in resp.headers
+
+    def test_large_body_gzip(self):
+        from compression import conditional_response
+        resp = conditional_response(_request(accept_encoding="gzip"), BIG)
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["etag"].endswith('-gzip"')
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert gzip.decompress(resp.body) == BIG
+        assert len(resp.body) < len(BIG) / 5
+
+    def test_brotli(self):
+        brotli = pytest.importorskip("brotli")
+        from compression import conditional_response
+        resp = conditional_response(_request(accept_encoding="br"), BIG)
+        assert resp.headers["content-encoding"] == "br"
+        assert brotli.decompress(resp.body) == BIG
+
+    def test_variants_memoized(self):
+        from compression import conditional_response
+        with patch("compression._compress", wraps=__import__("compression")._compress) as spy:
+            for _ in range(3):
+                conditional_response(_request(accept_encoding="gzip"), BIG)
+        assert spy.call_count == 1
+
+    def test_if_none_match_304_for_any_variant(self):
+        from compression import conditional_response
+        first = conditional_response(_request(accept_encoding="gzip"), BIG)
+        tag = first.headers["etag"]
+        for accept in ("gzip", ""):
+            resp = conditional_response(_request(accept_encoding=accept, if_none_match=tag), BIG)
+            assert resp.status_code == 304
+            assert resp.body == b""
+
+    def test_changed_body_not_304(self):
+        from compression import conditional_response, etag
+        resp = conditional_response(_request(if_none_match=etag(b"old")), b'{"new":1}')
+        assert resp.status_code == 200
+
+
+class TestScrapeEndpoint:
+    @patch("app.search_markets", return_value=[])
+    @patch("app.search_wikipedia", return_value="Inflation is a general increase in prices. " * 50)
+    def test_etag_and_compression(self, mock_wiki, mock_markets, client):
+        resp = client.get("/api/scrape", params={"question": "how does inflation work"},
+                          headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.json()["wikipedia"].startswith("Inflation")
+
+        again = client.get("/api/scrape", params={"question": "how does inflation work"},
+                           headers={"Accept-Encoding": "gzip", "If-None-Match": resp.headers["etag"]})
+        assert again.status_code == 304
+        assert again.content == b""
+        assert mock_wiki.call_count == 1
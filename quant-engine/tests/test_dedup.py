@@ -0,0 +1,95 @@
+"""
+Tests for dedup.py — MinHash near-duplicate filtering.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+np = pytest.importorskip("numpy")
+
+STORY = ("Tesla shares jumped eight percent on Tuesday after the electric vehicle maker "
+         "reported record quarterly deliveries that beat analyst expectations")
+
+
+class TestMinHash:
+    def test_identical_texts_fully_similar(self):
+        from dedup import similarity_matrix
+        sim = similarity_matrix([STORY, STORY])
+        assert sim[0, 1] == 1.0
+
+    def test_estimate_tracks_jaccard(self):
+        from dedup import similarity_matrix, shingles
+        other = STORY.replace("Tuesday", "Wednesday").replace("record", "strong")
+        a, b = shingles(STORY), shingles(other)
+        jaccard = len(a & b) / len(a | b)
+        sim = similarity_matrix([STORY, other])
+        assert abs(sim[0, 1] - jaccard) < 0.2
+
+    def test_unrelated_texts_dissimilar(self):
+        from dedup import similarity_matrix
+        sim = similarity_matrix([STORY, "Federal Reserve holds interest rates steady amid inflation"])
+        assert sim[0, 1] < 0.2
+
+    def test_signatures_shape_and_empty_text(self):
+        from dedup import signatures, NUM_PERM
+        sig = signatures([STORY, "", "one"])
+        assert sig.shape == (3, NUM_PERM)
+
+
+class TestDedupe:
+    def test_keeps_first_copy_in_order(self):
+        from dedup import dedupe
+        texts = [STORY, "Apple unveils new iPhone lineup", STORY + " on Tuesday", "Oil prices fall"]
+        assert dedupe(texts) == [STORY, "Apple unveils new iPhone lineup", "Oil prices fall"]
+
+    def test_limit_and_key(self):
+        from dedup import dedupe
+        items = [{"h": f"Headline number {i} about topic {i}"} for i in range(10)]
+        result = dedupe(items, key=lambda x: x["h"], limit=3)
+        assert result == items[:3]
+
+    def test_paragraphs_across_blocks(self):
+        from dedup import dedupe_paragraphs
+        blocks = [f"{STORY}\nFirst page detail.", f"{STORY}\nSecond page detail.", STORY]
+        out = dedupe_paragraphs(blocks)
+        assert out == [f"{STORY}\nFirst page detail.", "Second page detail.", ""]
+
+
+class TestScraperIntegration:
+    @patch("scraping.finnHub.requests.get")
+    def test_news_collapses_syndicated_copies(self, mock_get):
+        articles = [
+            {"headline": "Tesla deliveries beat", "summary": STORY, "source": s,
+             "url": f"https://example.com/{s}", "datetime": 1}
+            for s in ("Reuters", "Yahoo", "MarketWatch")
+        ] + [
+            {"headline": f"Unrelated story {i}", "summary": f"Different topic {i} entirely",
+             "source": "Test", "url": f"https://example.com/{i}", "datetime": i}
+            for i in range(10)
+        ]
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = articles
+        mock_get.return_value = mock_resp
+
+        from scraping.finnHub import get_company_news
+
+        result = get_company_news("TSLA")
+        assert len(result) == 5
+        assert [n["source"] for n in result].count("Reuters") == 1
+        assert all(n["source"] not in ("Yahoo", "MarketWatch") for n in result)
+
+    @patch("scraping.wikipedia.requests.get")
+    def test_wikipedia_drops_repeated_paragraphs(self, mock_get):
+        search = MagicMock()
+        search.json.return_value = {"query": {"search": [{"title": "Tesla, Inc."}, {"title": "Tesla Model 3"}]}}
+        page_a = MagicMock()
+        page_a.json.return_value = {"query": {"pages": {"1": {"extract": STORY}}}}
+        page_b = MagicMock()
+        page_b.json.return_value = {"query": {"pages": {"2": {"extract": f"{STORY}\nThe Model 3 is a sedan."}}}}
+        mock_get.side_effect = [search, page_a, page_b]
+
+        from scraping.wikipedia import search_wikipedia
+
+        result = search_wikipedia("Will Tesla stock rise?")
+        assert result.count(STORY) == 1
+        assert "## Tesla Model 3\nThe Model 3 is a sedan." in result
@@ -0,0 +1,135 @@
+"""
+Tests for scraping/entity_titles.py — learned Wikipedia entity titles.
+"""
+
+import time
+from unittest.mock import patch, MagicMock
+
+
+def _resp(payload):
+    resp = MagicMock()
+    resp.json.return_value = payload
+    resp.raise_for_status = MagicMock()
+    return resp
+
+
+def _page(title, extract):
+    return _resp({"query": {"pages": {"1": {"title": title, "extract": extract}}}})
+
+
+class TestConfidence:
+    def test_match_levels(self):
+        from scraping.entity_titles import match_confidence
+        assert match_confidence("Elon Musk's", "Elon Musk") == 0.95
+        assert match_confidence("Tesla", "Tesla, Inc.") == 0.8
+        assert match_confidence("Fed", "Federal Reserve") == 0.0
+        assert 0 < match_confidence("Tesla Musk", "Tesla Roadster") < 0.5
+
+
+class TestEntityTitles:
+    def _map(self, tmp_path):
+        from scraping.entity_titles import EntityTitles
+        return EntityTitles(str(tmp_path / "titles.json"))
+
+    def test_learn_and_lookup(self, tmp_path):
+        m = self._map(tmp_path)
+        assert m.lookup("Tesla", 3) is None
+        m.learn_search("Tesla", ["Tesla, Inc.", "Nikola Tesla"])
+        assert m.lookup("tesla", 3) == ["Tesla, Inc.", "Nikola Tesla"]
+        assert m.lookup("Tesla", 1) == ["Tesla, Inc."]
+        assert m.stats()["hits"] == 2
+
+    def test_low_confidence_not_used_until_confirmed(self, tmp_path):
+        m = self._map(tmp_path)
+        m.learn_search("Fed", ["Federal Reserve"])
+        assert m.lookup("Fed", 3) is None
+        for _ in range(8):
+            m.learn_search("Fed", ["Federal Reserve"])
+        assert m.lookup("Fed", 3) == ["Federal Reserve"]
+
+    def test_redirects_are_certain(self, tmp_path):
+        m = self._map(tmp_path)
+        m.learn_redirects([{"from": "Fed", "to": "Federal Reserve"}])
+        assert m.lookup("fed", 3) == ["Federal Reserve"]
+
+    def test_expired_entries_refresh(self, tmp_path):
+        m = self._map(tmp_path)
+        m.learn_search("Tesla", ["Tesla, Inc."])
+        with patch("scraping.entity_titles.WIKI_TITLE_TTL", 0.0):
+            time.sleep(0.01)
+            assert m.lookup("Tesla", 3) is None
+
+    def test_demote(self, tmp_path):
+        m = self._map(tmp_path)
+        m.learn_search("Tesla", ["Tesla, Inc."])
+        m.demote("Tesla")
+        assert m.lookup("Tesla", 3) is None
+
+    def test_persisted_across_instances(self, tmp_path):
+        from scraping.entity_titles import EntityTitles
+        m = self._map(tmp_path)
+        m.learn_search("Elon Musk", ["Elon Musk"])
+        m.save()
+        assert EntityTitles(m.path).lookup("Elon Musk", 3) == ["Elon Musk"]
+
+    @patch("scraping.entity_titles.WIKI_TITLES_SAVE_EVERY", 2)
+    def test_autosave(self, tmp_path):
+        import os
+        m = self._map(tmp_path)
+        m.learn_search("A", ["A"])
+        assert not os.path.exists(m.path)
+        m.learn_search("B", ["B"])
+        assert os.path.exists(m.path)
+
+    def test_damaged_file_ignored(self, tmp_path):
+        from scraping.entity_titles import EntityTitles
+        path = tmp_path / "titles.json"
+        path.write_bytes(b"{not json")
+        assert EntityTitles(str(path)).stats()["entries"] == 0
+
+
+class TestSearchWikipedia:
+    @patch("scraping.wikipedia.requests.get")
+    def test_known_entity_skips_search(self, mock_get):
+        from cache import clear_all
+        from scraping.wikipedia import search_wikipedia
+
+        mock_get.side_effect = [
+            _resp({"query": {"search": [{"title": "Tesla, Inc."}]}}),
+            _page("Tesla, Inc.", "Tesla is an EV maker."),
+        ]
+        assert "Tesla is an EV maker." in search_wikipedia("Will Tesla rise?")
+        clear_all()
+
+        mock_get.side_effect = [_page("Tesla, Inc.", "Tesla is an EV maker.")]
+        assert "Tesla is an EV maker." in search_wikipedia("Is Tesla overvalued?")
+        assert "srsearch" not in mock_get.call_args.kwargs["params"]
+
+    @patch("scraping.wikipedia.requests.get")
+    def test_dead_title_falls_back_to_search(self, mock_get):
+        from scraping.entity_titles import titles
+        from scraping.wikipedia import search_wikipedia
+
+        titles.learn_redirects([{"from": "Tesla", "to": "Old Title"}])
+        mock_get.side_effect = [
+            _resp({"query": {"pages": {"-1": {"title": "Old Title", "missing": ""}}}}),
+            _resp({"query": {"search": [{"title": "Tesla, Inc."}]}}),
+            _page("Tesla, Inc.", "Tesla is an EV maker."),
+        ]
+        assert "## Tesla, Inc." in search_wikipedia("Will Tesla rise?")
+        assert titles.lookup("Tesla", 3) == ["Tesla, Inc."]
+
+    @patch("scraping.wikipedia.requests.get")
+    def test_learns_redirects_from_search_and_extracts(self, mock_get):
+        from scraping.entity_titles import titles
+        from scraping.wikipedia import search_wikipedia
+
+        mock_get.side_effect = [
+            _resp({"query": {"search": [{"title": "Federal Reserve", "redirecttitle": "The Fed"}]}}),
+            _resp({"query": {"redirects": [{"from": "Fed Reserve", "to": "Federal Reserve"}],
+                             "pages": {"1": {"title": "Federal Reserve", "extract": "Central bank."}}}}),
+        ]
+        search_wikipedia("Will the Fed cut rates?")
+        assert mock_get.call_args.kwargs["params"]["redirects"] == 1
+        assert titles.lookup("The Fed", 3) == ["Federal Reserve"]
+        assert titles.lookup("Fed Reserve", 3) == ["Federal Reserve"]
@@ -63,6 +63,47 @@ class TestGetStockQuote:
         assert "error" in result
 
 
+class TestGetCandles:
+    @patch("scraping.finnHub.requests.get")
+    def test_successful_candles(self, mock_get):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {
+            "s": "ok", "t": [1, 2], "o": [1.0, 2.0], "h": [1.5, 2.5],
+            "l": [0.5, 1.5], "c": [1.2, 2.2], "v": [100, 200],
+        }
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        from scraping.finnHub import get_candles
+
+        result = get_candles("tsla", resolution="D", days_back=30)
+        assert result["symbol"] == "TSLA"
+        assert result["c"] == [1.2, 2.2]
+        call_params = mock_get.call_args[1]["params"]
+        assert call_params["resolution"] == "D"
+        assert call_params["to"] - call_params["from"] == pytest.approx(30 * 86400, abs=5)
+
+    @patch("scraping.finnHub.requests.get")
+    def test_no_data_status(self, mock_get):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = {"s": "no_data"}
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        from scraping.finnHub import get_candles
+
+        assert "error" in get_candles("ZZZZ")
+
+    @patch("scraping.finnHub.requests.get")
+    def test_api_error(self, mock_get):
+        mock_get.side_effect = Exception("Connection timeout")
+
+        from scraping.finnHub import get_candles
+
+        result = get_candles("TSLA")
+        assert "Finnhub candles failed" in result["error"]
+
+
 class TestGetCompanyNews:
     @patch("scraping.finnHub.requests.get")
     def test_successful_news(self, mock_get, sample_company_news):
@@ -190,3 +231,50 @@ class TestGetMarketSentiment:
 
         result = get_market_sentiment("aapl")
         assert "Stock Quote for AAPL" in result
+
+
+QUOTES = {
+    "NVDA": {"symbol": "NVDA", "current_price": 500.0, "high": 505.0, "low": 490.0, "change_percent": 2.1},
+    "AMD": {"symbol": "AMD", "current_price": 150.0, "high": 152.0, "low": 148.0, "change_percent": -0.4},
+    "INTC": {"symbol": "INTC", "current_price": 30.0, "high": 31.0, "low": 29.5, "change_percent": 0.5},
+}
+
+
+class TestComparativeContext:
+    @patch("scraping.finnHub.get_company_news", side_effect=lambda s: [{"headline": f"{s} news {i}"} for i in range(3)])
+    @patch("scraping.finnHub.get_stock_quote", side_effect=lambda s: QUOTES[s])
+    def test_ranked_table(self, mock_quote, mock_news):
+        from scraping.finnHub import get_comparative_context
+
+        result = get_comparative_context(["nvda", "AMD", "INTC"])
+        lines = result.splitlines()
+        assert lines[0] == "Relative Performance of NVDA, AMD, INTC (today):"
+        ranked = [line.split()[1] for line in lines[2:5]]
+        assert ranked == ["NVDA", "INTC", "AMD"]
+        assert "+2.10%" in lines[2] and "$500.00" in lines[2]
+        assert "NVDA leads AMD by 2.50 percentage points" in result
+        assert result.count("  - NVDA:") == 2
+
+    @patch("scraping.finnHub.get_company_news", return_value=[])
+    @patch("scraping.finnHub.get_stock_quote")
+    def test_quote_error_listed(self, mock_quote, mock_news):
+        mock_quote.side_effect = lambda s: QUOTES[s] if s == "AMD" else {"error": "Finnhub quote failed: timeout"}
+        from scraping.finnHub import get_comparative_context
+
+        result = get_comparative_context(["NVDA", "AMD"])
+        assert "NVDA    Finnhub quote failed: timeout" in result
+        assert "leads" not in result
+
+    def test_fetched_concurrently(self):
+        import time
+        from scraping.finnHub import get_quotes_and_news
+
+        def slow(result):
+            return lambda s: time.sleep(0.2) or result
+
+        with patch("scraping.finnHub.get_stock_quote", side_effect=slow({})), \
+                patch("scraping.finnHub.get_company_news", side_effect=slow([])):
+            start = time.monotonic()
+            data = get_quotes_and_news(["NVDA", "AMD", "INTC"])
+        assert time.monotonic() - start < 0.5
+        assert data["AMD"] == ({}, [])
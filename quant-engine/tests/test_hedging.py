@@ -0,0 +1,138 @@
+"""
+Tests for hedging.py — hedged LLM calls with a pre-score fallback.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+import cancellation
+from hedging import LLMHedge
+
+ANSWER = {"confidence_score": 70, "sentiment": "bullish", "reasoning": "r"}
+
+
+def _fallback():
+    return {"confidence_score": 55, "sentiment": "neutral", "reasoning": "pre", "source": "prescore"}
+
+
+def _llm(primary_delay=0.0, hedge_delay=0.0, primary=ANSWER, hedged=None):
+    """Fake get_trade_confidence; the hedge request answers 65 unless told otherwise."""
+    hedged = hedged or {**ANSWER, "confidence_score": 65}
+
+    def call(question, context, hedge=False, timeout=None):
+        time.sleep(hedge_delay if hedge else primary_delay)
+        return dict(hedged if hedge else primary)
+    return call
+
+
+class TestLLMHedge:
+    def test_fast_answer_is_returned(self):
+        hedge = LLMHedge(mode="hedge", fallback_after=2, hedge_delay=1)
+        with patch("scoring.get_trade_confidence", side_effect=_llm()) as mock_llm:
+            result = hedge.answer("q", "ctx", _fallback)
+        assert result == ANSWER
+        mock_llm.assert_called_once()
+        assert mock_llm.call_args.kwargs["hedge"] is False
+        assert hedge.stats()["primary_wins"] == 1
+        assert hedge.stats()["hedges"] == 0
+
+    def test_slow_primary_is_hedged(self):
+        hedge = LLMHedge(mode="hedge", fallback_after=2, hedge_delay=0.05)
+        with patch("scoring.get_trade_confidence", side_effect=_llm(primary_delay=1)):
+            started = time.monotonic()
+            result = hedge.answer("q", "ctx", _fallback)
+        assert time.monotonic() - started < 0.5
+        assert result["confidence_score"] == 65
+        assert result["hedged"] is True
+        stats = hedge.stats()
+        assert stats["hedges"] == 1
+        assert stats["hedge_wins"] == 1
+
+    def test_failed_primary_is_hedged_immediately(self):
+        hedge = LLMHedge(mode="hedge", fallback_after=2, hedge_delay=1.5)
+        with patch("scoring.get_trade_confidence", side_effect=_llm(primary={"error": "429"})):
+            started = time.monotonic()
+            result = hedge.answer("q", "ctx", _fallback)
+        assert time.monotonic() - started < 0.5
+        assert result["hedged"] is True
+
+    def test_timeout_falls_back(self):
+        hedge = LLMHedge(mode="fallback", fallback_after=0.05)
+        with patch("scoring.get_trade_confidence", side_effect=_llm(primary_delay=0.5)):
+            started = time.monotonic()
+            result = hedge.answer("q", "ctx", _fallback)
+        assert time.monotonic() - started < 0.4
+        assert result["fallback"] is True
+        assert result["fallback_reason"] == "timeout"
+        assert result["source"] == "prescore"
+        assert hedge.stats()["fallback_timeout"] == 1
+
+    def test_errors_fall_back(self):
+        hedge = LLMHedge(mode="hedge", fallback_after=2, hedge_delay=0.01)
+        failing = _llm(primary={"error": "500"}, hedged={"error": "503"})
+        with patch("scoring.get_trade_confidence", side_effect=failing):
+            result = hedge.answer("q", "ctx", _fallback)
+        assert result["fallback_reason"] == "error"
+        assert result["llm_errors"] == ["500", "503"]
+
+    def test_hedge_delay_follows_llm_latency(self):
+        hedge = LLMHedge(mode="hedge", fallback_after=4, hedge_delay=1.5)
+        assert hedge.hedge_delay() == 1.5
+        for _ in range(50):
+            hedge._sketch.observe(0.2)
+        assert 0.19 < hedge.hedge_delay() < 0.22
+
+    def test_calls_time_out_at_the_fallback_deadline(self):
+        hedge = LLMHedge(mode="fallback", fallback_after=2)
+        with patch("scoring.get_trade_confidence", side_effect=_llm()) as mock_llm:
+            hedge.answer("q", "ctx", _fallback)
+        assert 1.5 < mock_llm.call_args.kwargs["timeout"] <= 2
+
+    def test_abandoned_calls_are_counted(self):
+        hedge = LLMHedge(mode="fallback", fallback_after=0.05)
+        with patch("scoring.get_trade_confidence", side_effect=_llm(primary_delay=0.3)):
+            assert hedge.answer("q", "ctx", _fallback)["fallback"] is True
+            stats = hedge.stats()
+            assert stats["abandoned"] == 1
+            assert stats["abandoned_running"] == 1
+            assert stats["llm_running"] == 1
+            deadline = time.monotonic() + 2
+            while hedge.stats()["llm_running"] and time.monotonic() < deadline:
+                time.sleep(0.01)
+        stats = hedge.stats()
+        assert stats["abandoned_running"] == 0
+        assert stats["abandoned"] == 1
+
+    def test_pool_covers_every_admitted_request(self):
+        from admission import analyze_admission
+        assert LLMHedge().workers == 2 * analyze_admission.max_concurrent
+
+    def test_cancellation_stops_waiting(self):
+        hedge = LLMHedge(mode="fallback", fallback_after=5)
+        token = cancellation.CancelToken()
+        token.cancel("client_closed")
+        with patch("scoring.get_trade_confidence", side_effect=_llm(primary_delay=0.5)), \
+                cancellation.scope(token), pytest.raises(cancellation.Cancelled):
+            hedge.answer("q", "ctx", _fallback)
+
+
+class TestAnalyzeFallback:
+    @patch("hedging.llm_hedge", LLMHedge(mode="fallback", fallback_after=0.05))
+    @patch("scoring.get_trade_confidence", side_effect=_llm(primary_delay=0.5))
+    @patch("app.get_company_news", return_value=[{"headline": "h"}] * 3)
+    @patch("app.get_stock_quote", return_value={"change_percent": 4.0})
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="")
+    @patch("app.get_market_sentiment", return_value="Stock Quote for TSLA:")
+    def test_slow_llm_gets_uncached_prescore_answer(self, mock_single, mock_wiki, mock_poly, mock_quote,
+                                                     mock_news, mock_llm, client):
+        payload = {"question": "Will TSLA rise?", "symbol": "TSLA"}
+        data = client.post("/api/analyze", json=payload).json()
+        assert data["fallback"] is True
+        assert data["source"] == "prescore"
+        assert data["sentiment"] == "bullish"
+        assert "prescore" not in data  # PRESCORE_MODE stays off
+        assert client.post("/api/analyze", json=payload).json()["fallback"] is True
+        assert mock_llm.call_count == 2  # not served from the analyze cache
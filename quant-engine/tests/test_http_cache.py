@@ -0,0 +1,123 @@
+"""
+Tests for scraping/http_cache.py — honoring upstream cache validators.
+"""
+
+from unittest.mock import patch, MagicMock
+
+from serialization import dumps
+
+URL = "https://gamma-api.polymarket.com/markets"
+
+
+def _response(payload=None, status=200, headers=None):
+    resp = MagicMock()
+    resp.url = URL
+    resp.status_code = status
+    resp.headers = headers or {}
+    resp.content = dumps(payload) if payload is not None else b""
+    return resp
+
+
+class TestFreshness:
+    def test_max_age_minus_age(self):
+        from scraping.http_cache import freshness_lifetime
+        assert freshness_lifetime({"Cache-Control": "public, max-age=60"}) == 60
+        assert freshness_lifetime({"Cache-Control": "max-age=60", "Age": "20"}) == 40
+        assert freshness_lifetime({"Cache-Control": "no-cache, max-age=60"}) == 0
+
+    def test_expires(self):
+        from scraping.http_cache import freshness_lifetime
+        headers = {"Date": "Mon, 19 Oct 2026 10:00:00 GMT", "Expires": "Mon, 19 Oct 2026 10:05:00 GMT"}
+        assert freshness_lifetime(headers) == 300
+
+    def test_no_lifetime(self):
+        from scraping.http_cache import freshness_lifetime
+        assert freshness_lifetime({}) == 0
+        assert freshness_lifetime({"Expires": "garbage"}) == 0
+
+
+class TestConditionalGet:
+    @patch("scraping.finnHub.requests.get")
+    def test_fresh_entry_served_locally(self, mock_get):
+        from scraping import http
+        mock_get.return_value = _response([{"id": 1}], headers={"Cache-Control": "max-age=60"})
+        first = http.get(URL, params={"query": "tesla"})
+        second = http.get(URL, params={"query": "tesla"})
+        assert mock_get.call_count == 1
+        assert second.json() == [{"id": 1}]
+        assert second.json() is first.json()
+
+    @patch("scraping.finnHub.requests.get")
+    def test_params_are_part_of_the_key(self, mock_get):
+        from scraping import http
+        mock_get.return_value = _response([], headers={"Cache-Control": "max-age=60"})
+        http.get(URL, params={"query": "tesla"})
+        http.get(URL, params={"query": "apple"})
+        assert mock_get.call_count == 2
+
+    @patch("scraping.finnHub.requests.get")
+    def test_stale_entry_revalidated_with_304(self, mock_get):
+        from scraping import http
+        from scraping.http_cache import cache
+        mock_get.return_value = _response(
+            [{"id": 1}], headers={"ETag": 'W/"v1"', "Last-Modified": "Mon, 19 Oct 2026 10:00:00 GMT"})
+        first = http.get(URL, params={"query": "tesla"})
+        parsed = first.json()
+
+        mock_get.return_value = _response(status=304, headers={"Cache-Control": "max-age=60"})
+        again = http.get(URL, params={"query": "tesla"})
+        sent = mock_get.call_args.kwargs["headers"]
+        assert sent == {"If-None-Match": 'W/"v1"', "If-Modified-Since": "Mon, 19 Oct 2026 10:00:00 GMT"}
+        assert again.status_code == 200
+        assert again.json() is parsed
+        assert cache.stats()["revalidated"] == 1
+
+        # The 304 made the entry fresh again
+        http.get(URL, params={"query": "tesla"})
+        assert mock_get.call_count == 2
+
+    @patch("scraping.finnHub.requests.get")
+    def test_changed_resource_replaces_entry(self, mock_get):
+        from scraping import http
+        mock_get.return_value = _response([1], headers={"ETag": '"v1"'})
+        http.get(URL)
+        mock_get.return_value = _response([2], headers={"ETag": '"v2"'})
+        assert http.get(URL).json() == [2]
+        mock_get.return_value = _response(status=304)
+        assert http.get(URL).json() == [2]
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"v2"'}
+
+    @patch("scraping.finnHub.requests.get")
+    def test_uncacheable_responses_not_kept(self, mock_get):
+        from scraping import http
+        from scraping.http_cache import cache
+        for headers in ({}, {"Cache-Control": "no-store", "ETag": '"x"'}):
+            mock_get.return_value = _response([1], headers=headers)
+            http.get(URL)
+        mock_get.return_value = _response(status=500, headers={"ETag": '"x"'})
+        http.get(URL)
+        assert cache.stats()["entries"] == 0
+        assert mock_get.call_args.kwargs["headers"] is None
+
+    @patch("scraping.finnHub.requests.get")
+    def test_lru_bound(self, mock_get):
+        from scraping.http_cache import HttpCache
+        small = HttpCache(max_entries=2)
+        for q in ("a", "b", "c"):
+            key, _ = small.lookup(URL, {"q": q})
+            small.store(key, _response([q], headers={"ETag": '"e"'}))
+        assert small.stats()["entries"] == 2
+        assert small.lookup(URL, {"q": "a"})[1] is None
+
+
+class TestScrapers:
+    @patch("scraping.wikipedia.requests.get")
+    def test_wikipedia_page_summary_revalidates(self, mock_get):
+        from scraping.wikipedia import _get_page_summary
+        page = {"query": {"pages": {"1": {"extract": "Tesla is a company."}}}}
+        mock_get.return_value = _response(page, headers={"ETag": '"p1"'})
+        assert _get_page_summary("Tesla") == "Tesla is a company."
+        mock_get.return_value = _response(status=304)
+        assert _get_page_summary("Tesla") == "Tesla is a company."
+        assert mock_get.call_args.kwargs["params"]["titles"] == "Tesla"
+        assert mock_get.call_args.kwargs["headers"] == {"If-None-Match": '"p1"'}
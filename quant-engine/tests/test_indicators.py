@@ -0,0 +1,122 @@
+"""
+Tests for indicators.py — vectorized technical indicators.
+"""
+
+import math
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+
+def _ema_loop(x, alpha):
+    out = [x[0]]
+    for v in x[1:]:
+        out.append(alpha * v + (1 - alpha) * out[-1])
+    return np.array(out)
+
+
+def _rsi_loop(close, period):
+    delta = np.diff(close)
+    gain, loss = np.maximum(delta, 0), np.maximum(-delta, 0)
+    avg_gain, avg_loss = gain[:period].mean(), loss[:period].mean()
+    out = [math.nan] * period + [100 - 100 / (1 + avg_gain / avg_loss)]
+    for i in range(period, len(delta)):
+        avg_gain = (avg_gain * (period - 1) + gain[i]) / period
+        avg_loss = (avg_loss * (period - 1) + loss[i]) / period
+        out.append(100 - 100 / (1 + avg_gain / avg_loss))
+    return np.array(out)
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(42)
+    close = 100 + np.cumsum(rng.normal(size=600))
+    return {
+        "c": close,
+        "h": close + rng.uniform(0.1, 2.0, size=600),
+        "l": close - rng.uniform(0.1, 2.0, size=600),
+        "v": rng.integers(1_000, 50_000, size=600).astype(float),
+    }
+
+
+class TestMovingAverages:
+    @pytest.mark.parametrize("span", [3, 12, 26, 200])
+    def test_ema_matches_recurrence(self, prices, span):
+        from indicators import ema
+        expected = _ema_loop(prices["c"], 2 / (span + 1))
+        assert np.allclose(ema(prices["c"], span), expected)
+
+    def test_ema_long_series_is_stable(self):
+        from indicators import ema
+        x = np.linspace(1, 2, 20_000)
+        assert np.allclose(ema(x, alpha=0.01), _ema_loop(x, 0.01))
+
+    def test_sma(self, prices):
+        from indicators import sma
+        out = sma(prices["c"], 20)
+        assert np.isnan(out[:19]).all()
+        assert np.allclose(out[19:], np.convolve(prices["c"], np.ones(20) / 20, "valid"))
+
+    def test_two_dimensional_input(self, prices):
+        from indicators import ema
+        stacked = np.vstack([prices["c"], prices["c"][::-1]])
+        out = ema(stacked, 12)
+        assert np.allclose(out[0], ema(prices["c"], 12))
+        assert np.allclose(out[1], ema(prices["c"][::-1], 12))
+
+
+class TestOscillators:
+    def test_rsi_matches_wilder(self, prices):
+        from indicators import rsi
+        out = rsi(prices["c"], 14)
+        expected = _rsi_loop(prices["c"], 14)
+        assert np.isnan(out[:14]).all()
+        assert np.allclose(out[14:], expected[14:])
+
+    def test_rsi_all_gains_is_100(self):
+        from indicators import rsi
+        assert rsi(np.arange(1.0, 40.0), 14)[-1] == 100.0
+
+    def test_rsi_short_series_all_nan(self):
+        from indicators import rsi
+        assert np.isnan(rsi([1.0, 2.0, 3.0], 14)).all()
+
+    def test_macd_histogram(self, prices):
+        from indicators import macd
+        line, signal, hist = macd(prices["c"])
+        assert np.allclose(hist, line - signal)
+
+    def test_bollinger_ordering(self, prices):
+        from indicators import bollinger
+        upper, middle, lower = bollinger(prices["c"], 20)
+        valid = ~np.isnan(middle)
+        assert (upper[valid] >= middle[valid]).all()
+        assert (lower[valid] <= middle[valid]).all()
+
+    def test_atr_positive(self, prices):
+        from indicators import atr
+        out = atr(prices["h"], prices["l"], prices["c"], 14)
+        assert np.isnan(out[:13]).all()
+        assert (out[13:] > 0).all()
+
+    def test_vwap_constant_price(self):
+        from indicators import vwap
+        ones = np.ones(10)
+        assert np.allclose(vwap(ones * 5, ones * 5, ones * 5, ones * 100), 5.0)
+
+
+class TestSummary:
+    def test_summarize_keys_per_window(self, prices):
+        from indicators import summarize
+        summary = summarize(prices, [14, 30])
+        for key in ("rsi_14", "rsi_30", "atr_14", "bb_upper_30", "macd", "vwap"):
+            assert summary[key] is not None
+        assert summary["bars"] == 600
+
+    def test_format_summary(self, prices):
+        from indicators import summarize, format_summary
+        text = format_summary("tsla", summarize(prices))
+        assert text.startswith("Technical Indicators for TSLA")
+        assert "RSI(14)" in text
+        assert "MACD" in text
@@ -0,0 +1,211 @@
+"""
+Tests for jobs.py — the async /api/jobs queue.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from jobs import JobQueue, QueueFull
+
+
+async def _echo(payload):
+    return {"answer": payload["question"].upper()}
+
+
+def _wait_finished(queue, job, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not job.finished and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job
+
+
+class TestJobQueue:
+    def test_runs_requests_of_a_job(self):
+        queue = JobQueue(_echo, workers=1, db_path="")
+        job = _wait_finished(queue, queue.submit([{"question": "a"}, {"question": "b"}]))
+        assert job.status == "done"
+        assert job.results == [{"answer": "A"}, {"answer": "B"}]
+        stats = queue.stats()
+        assert stats["completed"] == 1
+        assert stats["depth"] == 0
+
+    def test_request_exception_becomes_error_result(self):
+        async def runner(payload):
+            if payload["question"] == "bad":
+                raise ValueError("boom")
+            return {"ok": True}
+
+        queue = JobQueue(runner, workers=1, db_path="")
+        job = _wait_finished(queue, queue.submit([{"question": "bad"}, {"question": "good"}]))
+        assert job.status == "done"
+        assert job.results == [{"error": "boom"}, {"ok": True}]
+
+    def test_long_poll_wakes_when_job_finishes(self):
+        release = threading.Event()
+
+        async def runner(payload):
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+            return {"ok": True}
+
+        queue = JobQueue(runner, workers=1, db_path="")
+        job = queue.submit([{"question": "q"}])
+        threading.Timer(0.1, release.set).start()
+        started = time.monotonic()
+        asyncio.run(queue.wait(job, 5))
+        assert job.status == "done"
+        assert time.monotonic() - started < 2
+
+    def test_long_poll_times_out(self):
+        release = threading.Event()
+
+        async def runner(payload):
+            await asyncio.get_running_loop().run_in_executor(None, release.wait)
+            return {}
+
+        queue = JobQueue(runner, workers=1, db_path="")
+        job = queue.submit([{"question": "q"}])
+        asyncio.run(queue.wait(job, 0.05))
+        assert not job.finished
+        assert job.waiters == []
+        release.set()
+        _wait_finished(queue, job)
+
+    def test_queue_full(self):
+        queue = JobQueue(_echo, workers=0, db_path="")
+        with patch("jobs.JOBS_MAX_QUEUE", 2):
+            queue.submit([{"question": "a"}])
+            queue.submit([{"question": "b"}])
+            with pytest.raises(QueueFull):
+                queue.submit([{"question": "c"}])
+        stats = queue.stats()
+        assert stats["depth"] == 2
+        assert stats["oldest_queued_age_s"] >= 0
+
+    def test_durable_jobs_survive_restart(self, tmp_path):
+        db = str(tmp_path / "jobs.sqlite")
+        first = JobQueue(_echo, workers=0, db_path=db)
+        job = first.submit([{"question": "later"}])
+
+        second = JobQueue(_echo, workers=1, db_path=db)
+        assert second.stats()["depth"] == 1
+        second.start()
+        resumed = _wait_finished(second, second.get(job.id))
+        assert resumed.results == [{"answer": "LATER"}]
+
+        # Finished jobs can be read back after they are gone from memory
+        third = JobQueue(_echo, workers=0, db_path=db)
+        stored = third.get(job.id)
+        assert stored.status == "done"
+        assert stored.results == [{"answer": "LATER"}]
+        assert third.stats()["depth"] == 0
+
+
+    def test_live_lease_is_not_reclaimed(self, tmp_path):
+        from jobs import JobStore
+        db = str(tmp_path / "jobs.sqlite")
+        first = JobQueue(_echo, workers=0, db_path=db)
+        job = first.submit([{"question": "busy"}])
+        job.started_at = time.time()
+        assert first._store.claim(job, first.owner)
+
+        # Another process starting up must not run a job whose owner is alive
+        assert JobQueue(_echo, workers=0, db_path=db).stats()["depth"] == 0
+
+        # ... but picks it up once the owner stops renewing its lease
+        store = JobStore(db)
+        store._db.execute("UPDATE jobs SET lease_until = ? WHERE id = ?", (time.time() - 1, job.id))
+        assert JobQueue(_echo, workers=0, db_path=db).stats()["depth"] == 1
+
+    def test_queued_job_is_claimed_once(self, tmp_path):
+        db = str(tmp_path / "jobs.sqlite")
+        JobQueue(_echo, workers=0, db_path=db).submit([{"question": "once"}])
+        a = JobQueue(_echo, workers=0, db_path=db)
+        b = JobQueue(_echo, workers=0, db_path=db)
+        job_a, job_b = (q.get(q._queue[0]) for q in (a, b))
+        assert a._store.claim(job_a, a.owner)
+        assert not b._store.claim(job_b, b.owner)
+
+    @patch("jobs.JOBS_LEASE", 0.3)
+    def test_heartbeat_renews_lease(self, tmp_path):
+        db = str(tmp_path / "jobs.sqlite")
+        release = threading.Event()
+
+        async def slow(payload):
+            await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+            return {"ok": True}
+
+        queue = JobQueue(slow, workers=1, db_path=db)
+        job = queue.submit([{"question": "slow"}])
+        try:
+            time.sleep(0.8)  # well past one lease
+            assert job.status == "running"
+            assert JobQueue(_echo, workers=0, db_path=db).stats()["depth"] == 0
+        finally:
+            release.set()
+        assert _wait_finished(queue, job).status == "done"
+
+
+class TestJobsEndpoint:
+    SCORE = {"confidence_score": 60, "sentiment": "bullish", "reasoning": "r"}
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="Wiki")
+    @patch("app.get_market_sentiment", return_value="Stock Quote for TSLA:")
+    def test_submit_and_long_poll(self, mock_single, mock_wiki, mock_poly, mock_score, client):
+        mock_score.return_value = dict(self.SCORE)
+        resp = client.post("/api/jobs", json={"question": "Will TSLA rise?", "symbol": "TSLA"})
+        assert resp.status_code == 202
+        submitted = resp.json()
+        assert submitted["size"] == 1
+
+        data = client.get(f"/api/jobs/{submitted['job_id']}", params={"wait": 5}).json()
+        assert data["status"] == "done"
+        assert data["results"][0]["confidence_score"] == 60
+        assert data["results"][0]["symbol"] == "TSLA"
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="")
+    @patch("app.get_market_sentiment", return_value="Stock Quote:")
+    def test_batch_job(self, mock_single, mock_wiki, mock_poly, mock_score, client):
+        # A fresh answer per call: the pipeline annotates the dict it gets back
+        mock_score.side_effect = lambda *args: dict(self.SCORE)
+        resp = client.post("/api/jobs", json={"requests": [
+            {"question": "Will TSLA rise?", "symbol": "TSLA"},
+            {"question": "Will AAPL rise?", "symbol": "AAPL"},
+        ]})
+        job_id = resp.json()["job_id"]
+        data = client.get(f"/api/jobs/{job_id}", params={"wait": 5}).json()
+        assert [r["symbol"] for r in data["results"]] == ["TSLA", "AAPL"]
+        assert client.get("/api/admin/jobs").json()["completed"] == 1
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="")
+    @patch("app.get_market_sentiment")
+    def test_jobs_run_in_batch_lane(self, mock_single, mock_wiki, mock_poly, mock_score, client):
+        from scraping import scheduler
+        lanes = []
+        mock_single.side_effect = lambda *args: lanes.append(scheduler.current_lane()) or "Stock Quote:"
+        mock_score.side_effect = lambda *args: dict(self.SCORE)
+        job_id = client.post("/api/jobs", json={"question": "Will TSLA rise?", "symbol": "TSLA"}).json()["job_id"]
+        assert client.get(f"/api/jobs/{job_id}", params={"wait": 5}).json()["status"] == "done"
+        assert lanes == ["batch"]
+
+        lanes.clear()
+        client.post("/api/analyze", json={"question": "Will AAPL rise?", "symbol": "AAPL"})
+        assert lanes == ["interactive"]
+
+    def test_rejects_empty_and_oversized_jobs(self, client):
+        assert client.post("/api/jobs", json={"requests": []}).status_code == 400
+        with patch("jobs.JOBS_MAX_REQUESTS", 1):
+            resp = client.post("/api/jobs", json={"requests": [{"question": "a"}, {"question": "b"}]})
+        assert resp.status_code == 400
+
+    def test_unknown_job(self, client):
+        assert client.get("/api/jobs/nope").status_code == 404
@@ -0,0 +1,50 @@
+"""
+Tests for jsonstream.py — incremental parsing of the LLM's JSON answer.
+"""
+
+import json
+
+import pytest
+
+ANSWER = {"confidence_score": 85, "sentiment": "bullish",
+          "reasoning": "Deliveries \"beat\" estimates.\nMargins held.", "tags": ["ev", {"a": [1, 2]}]}
+
+
+class TestObjectStream:
+    def _parse(self, text, chunk=1):
+        from jsonstream import ObjectStream
+        p = ObjectStream()
+        for i in range(0, len(text), chunk):
+            p.feed(text[i:i + chunk])
+        return p
+
+    @pytest.mark.parametrize("chunk", [1, 3, 7, 1000])
+    def test_matches_json_loads_for_any_chunking(self, chunk):
+        text = json.dumps(ANSWER)
+        p = self._parse(text, chunk)
+        assert p.done and p.fields == json.loads(text)
+
+    def test_ignores_markdown_fences(self):
+        p = self._parse("Here you go:\n```json\n" + json.dumps(ANSWER) + "\n```")
+        assert p.done and p.fields["sentiment"] == "bullish"
+
+    def test_fields_available_before_object_ends(self):
+        from jsonstream import ObjectStream
+        p = ObjectStream().feed('{"confidence_score": 72, "sentiment": "neutral", "reasoning": "Because the')
+        assert not p.done
+        assert p.has("confidence_score", "sentiment")
+        assert p.partial() == ("reasoning", "Because the")
+
+    def test_partial_with_dangling_escape(self):
+        from jsonstream import ObjectStream
+        p = ObjectStream().feed('{"reasoning": "a \\')
+        assert p.partial() == ("reasoning", "a ")
+
+    def test_scalars(self):
+        p = self._parse('{"a": true, "b": null, "c": -1.5e2}')
+        assert p.fields == {"a": True, "b": None, "c": -150.0}
+
+    def test_malformed_raises(self):
+        from jsonstream import ObjectStream
+        with pytest.raises(ValueError):
+            ObjectStream().feed('{"a": 1 "b": 2}')
@@ -0,0 +1,104 @@
+"""
+Tests for latency.py — latency sketches and adaptive upstream timeouts.
+"""
+
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from latency import AdaptiveTimeouts, LatencySketch, TIMEOUT_MIN_SAMPLES
+
+
+def _response(status=200):
+    resp = MagicMock()
+    resp.status_code = status
+    resp.headers = {}
+    resp.json.return_value = {"c": 250.0}
+    return resp
+
+
+class TestLatencySketch:
+    def test_percentiles_within_bucket_error(self):
+        sketch = LatencySketch()
+        for i in range(1, 1001):
+            sketch.observe(i / 1000)  # uniform 1ms..1s
+        assert sketch.quantile(0.5) == pytest.approx(0.5, rel=0.06)
+        assert sketch.quantile(0.99) == pytest.approx(0.99, rel=0.06)
+        assert sketch.quantile(1.0) == pytest.approx(1.0)
+
+    def test_empty_and_extremes(self):
+        sketch = LatencySketch()
+        assert sketch.quantile(0.99) == 0.0
+        sketch.observe(0.0)
+        sketch.observe(500.0)
+        assert sketch.quantile(0.1) == pytest.approx(0.001)
+        assert sketch.quantile(1.0) == 500.0
+
+    @patch("latency.LATENCY_WINDOW", 100)
+    def test_old_samples_fade(self):
+        sketch = LatencySketch()
+        for _ in range(100):
+            sketch.observe(5.0)
+        for _ in range(400):
+            sketch.observe(0.1)
+        assert sketch.quantile(0.9) == pytest.approx(0.1, rel=0.06)
+        assert sketch.samples == 500
+
+
+class TestAdaptiveTimeouts:
+    def test_default_until_enough_samples(self):
+        t = AdaptiveTimeouts(percentile=0.99, factor=2.0, bounds=(0.25, 20))
+        for _ in range(TIMEOUT_MIN_SAMPLES - 1):
+            t.observe("finnhub:/quote", 0.2)
+        assert t.timeout("finnhub:/quote", 10) == 10
+        t.observe("finnhub:/quote", 0.2)
+        assert t.timeout("finnhub:/quote", 10) == pytest.approx(0.4, rel=0.06)
+
+    def test_clamped(self):
+        t = AdaptiveTimeouts(percentile=0.99, factor=2.0, bounds=(0.25, 20))
+        for _ in range(TIMEOUT_MIN_SAMPLES):
+            t.observe("fast", 0.01)
+            t.observe("slow", 30.0)
+        assert t.timeout("fast", 10) == 0.25
+        assert t.timeout("slow", 10) == 20
+
+    def test_disabled(self):
+        t = AdaptiveTimeouts(enabled=False)
+        for _ in range(TIMEOUT_MIN_SAMPLES):
+            t.observe("x", 0.01)
+        assert t.timeout("x", 10) == 10
+
+
+class TestUpstreamTimeouts:
+    @patch("scraping.finnHub.FINNHUB_API_KEY", "fake-key")
+    @patch("scraping.finnHub.requests.get")
+    def test_quote_timeout_tightens(self, mock_get):
+        from latency import upstream_timeouts
+        from scraping.http import get
+        mock_get.return_value = _response()
+        for _ in range(TIMEOUT_MIN_SAMPLES + 1):
+            get("https://finnhub.io/api/v1/quote", params={"symbol": "TSLA"}, timeout=10)
+        assert mock_get.call_args.kwargs["timeout"] < 1
+        stats = upstream_timeouts.stats()["endpoints"]["finnhub.io:/api/v1/quote"]
+        assert stats["samples"] == TIMEOUT_MIN_SAMPLES + 1
+        assert stats["timeout_s"] == mock_get.call_args.kwargs["timeout"]
+
+    @patch("scraping.finnHub.requests.get")
+    def test_timeout_recorded_as_censored_sample(self, mock_get):
+        import requests
+        from latency import upstream_timeouts
+        from scraping.http import get
+        mock_get.side_effect = requests.Timeout("slow")
+        with pytest.raises(requests.Timeout):
+            get("https://en.wikipedia.org/w/api.php", timeout=7, upstream="wikipedia", endpoint="search")
+        assert upstream_timeouts.stats()["endpoints"]["wikipedia:search"]["max_s"] == 7
+
+    @patch("scraping.finnHub.requests.get")
+    def test_admin_endpoint(self, mock_get, client):
+        from scraping.http import get
+        mock_get.return_value = _response()
+        get("https://gamma-api.polymarket.com/markets", upstream="polymarket")
+        data = client.get("/api/admin/timeouts").json()
+        assert data["percentile"] == 0.99
+        assert set(data["endpoints"]["polymarket:/markets"]) == {
+            "samples", "p50_s", "p90_s", "p99_s", "max_s", "timeout_s"}
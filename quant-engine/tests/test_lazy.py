@@ -0,0 +1,59 @@
+"""
+Tests for lazy.py and the cold-start behaviour of app.py.
+"""
+
+import subprocess
+import sys
+import os
+
+import pytest
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestLazyImport:
+    def test_proxy_is_shared_per_name(self):
+        from lazy import lazy_import
+        assert lazy_import("colorsys") is lazy_import("colorsys")
+
+    def test_loads_on_first_attribute_access(self):
+        from lazy import lazy_import, is_loaded
+        mod = lazy_import("colorsys")
+        assert mod.rgb_to_hsv(1.0, 0.0, 0.0) == (0.0, 1.0, 1.0)
+        assert is_loaded("colorsys")
+
+    def test_missing_module_raises_on_access(self):
+        from lazy import lazy_import
+        mod = lazy_import("definitely_not_a_real_module_xyz")
+        with pytest.raises(ImportError):
+            mod.anything
+
+
+class TestColdStart:
+    def test_import_app_defers_heavy_modules(self):
+        code = (
+            "import sys, app; "
+            "print('groq._client' in sys.modules, 'requests.sessions' in sys.modules, 'numpy.linalg' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=ENGINE_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+        assert out == "False False False"
+
+    def test_import_without_groq_key(self, monkeypatch):
+        env = {k: v for k, v in os.environ.items() if k != "GROQ_API_KEY"}
+        proc = subprocess.run(
+            [sys.executable, "-c", "import app"], cwd=ENGINE_DIR,
+            capture_output=True, text=True, env=env,
+        )
+        assert proc.returncode == 0, proc.stderr
+
+
+class TestWarmUp:
+    def test_ready_after_warm_up(self, client):
+        import app
+        app._warm.clear()
+        assert client.get("/ready").status_code == 503
+        app.warm_up()
+        assert client.get("/ready").json() == {"status": "ready"}
@@ -0,0 +1,108 @@
+"""
+Tests for scraping/news_store.py — incremental per-symbol news.
+"""
+
+import time
+from unittest.mock import patch, MagicMock
+
+DAY = 86400
+
+
+def _raw(i, age_days=0.0):
+    return {"headline": f"Story {i} about topic {i}", "summary": f"Body {i}",
+            "source": "Test", "url": f"https://example.com/{i}",
+            "datetime": int(time.time() - age_days * DAY)}
+
+
+def _article(i, age_days=0.0):
+    from records import news_item
+    return news_item(_raw(i, age_days))
+
+
+class TestNewsStore:
+    def _make(self, **kwargs):
+        from scraping.news_store import NewsStore
+        return NewsStore(**kwargs)
+
+    def test_first_sync_is_full_window_then_delta(self):
+        store = self._make()
+        calls = []
+
+        def fetch(since):
+            calls.append(since)
+            return [_article(len(calls))]
+
+        store.sync("TSLA", 7, fetch)
+        store.sync("TSLA", 7, fetch)
+        assert calls[0] < time.time() - 6.9 * DAY
+        # Delta starts at the beginning of the last sync day
+        assert calls[1] > time.time() - 1.01 * DAY
+        assert store.stats()["full_fetches"] == 1
+        assert store.stats()["delta_fetches"] == 1
+
+    def test_merge_prepends_new_and_skips_seen(self):
+        store = self._make()
+        store.sync("TSLA", 7, lambda since: [_article(2), _article(1)])
+        items = store.sync("TSLA", 7, lambda since: [_article(3), _article(2)])
+        assert [a["url"] for a in items] == [f"https://example.com/{i}" for i in (3, 2, 1)]
+        assert store.get("TSLA").watermark >= items[0]["datetime"]
+
+    def test_evicts_items_past_lookback(self):
+        store = self._make()
+        store.sync("TSLA", 7, lambda since: [_article(1), _article(2, age_days=8)])
+        items = store.sync("TSLA", 7, lambda since: [])
+        assert [a["url"] for a in items] == ["https://example.com/1"]
+
+    def test_longer_lookback_forces_full_fetch(self):
+        store = self._make()
+        store.sync("TSLA", 7, lambda since: [])
+        store.sync("TSLA", 30, lambda since: [])
+        assert store.stats()["full_fetches"] == 2
+
+    def test_shorter_lookback_filters_result(self):
+        store = self._make()
+        store.sync("TSLA", 30, lambda since: [_article(1), _article(2, age_days=10)])
+        items = store.sync("TSLA", 7, lambda since: [])
+        assert [a["url"] for a in items] == ["https://example.com/1"]
+
+    def test_fetch_error_propagates_and_keeps_state(self):
+        store = self._make()
+        store.sync("TSLA", 7, lambda since: [_article(1)])
+
+        def boom(since):
+            raise RuntimeError("down")
+
+        try:
+            store.sync("TSLA", 7, boom)
+        except RuntimeError:
+            pass
+        assert len(store.get("TSLA").items) == 1
+
+    def test_symbol_cap_evicts_least_recently_synced(self):
+        store = self._make(max_symbols=2)
+        for sym in ("A", "B", "C"):
+            store.sync(sym, 7, lambda since: [])
+        assert store.get("A") is None
+        assert store.stats()["symbols"] == 2
+
+
+class TestIncrementalCompanyNews:
+    @patch("scraping.finnHub.requests.get")
+    def test_refresh_requests_only_delta(self, mock_get):
+        first = MagicMock()
+        first.json.return_value = [_raw(1), _raw(2, age_days=3)]
+        second = MagicMock()
+        second.json.return_value = [_raw(3)]
+        mock_get.side_effect = [first, second]
+
+        import cache
+        from scraping.finnHub import get_company_news
+
+        assert len(get_company_news("TSLA")) == 2
+        cache.clear_all()
+        result = get_company_news("TSLA")
+
+        assert [a["url"] for a in result] == [f"https://example.com/{i}" for i in (3, 1, 2)]
+        first_from = mock_get.call_args_list[0].kwargs["params"]["from"]
+        second_from = mock_get.call_args_list[1].kwargs["params"]["from"]
+        assert second_from > first_from
@@ -0,0 +1,122 @@
+"""
+Tests for planner.py — adaptive source selection for /api/analyze.
+"""
+
+import time
+from unittest.mock import patch
+
+import pytest
+
+SCORE = {"confidence_score": 60, "sentiment": "neutral", "reasoning": "ok"}
+
+
+def _train(planner, source, cls, n, latency=0.5, error=False, useful=True):
+    for _ in range(n):
+        planner.record(source, cls, latency, error=error, useful=useful)
+
+
+class TestSourcePlanner:
+    def _make(self, **kwargs):
+        from planner import SourcePlanner
+        kwargs.setdefault("enabled", True)
+        return SourcePlanner(**kwargs)
+
+    def test_calls_everything_while_warming_up(self):
+        p = self._make()
+        plan = p.plan("stock", {"wikipedia": False, "finnhub": True})
+        assert all(d["call"] for d in plan["sources"].values())
+        assert plan["sources"]["wikipedia"]["reason"] == "warming up"
+        assert plan["sources"]["wikipedia"]["timeout_s"] == 15.0
+
+    def test_skips_rarely_useful_source_per_class(self):
+        from planner import PLANNER_MIN_SAMPLES
+        p = self._make()
+        _train(p, "polymarket", "stock", PLANNER_MIN_SAMPLES, useful=False)
+        _train(p, "polymarket", "event", PLANNER_MIN_SAMPLES, useful=True)
+        assert p.plan("stock", {"polymarket": False})["sources"]["polymarket"]["reason"] == "rarely useful"
+        assert p.plan("event", {"polymarket": False})["sources"]["polymarket"]["call"]
+
+    def test_skips_failing_and_slow_sources(self):
+        from planner import PLANNER_MIN_SAMPLES
+        p = self._make(slo=2.0)
+        _train(p, "wikipedia", "event", PLANNER_MIN_SAMPLES, error=True)
+        _train(p, "polymarket", "event", PLANNER_MIN_SAMPLES, latency=5.0)
+        plan = p.plan("event", {"wikipedia": False, "polymarket": False})["sources"]
+        assert plan["wikipedia"]["call"] is False
+        assert plan["polymarket"]["reason"] == "slower than SLO"
+
+    def test_required_source_always_called_with_adaptive_timeout(self):
+        from planner import PLANNER_MIN_SAMPLES, PLANNER_MIN_TIMEOUT
+        p = self._make(slo=8.0)
+        _train(p, "finnhub", "stock", PLANNER_MIN_SAMPLES, latency=0.2, error=True)
+        decision = p.plan("stock", {"finnhub": True})["sources"]["finnhub"]
+        assert decision["call"] and decision["reason"] == "required"
+        assert decision["timeout_s"] == PLANNER_MIN_TIMEOUT
+
+    def test_timeout_clamped_to_slo(self):
+        from planner import PLANNER_MIN_SAMPLES
+        p = self._make(slo=3.0)
+        _train(p, "finnhub", "stock", PLANNER_MIN_SAMPLES, latency=10.0)
+        assert p.plan("stock", {"finnhub": True})["sources"]["finnhub"]["timeout_s"] == 3.0
+
+    def test_explores_after_repeated_skips(self):
+        from planner import PLANNER_MIN_SAMPLES, PLANNER_EXPLORE_EVERY
+        p = self._make()
+        _train(p, "polymarket", "stock", PLANNER_MIN_SAMPLES, useful=False)
+        decisions = [p.plan("stock", {"polymarket": False})["sources"]["polymarket"]
+                     for _ in range(PLANNER_EXPLORE_EVERY + 1)]
+        assert not any(d["call"] for d in decisions[:-1])
+        assert decisions[-1]["reason"] == "explore"
+
+    def test_disabled_calls_everything(self):
+        from planner import PLANNER_MIN_SAMPLES
+        p = self._make(enabled=False)
+        _train(p, "polymarket", "stock", PLANNER_MIN_SAMPLES, useful=False)
+        assert p.plan("stock", {"polymarket": False})["sources"]["polymarket"]["call"]
+
+    def test_stats_grouped_by_source_and_class(self):
+        p = self._make()
+        _train(p, "wikipedia", "event", 3)
+        stats = p.stats()["sources"]["wikipedia"]["event"]
+        assert stats["samples"] == 3 and stats["useful_rate"] == 1.0
+
+
+class TestAnalyzeWithPlanner:
+    @patch("app.get_trade_confidence", return_value=dict(SCORE))
+    @patch("app.get_polymarket_context", return_value="No relevant Polymarket data found.")
+    @patch("app.search_wikipedia", return_value="## Tesla, Inc.\nTesla makes cars.")
+    @patch("app.get_market_sentiment", return_value="Stock Quote for TSLA:\n  Price: $250, Change: 1%")
+    def test_learns_to_skip_and_reports_plan(self, mock_sentiment, mock_wiki, mock_poly, mock_score, client):
+        from planner import PLANNER_MIN_SAMPLES
+
+        for i in range(PLANNER_MIN_SAMPLES):
+            resp = client.post("/api/analyze", json={"question": f"Will Tesla hit {300 + i}?"})
+            assert resp.json()["plan"]["sources"]["polymarket"]["reason"] == "warming up"
+        assert mock_poly.call_count == PLANNER_MIN_SAMPLES
+
+        data = client.post("/api/analyze", json={"question": "Will Tesla hit 999?"}).json()
+        assert mock_poly.call_count == PLANNER_MIN_SAMPLES
+        assert data["plan"]["class"] == "stock"
+        assert data["plan"]["sources"]["polymarket"] == {
+            "call": False, "timeout_s": pytest.approx(1.0, abs=1.0), "reason": "rarely useful",
+        }
+        assert data["sources"]["polymarket"] is None
+        assert data["sources"]["wikipedia"] is not None
+
+        stats = client.get("/api/admin/planner").json()
+        assert stats["sources"]["polymarket"]["stock"]["useful_rate"] == 0.0
+
+    @patch("app.get_trade_confidence", return_value=dict(SCORE))
+    @patch("app.get_polymarket_context", return_value="Polymarket Prediction Markets:\n  Market: X")
+    @patch("app.search_wikipedia")
+    def test_timed_out_source_is_dropped(self, mock_wiki, mock_poly, mock_score, client):
+        from planner import source_planner, PLANNER_MIN_SAMPLES
+        _train(source_planner, "wikipedia", "event", PLANNER_MIN_SAMPLES, latency=0.01)
+        mock_wiki.side_effect = lambda q: time.sleep(1.5) or "late"
+
+        start = time.monotonic()
+        data = client.post("/api/analyze", json={"question": "Will it rain in Paris?"}).json()
+        assert time.monotonic() - start < 1.4
+        assert data["plan"]["sources"]["wikipedia"]["timed_out"] is True
+        assert data["sources"]["wikipedia"] is None
+        assert data["sources"]["polymarket"] is not None
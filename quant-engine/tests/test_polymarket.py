@@ -240,3 +240,25 @@ class TestGetPolymarketContext:
         result = get_polymarket_context("some query")
         assert "Some market?" in result
         # Should not crash on None values
+
+
+class TestGetTopMarkets:
+    @patch("scraping.polymarket.requests.get")
+    def test_ordered_by_volume(self, mock_get):
+        mock_resp = MagicMock()
+        mock_resp.json.return_value = [{"question": "Big market", "volume": "900", "outcomePrices": ["0.6", "0.4"]}]
+        mock_resp.raise_for_status = MagicMock()
+        mock_get.return_value = mock_resp
+
+        from scraping.polymarket import get_top_markets
+
+        result = get_top_markets(5)
+        params = mock_get.call_args[1]["params"]
+        assert params["order"] == "volumeNum" and params["ascending"] == "false"
+        assert params["limit"] == 5
+        assert result[0]["question"] == "Big market"
+
+    @patch("scraping.polymarket.requests.get", side_effect=Exception("down"))
+    def test_error(self, mock_get):
+        from scraping.polymarket import get_top_markets
+        assert get_top_markets()[0]["error"] == "Polymarket top markets failed: down"
@@ -0,0 +1,152 @@
+"""
+Tests for prescore.py — deterministic quantitative pre-score.
+"""
+
+import pytest
+from unittest.mock import patch
+
+
+LIQUID_MARKET = {
+    "question": "Will Tesla stock hit $300?",
+    "outcome_yes": "0.95", "outcome_no": "0.05",
+    "volume": "900000", "liquidity": "400000",
+}
+NEWS = [{"headline": f"n{i}"} for i in range(5)]
+QUESTION = "Will Tesla stock hit $300?"
+
+
+class TestExtractFeatures:
+    def test_uses_top_market_and_quote(self):
+        from prescore import extract_features
+        f = extract_features(
+            quote={"change_percent": 2.5},
+            markets=[LIQUID_MARKET, {"outcome_yes": "0.1", "liquidity": "5"}],
+            news=NEWS,
+        )
+        assert f["poly_yes"] == 0.95
+        assert f["poly_liquidity"] == 400000.0
+        assert f["poly_markets"] == 2
+        assert f["change_percent"] == 2.5
+        assert f["news_count"] == 5
+
+    def test_errors_ignored(self):
+        from prescore import extract_features
+        f = extract_features(
+            quote={"error": "Finnhub quote failed"},
+            markets=[{"error": "Polymarket search failed"}],
+            news=[{"error": "Finnhub news failed"}],
+        )
+        assert f["poly_yes"] is None
+        assert f["change_percent"] is None
+        assert f["news_count"] == 0
+
+
+class TestScore:
+    def test_liquid_decisive_market_is_confident(self):
+        from prescore import extract_features, score
+        result = score(extract_features(markets=[LIQUID_MARKET], news=NEWS, question=QUESTION))
+        assert result["features"]["poly_match"] == 1.0
+        assert result["probability"] > 0.9
+        assert result["confidence"] >= 0.8
+        assert result["sentiment"] == "bullish"
+
+    def test_unverified_market_alone_cannot_skip(self):
+        from prescore import PRESCORE_SKIP_CONFIDENCE, extract_features, score
+        result = score(extract_features(markets=[LIQUID_MARKET], news=NEWS))
+        assert result["probability"] > 0.9
+        assert result["confidence"] < PRESCORE_SKIP_CONFIDENCE
+
+    def test_unrelated_market_is_ignored(self):
+        from prescore import extract_features, score
+        f = extract_features(markets=[LIQUID_MARKET], news=NEWS, question="Will Apple beat earnings?")
+        assert f["poly_yes"] is None
+        assert f["poly_markets"] == 1
+        assert score(f)["confidence"] < 0.1
+
+    def test_best_matching_market_is_used(self):
+        from prescore import extract_features
+        other = dict(LIQUID_MARKET, question="Will Tesla deliver 2M cars?", outcome_yes="0.3")
+        f = extract_features(markets=[other, LIQUID_MARKET], question=QUESTION)
+        assert f["poly_yes"] == 0.95
+
+    def test_bearish_question_flips_move(self):
+        from prescore import extract_features, score
+        result = score(extract_features(quote={"change_percent": -8.0}, question="Will Tesla fall below $200?"))
+        assert result["features"]["bearish"] is True
+        assert result["probability"] > 0.55
+        assert result["sentiment"] == "bearish"
+
+    def test_opposite_market_wording_flips_price(self):
+        from prescore import extract_features
+        market = dict(LIQUID_MARKET, question="Will Tesla stock drop below $300?", outcome_yes="0.2")
+        f = extract_features(markets=[market], question=QUESTION)
+        assert f["poly_yes"] == pytest.approx(0.8)
+
+    def test_illiquid_market_has_little_weight(self):
+        from prescore import extract_features, score
+        market = dict(LIQUID_MARKET, liquidity="100")
+        result = score(extract_features(markets=[market]))
+        assert 0.45 <= result["probability"] <= 0.55
+        assert result["confidence"] < 0.1
+
+    def test_price_drop_is_bearish(self):
+        from prescore import extract_features, score
+        result = score(extract_features(quote={"change_percent": -8.0}))
+        assert result["probability"] < 0.45
+        assert result["sentiment"] == "bearish"
+
+    def test_no_data_is_neutral(self):
+        from prescore import extract_features, score
+        result = score(extract_features())
+        assert result["probability"] == 0.5
+        assert result["confidence"] == 0.0
+        assert result["sentiment"] == "neutral"
+
+    @patch("prescore.PRESCORE_CALIBRATION", (1.0, -1.0))
+    def test_calibration_shifts_probability(self):
+        from prescore import extract_features, score
+        assert score(extract_features())["probability"] < 0.5
+
+    def test_disagreement_flag(self):
+        from prescore import extract_features, score, disagrees
+        result = score(extract_features(markets=[LIQUID_MARKET], news=NEWS, question=QUESTION))
+        assert disagrees(result, {"confidence_score": 20})
+        assert not disagrees(result, {"confidence_score": 90})
+        assert not disagrees(result, {"error": "Groq inference failed"})
+
+
+@patch("app.get_company_news", return_value=NEWS)
+@patch("app.get_stock_quote", return_value={"change_percent": 1.0})
+@patch("app.search_markets", return_value=[LIQUID_MARKET])
+@patch("app.get_market_sentiment", return_value="Finnhub")
+@patch("app.get_polymarket_context", return_value="Poly")
+@patch("app.search_wikipedia", return_value="Wiki")
+@patch("app.get_trade_confidence")
+class TestAnalyzeModes:
+    def test_skip_mode_bypasses_llm(self, mock_score, mock_wiki, mock_poly, mock_sentiment,
+                                    mock_markets, mock_quote, mock_news, client):
+        with patch("prescore.PRESCORE_MODE", "skip"):
+            resp = client.post("/api/analyze", json={"question": "Will Tesla hit 300?"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["source"] == "prescore"
+        assert data["confidence_score"] >= 90
+        assert data["prescore"]["confidence"] >= 0.8
+        mock_score.assert_not_called()
+
+    def test_seed_mode_adds_prescore_to_context(self, mock_score, mock_wiki, mock_poly, mock_sentiment,
+                                                mock_markets, mock_quote, mock_news, client):
+        mock_score.return_value = {"confidence_score": 30, "sentiment": "bearish", "reasoning": "."}
+        with patch("prescore.PRESCORE_MODE", "seed"):
+            resp = client.post("/api/analyze", json={"question": "Will Tesla hit 300?"})
+        data = resp.json()
+        assert "Quantitative pre-score" in mock_score.call_args[0][1]
+        assert data["prescore"]["disagreement"] is True
+
+    def test_off_mode_skips_structured_fetches(self, mock_score, mock_wiki, mock_poly, mock_sentiment,
+                                               mock_markets, mock_quote, mock_news, client):
+        mock_score.return_value = {"confidence_score": 50, "sentiment": "neutral", "reasoning": "."}
+        with patch("prescore.PRESCORE_MODE", "off"):
+            data = client.post("/api/analyze", json={"question": "Will Tesla hit 300?"}).json()
+        assert "prescore" not in data
+        mock_markets.assert_not_called()
@@ -0,0 +1,129 @@
+"""
+Tests for query.py — shared, memoized question analysis.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestAnalyze:
+    def test_fields(self):
+        from query import analyze
+        q = analyze("Will Elon Musk's Tesla beat $AAPL in 2026?")
+        assert q.tickers == ("AAPL", "TSLA")
+        assert q.symbol == "AAPL"
+        assert q.proper_nouns == ("Elon", "Musk's", "Tesla", "AAPL")
+        assert q.wiki_query == "Elon Musk's Tesla AAPL"
+        assert q.keywords == ("elon", "musk's", "tesla", "beat", "$aapl", "2026")
+        assert "$aapl" in q.tokens
+        assert q.crypto == ()
+
+    def test_keywords_and_market_query(self):
+        from query import analyze
+        q = analyze("Will the Fed cut rates before the election?")
+        assert q.keywords == ("fed", "cut", "rates", "before", "election")
+        assert q.market_query == "fed cut rates before election"
+
+    def test_crypto_blocks_named_ticker_but_not_explicit(self):
+        from query import analyze
+        assert analyze("Will Tesla accept bitcoin?").symbol is None
+        assert analyze("Will Tesla accept bitcoin?").crypto == ("bitcoin",)
+        assert analyze("Will $TSLA rise with BTC?").symbol == "TSLA"
+
+    def test_memoized(self):
+        from query import analyze
+        assert analyze("Will Apple rise?") is analyze("Will Apple rise?")
+
+    def test_canonical_cache_key(self):
+        from query import analyze
+        assert analyze("Will Tesla hit $300?").cache_key == analyze("  will TESLA hit $300 ").cache_key
+        assert analyze("Will Tesla hit $300?").cache_key != analyze("Will Tesla hit $400?").cache_key
+
+    def test_cache_key_separates_case_sensitive_resolution(self):
+        from query import analyze
+        lower, upper = analyze("will nvda beat earnings"), analyze("Will NVDA beat earnings?")
+        assert (lower.symbol, upper.symbol) == (None, "NVDA")
+        assert lower.cache_key != upper.cache_key
+
+
+class TestCanonicalCaching:
+    @patch("app.get_stock_quote", return_value={"symbol": "TSLA"})
+    @patch("app.get_company_news", return_value=[])
+    @patch("app.search_markets", return_value=[])
+    @patch("app.search_wikipedia", return_value="Wiki")
+    def test_scrape_cache_shared_by_rephrasings(self, mock_wiki, mock_markets, mock_news, mock_quote, client):
+        client.get("/api/scrape", params={"question": "Will Tesla hit 300?"})
+        client.get("/api/scrape", params={"question": "  will Tesla hit 300 "})
+        assert mock_wiki.call_count == 1
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="")
+    @patch("app.get_market_sentiment", return_value="Stock Quote for NVDA:")
+    def test_analyze_cache_not_shared_across_resolutions(self, mock_single, mock_wiki, mock_poly, mock_score,
+                                                         client):
+        mock_score.side_effect = lambda *args: {"confidence_score": 50, "sentiment": "neutral", "reasoning": "."}
+        first = client.post("/api/analyze", json={"question": "will nvda beat earnings"}).json()
+        second = client.post("/api/analyze", json={"question": "Will NVDA beat earnings?"}).json()
+        assert (first["symbol"], second["symbol"]) == (None, "NVDA")
+        assert mock_score.call_count == 2
+
+    @patch("app.get_trade_confidence")
+    @patch("app.get_polymarket_context", return_value="")
+    @patch("app.search_wikipedia", return_value="")
+    @patch("app.get_market_sentiment", return_value="Stock Quote for TSLA:")
+    def test_analyze_cache_hit_echoes_current_question(self, mock_single, mock_wiki, mock_poly, mock_score,
+                                                       client):
+        mock_score.side_effect = lambda *args: {"confidence_score": 50, "sentiment": "neutral", "reasoning": "."}
+        client.post("/api/analyze", json={"question": "Will Tesla hit 300?"})
+        data = client.post("/api/analyze", json={"question": "  Will Tesla hit 300 "}).json()
+        assert mock_score.call_count == 1
+        assert data["question"] == "  Will Tesla hit 300 "
+
+    @patch("scraping.wikipedia.requests.get")
+    def test_wikipedia_cache_keyed_by_entities(self, mock_get):
+        resp = MagicMock()
+        resp.json.return_value = {"query": {"search": []}}
+        mock_get.return_value = resp
+
+        from scraping.wikipedia import search_wikipedia
+
+        search_wikipedia("Will Tesla stock go up?")
+        search_wikipedia("Is Tesla overvalued?")
+        assert mock_get.call_count == 1
+
+
+class TestSymbols:
+    def test_bare_tickers_in_order(self):
+        from query import analyze
+        q = analyze("Will NVDA outperform AMD and INTC this quarter?")
+        assert q.symbols == ("NVDA", "AMD", "INTC")
+        assert q.symbol == "NVDA"
+
+    def test_unknown_uppercase_words_ignored(self):
+        from query import analyze
+        assert analyze("Will the CEO of a USA company beat GDP?").symbols == ()
+
+    def test_names_ordered_by_mention(self):
+        from query import analyze
+        assert analyze("Will Apple beat Tesla and Microsoft?").symbols == ("AAPL", "TSLA", "MSFT")
+
+    @pytest.mark.parametrize("question, symbols", [
+        ("Will NVIDIA benefit from artificial intelligence demand?", ("NVDA",)),
+        ("Will Tesla beat exuberant expectations?", ("TSLA",)),
+        ("Is the metaverse dead for Apple?", ("AAPL",)),
+    ])
+    def test_names_match_whole_words(self, question, symbols):
+        from query import analyze
+        assert analyze(question).symbols == symbols
+
+    @patch("query.MAX_SYMBOLS", 2)
+    def test_capped(self):
+        from query import analyze
+        q = analyze("Compare Apple, Tesla, Microsoft")
+        assert q.tickers == ("AAPL", "TSLA", "MSFT")
+        assert q.symbols == ("AAPL", "TSLA")
+
+    def test_crypto_question_has_no_symbols(self):
+        from query import analyze
+        assert analyze("Will Tesla and Apple buy bitcoin?").symbols == ()
@@ -0,0 +1,53 @@
+"""
+Tests for records.py — dict decoders for upstream JSON.
+"""
+
+
+class TestQuote:
+    def test_shape(self, sample_stock_quote):
+        from records import quote
+        assert quote("tsla", sample_stock_quote) == {
+            "symbol": "TSLA",
+            "current_price": sample_stock_quote["c"],
+            "high": sample_stock_quote["h"],
+            "low": sample_stock_quote["l"],
+            "open": sample_stock_quote["o"],
+            "previous_close": sample_stock_quote["pc"],
+            "change": sample_stock_quote["d"],
+            "change_percent": sample_stock_quote["dp"],
+        }
+
+
+class TestNewsItem:
+    def test_summary_trimmed_and_key(self, sample_company_news):
+        from records import article_key, news_item
+        item = news_item(sample_company_news[0])
+        assert len(item["summary"]) <= 300
+        assert article_key(item) == "https://example.com/1"
+        assert list(item) == ["headline", "summary", "source", "url", "datetime"]
+
+    def test_missing_summary(self):
+        from records import news_item
+        assert news_item({"headline": "h", "summary": None})["summary"] == ""
+
+
+class TestMarket:
+    def test_prices_from_outcome_list(self, sample_polymarket_gamma_response):
+        from records import market
+        raw = sample_polymarket_gamma_response[0]
+        m = market(raw)
+        assert m["outcome_yes"] == raw["outcomePrices"][0]
+        assert m["slug"] == raw.get("slug")
+
+    def test_prices_fall_back_to_bid_ask(self):
+        from records import market
+        m = market({"title": "T", "bestBid": 0.4, "bestAsk": 0.6})
+        assert (m["question"], m["outcome_yes"], m["outcome_no"]) == ("T", 0.4, 0.6)
+
+
+class TestWikiExtract:
+    def test_truncates_and_renders(self):
+        from records import render_summary, wiki_extract
+        extract = wiki_extract({"extract": "x" * 2000})
+        assert extract.endswith("...") and len(extract) == 1503
+        assert render_summary("Long", extract).startswith("## Long\nxxx")
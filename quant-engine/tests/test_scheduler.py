@@ -0,0 +1,127 @@
+"""
+Tests for scraping/scheduler.py and scraping/http.py — upstream rate scheduling.
+"""
+
+import threading
+import time
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+def _make(rate=60, burst=2):
+    from scraping.scheduler import RateScheduler
+    return RateScheduler("test", rate, burst)
+
+
+class TestRateScheduler:
+    def test_burst_then_wait(self):
+        s = _make(rate=600, burst=2)  # one token per 0.1s
+        assert s.acquire("interactive", timeout=1) < 0.01
+        assert s.acquire("interactive", timeout=1) < 0.01
+        waited = s.acquire("interactive", timeout=1)
+        assert 0.05 < waited < 0.5
+
+    def test_deadline_exceeded(self):
+        from scraping.scheduler import SchedulerTimeout
+        s = _make(rate=1, burst=1)
+        s.acquire("batch", timeout=1)
+        with pytest.raises(SchedulerTimeout):
+            s.acquire("batch", timeout=0.05)
+        assert s.stats()["lanes"]["batch"]["timeouts"] == 1
+
+    def test_interactive_served_before_batch(self):
+        s = _make(rate=600, burst=1)
+        s.acquire("batch", timeout=1)  # drain the bucket
+        order = []
+
+        def take(lane):
+            s.acquire(lane, timeout=2)
+            order.append(lane)
+
+        batch = threading.Thread(target=take, args=("batch",))
+        batch.start()
+        time.sleep(0.01)
+        interactive = threading.Thread(target=take, args=("interactive",))
+        interactive.start()
+        batch.join()
+        interactive.join()
+        assert order == ["interactive", "batch"]
+
+    def test_429_pauses_and_halves_rate(self):
+        from scraping.scheduler import SchedulerTimeout
+        s = _make(rate=600, burst=5)
+        s.report_429(retry_after=0.3)
+        assert s.rate == 300
+        with pytest.raises(SchedulerTimeout):
+            s.acquire("interactive", timeout=0.1)
+        assert s.stats()["throttled"] == 1
+
+    def test_success_recovers_rate(self):
+        s = _make(rate=100)
+        s.report_429(retry_after=0)
+        for _ in range(20):
+            s.report_success()
+        assert s.rate == 100
+
+    def test_stats_shape(self):
+        s = _make()
+        s.acquire("standard", timeout=1)
+        lanes = s.stats()["lanes"]
+        assert set(lanes) == {"interactive", "standard", "batch"}
+        assert lanes["standard"]["acquired"] == 1
+        assert lanes["standard"]["queue_depth"] == 0
+
+
+class TestLanes:
+    def test_default_lane_is_interactive(self):
+        from scraping.scheduler import current_lane
+        assert current_lane() == "interactive"
+
+    def test_in_lane_context(self):
+        from scraping.scheduler import current_lane, in_lane
+        with in_lane("batch"):
+            assert current_lane() == "batch"
+        assert current_lane() == "interactive"
+
+    def test_unknown_lane_rejected(self):
+        from scraping.scheduler import in_lane
+        with pytest.raises(ValueError):
+            with in_lane("vip"):
+                pass
+
+
+class TestHttpGet:
+    @patch("scraping.finnHub.requests.get")
+    def test_retries_after_429(self, mock_get):
+        from scraping import http
+        throttled = MagicMock(status_code=429, headers={"Retry-After": "0.05"})
+        ok = MagicMock(status_code=200)
+        mock_get.side_effect = [throttled, ok]
+        s = _make(rate=6000, burst=5)
+        with patch("scraping.http.get_scheduler", return_value=s):
+            assert http.get("https://x", params={"a": 1}, upstream="test") is ok
+        assert mock_get.call_count == 2
+        assert s.stats()["throttled"] == 1
+
+    @patch("scraping.finnHub.requests.get")
+    def test_unscheduled_upstream_passthrough(self, mock_get):
+        from scraping import http
+        http.get("https://x", params={"a": 1}, upstream="nobody")
+        assert mock_get.call_args[1]["params"] == {"a": 1}
+
+    @patch("scraping.finnHub.requests.get")
+    def test_quote_error_when_queue_deadline_passes(self, mock_get):
+        from scraping.scheduler import SchedulerTimeout
+        from scraping.finnHub import get_stock_quote
+        with patch("scraping.scheduler.RateScheduler.acquire", side_effect=SchedulerTimeout("finnhub rate limit")):
+            result = get_stock_quote("TSLA")
+        assert "finnhub rate limit" in result["error"]
+        mock_get.assert_not_called()
+
+
+class TestSchedulerEndpoint:
+    def test_admin_scheduler(self, client):
+        data = client.get("/api/admin/scheduler").json()
+        assert "finnhub" in data
+        assert data["finnhub"]["configured_rate_per_minute"] == 60
@@ -29,6 +29,22 @@ class TestGetTradeConfidence:
         assert result["sentiment"] == "bullish"
         assert "reasoning" in result
 
+    @patch("scoring.hedge_client")
+    @patch("scoring.client")
+    @patch("scoring.GROQ_HEDGE_MODEL", "llama-3.1-8b-instant")
+    @patch("scoring.GROQ_HEDGE_API_KEY", "hedge-key")
+    @patch("scoring.GROQ_API_KEY", "")
+    def test_hedge_uses_its_own_key_and_model(self, mock_client, mock_hedge_client, mock_groq_response):
+        payload = {"confidence_score": 40, "sentiment": "bearish", "reasoning": "r"}
+        mock_hedge_client.chat.completions.create.return_value = mock_groq_response(json.dumps(payload))
+
+        from scoring import get_trade_confidence
+
+        result = get_trade_confidence("Will TSLA go up?", "Context here.", hedge=True)
+        assert result["confidence_score"] == 40
+        mock_client.chat.completions.create.assert_not_called()
+        assert mock_hedge_client.chat.completions.create.call_args.kwargs["model"] == "llama-3.1-8b-instant"
+
     @patch("scoring.client")
     @patch("scoring.GROQ_API_KEY", "fake-key")
     def test_bearish_sentiment(self, mock_client, mock_groq_response):
@@ -132,3 +148,131 @@ class TestGetTradeConfidence:
 
         result = get_trade_confidence("q", "c")
         assert result["confidence_score"] == 92
+
+
+def _stream_chunks(text, size=4):
+    """Fake streamed completion: chunk objects with choices[0].delta.content."""
+    for i in range(0, len(text), size):
+        delta = MagicMock()
+        delta.content = text[i:i + size]
+        choice = MagicMock()
+        choice.delta = delta
+        chunk = MagicMock()
+        chunk.choices = [choice]
+        yield chunk
+
+
+class _FakeStream:
+    def __init__(self, text, size=4):
+        self._chunks = _stream_chunks(text, size)
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            self.consumed += 1
+            yield chunk
+
+    def close(self):
+        self.closed = True
+
+
+LONG_ANSWER = json.dumps({
+    "confidence_score": 77,
+    "sentiment": "bullish",
+    "reasoning": "Demand is strong. " * 20,
+})
+
+
+class TestRobustParsing:
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    def test_markdown_fenced_answer_parsed(self, mock_client, mock_groq_response):
+        payload = {"confidence_score": 64, "sentiment": "neutral", "reasoning": "Mixed."}
+        mock_client.chat.completions.create.return_value = mock_groq_response(
+            f"```json\n{json.dumps(payload)}\n```"
+        )
+
+        from scoring import get_trade_confidence
+
+        assert get_trade_confidence("q", "c") == payload
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    def test_json_mode_and_max_tokens_requested(self, mock_client, mock_groq_response):
+        mock_client.chat.completions.create.return_value = mock_groq_response(LONG_ANSWER)
+
+        from scoring import get_trade_confidence, GROQ_MAX_TOKENS
+
+        get_trade_confidence("q", "c")
+        kwargs = mock_client.chat.completions.create.call_args[1]
+        assert kwargs["response_format"] == {"type": "json_object"}
+        assert kwargs["max_tokens"] == GROQ_MAX_TOKENS
+        assert "timeout" not in kwargs
+
+        get_trade_confidence("q", "c", timeout=2.5)
+        assert mock_client.chat.completions.create.call_args[1]["timeout"] == 2.5
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    def test_truncated_answer_keeps_score(self, mock_client, mock_groq_response):
+        mock_client.chat.completions.create.return_value = mock_groq_response(LONG_ANSWER[:120])
+
+        from scoring import get_trade_confidence
+
+        result = get_trade_confidence("q", "c")
+        assert result["confidence_score"] == 77
+        assert result["reasoning"].startswith("Demand is strong.")
+
+
+class TestStreamedCompletion:
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    @patch("scoring.GROQ_STREAM", True)
+    @patch("scoring.GROQ_REASONING_CHARS", None)
+    def test_full_stream_parsed(self, mock_client):
+        stream = _FakeStream(LONG_ANSWER)
+        mock_client.chat.completions.create.return_value = stream
+
+        from scoring import get_trade_confidence
+
+        assert get_trade_confidence("q", "c") == json.loads(LONG_ANSWER)
+        assert mock_client.chat.completions.create.call_args[1]["stream"] is True
+        assert stream.closed
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    @patch("scoring.GROQ_STREAM", True)
+    @patch("scoring.GROQ_REASONING_CHARS", 0)
+    def test_returns_once_score_and_sentiment_parsed(self, mock_client):
+        stream = _FakeStream(LONG_ANSWER)
+        mock_client.chat.completions.create.return_value = stream
+
+        from scoring import get_trade_confidence
+
+        result = get_trade_confidence("q", "c")
+        assert result["confidence_score"] == 77 and result["sentiment"] == "bullish"
+        assert stream.consumed < len(LONG_ANSWER) / 4 / 3
+        assert stream.closed
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    @patch("scoring.GROQ_STREAM", True)
+    @patch("scoring.GROQ_REASONING_CHARS", 40)
+    def test_reasoning_capped(self, mock_client):
+        mock_client.chat.completions.create.return_value = _FakeStream(LONG_ANSWER)
+
+        from scoring import get_trade_confidence
+
+        result = get_trade_confidence("q", "c")
+        assert result["reasoning"] == ("Demand is strong. " * 20)[:40]
+
+    @patch("scoring.client")
+    @patch("scoring.GROQ_API_KEY", "fake-key")
+    @patch("scoring.GROQ_STREAM", True)
+    def test_incomplete_stream_is_error(self, mock_client):
+        mock_client.chat.completions.create.return_value = _FakeStream('{"confidence_score": 5')
+
+        from scoring import get_trade_confidence
+
+        assert "Groq inference failed" in get_trade_confidence("q", "c")["error"]
@@ -0,0 +1,146 @@
+"""
+Tests for semantic_cache.py — reuse of answers for reworded questions.
+"""
+
+import pytest
+from unittest.mock import patch
+
+np = pytest.importorskip("numpy")
+
+SCORE = {"confidence_score": 70, "sentiment": "bullish", "reasoning": "ok"}
+
+
+class TestEmbedding:
+    def test_reworded_questions_are_close(self):
+        from semantic_cache import embed
+        a = embed("Will TSLA close above 300 this week?")
+        b = embed("Tesla above $300 by Friday?")
+        assert float(a @ b) >= 0.85
+
+    def test_direction_and_number_keep_questions_apart(self):
+        from semantic_cache import embed
+        base = embed("Will TSLA close above 300 this week?")
+        assert float(base @ embed("Will TSLA close below 300 this week?")) < 0.85
+        assert float(base @ embed("Will TSLA close above 400 this week?")) < 0.85
+
+    def test_unit_length(self):
+        from semantic_cache import embed
+        assert float(np.linalg.norm(embed("Apple earnings beat"))) == pytest.approx(1.0, abs=1e-5)
+        assert not embed("will the").any()
+
+
+class TestQuestionScope:
+    def test_time_windows(self):
+        from semantic_cache import time_window
+        assert time_window("Will TSLA close above 300 this week?") == "this-week"
+        assert time_window("Tesla above $300 by Friday?") == "this-week"
+        assert time_window("Will TSLA close above 300 next week?") == "next-week"
+        assert time_window("Will Apple hit 250 in December 2026?") == "december|y2026"
+        assert time_window("Will NVDA beat in Q3?") == "q3"
+        assert time_window("Will BTC top 2025 by 12/31?") == "d12/31"
+        assert time_window("Stock may rise") == ""
+
+    def test_negation(self):
+        from semantic_cache import negated
+        assert negated("Will TSLA not close above 300?")
+        assert negated("Tesla won't close above 300")
+        assert not negated("Will TSLA close above 300?")
+
+    def test_numbers(self):
+        from semantic_cache import numbers
+        assert numbers("Will TSLA close above 300 this week?") == "300"
+        assert numbers("Tesla above $300.00 by Friday?") == "300"
+        assert numbers("Will BTC hit $1.5k or 1,500?") == "1500"
+        assert numbers("Will SPY drop 5% by May 5?") == "5%"
+        assert numbers("Will Apple hit 250 in December 2026 or by 12/31?") == "250"
+        assert numbers("Will NVDA beat in Q3?") == ""
+
+    def test_negation_and_window_words_stay_in_vector(self):
+        from semantic_cache import features
+        assert {"not", "this", "next"} <= set(features("will it not rise this or next week"))
+
+
+class TestSemanticCache:
+    def _make(self, **kwargs):
+        from semantic_cache import SemanticCache
+        return SemanticCache(**kwargs)
+
+    def test_hit_above_threshold_same_scope(self):
+        c = self._make(threshold=0.85, size=4, ttl=60)
+        c.add("Will TSLA close above 300 this week?", "TSLA", b"{}")
+        body, question, similarity = c.lookup("Tesla above $300 by Friday?", "TSLA")
+        assert body == b"{}" and question.startswith("Will TSLA")
+        assert similarity >= 0.85
+
+    @pytest.mark.parametrize("cached, asked", [
+        ("Will TSLA close above 300 this week?", "Will TSLA close above 300 next week?"),
+        ("Will TSLA close above 300 today?", "Will TSLA close above 300 in December?"),
+        ("Will TSLA close above 300 this week?", "Will TSLA not close above 300 this week?"),
+    ])
+    def test_window_and_negation_must_match(self, cached, asked):
+        c = self._make(threshold=0.85, size=4)
+        c.add(cached, "TSLA", b"{}")
+        assert c.lookup(asked, "TSLA") is None
+        assert c.lookup(cached, "TSLA") is not None
+
+    def test_price_target_must_match(self):
+        from semantic_cache import embed
+        cached = ("Will Tesla stock close the regular trading session on Nasdaq above 200 dollars after the"
+                  " quarterly earnings call, delivery report and analyst upgrades this week?")
+        asked = cached.replace("200", "250")
+        # Close enough in the vector space that only the scope keeps them apart
+        assert float(embed(cached) @ embed(asked)) >= 0.85
+        c = self._make(threshold=0.85, size=4)
+        c.add(cached, "TSLA", b"{}")
+        assert c.lookup(asked, "TSLA") is None
+        assert c.lookup(cached.replace("200 dollars", "$200.00 dollars"), "TSLA") is not None
+
+    def test_scope_must_match(self):
+        c = self._make(size=4)
+        c.add("Will TSLA close above 300 this week?", "TSLA", b"{}")
+        assert c.lookup("Will TSLA close above 300 this week?", "AAPL") is None
+
+    def test_threshold_configurable(self):
+        c = self._make(threshold=0.99, size=4)
+        c.add("Will TSLA close above 300 this week?", "s", b"{}")
+        assert c.lookup("Tesla above $300 by Friday?", "s") is None
+
+    def test_expired_entries_ignored(self):
+        c = self._make(size=4, ttl=10)
+        with patch("semantic_cache.time.monotonic", return_value=100.0):
+            c.add("Will Apple beat earnings?", "s", b"{}")
+        with patch("semantic_cache.time.monotonic", return_value=111.0):
+            assert c.lookup("Will Apple beat earnings?", "s") is None
+
+    def test_oldest_entry_overwritten(self):
+        c = self._make(size=2)
+        c.add("Will Apple beat earnings?", "s", b"1")
+        c.add("Will Nvidia beat earnings?", "s", b"2")
+        c.add("Will Netflix beat earnings?", "s", b"3")
+        assert c.lookup("Will Apple beat earnings?", "s") is None
+        assert c.lookup("Will Netflix beat earnings?", "s")[0] == b"3"
+        assert c.stats()["entries"] == 2
+
+
+class TestAnalyzeSemanticReuse:
+    @patch("app.get_trade_confidence", return_value=dict(SCORE))
+    @patch("app.get_polymarket_context", return_value="Poly")
+    @patch("app.search_wikipedia", return_value="Wiki")
+    @patch("app.get_market_sentiment", return_value="Finnhub")
+    def test_reworded_question_reuses_answer(self, mock_sentiment, mock_wiki, mock_poly, mock_score, client):
+        first = client.post("/api/analyze", json={"question": "Will TSLA close above 300 this week?", "symbol": "TSLA"})
+        second = client.post("/api/analyze", json={"question": "Tesla above $300 by Friday?"})
+        assert mock_score.call_count == 1
+        data = second.json()
+        assert data["confidence_score"] == first.json()["confidence_score"]
+        assert data["question"] == "Tesla above $300 by Friday?"
+        assert data["semantic_match"]["question"] == "Will TSLA close above 300 this week?"
+
+    @patch("app.get_trade_confidence", return_value=dict(SCORE))
+    @patch("app.get_polymarket_context", return_value="Poly")
+    @patch("app.search_wikipedia", return_value="Wiki")
+    @patch("app.get_market_sentiment", return_value="Finnhub")
+    def test_different_options_not_reused(self, mock_sentiment, mock_wiki, mock_poly, mock_score, client):
+        client.post("/api/analyze", json={"question": "Will Apple beat earnings?"})
+        client.post("/api/analyze", json={"question": "Apple to beat earnings?", "context": "extra"})
+        assert mock_score.call_count == 2
@@ -0,0 +1,157 @@
+"""
+Tests for shm_cache.py — the cross-process shared-memory cache backend.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+
+import pytest
+from unittest.mock import patch
+
+shm_cache = pytest.importorskip("shm_cache")
+
+
+@pytest.fixture
+def segment_name():
+    name = f"bb-test-{uuid.uuid4().hex[:12]}"
+    yield name
+    shm_cache.unlink(name)
+
+
+def _make(name, ttl=60, prefix="t:", slots=64, slot_size=512):
+    return shm_cache.SharedMemoryCache(ttl, prefix=prefix, name=name, slots=slots, slot_size=slot_size)
+
+
+def _child_set(name, key, value):
+    _make(name).set(key, value)
+
+
+def _child_fetch(name, key, counter_path):
+    def fetch():
+        with open(counter_path, "a") as f:
+            f.write("x")
+        time.sleep(0.3)
+        return b"fetched", True
+    _make(name).get_or_fetch(key, fetch)
+
+
+class TestSharedMemoryCache:
+    def test_set_and_get(self, segment_name):
+        c = _make(segment_name)
+        c.set("AAPL", b'{"c":1}')
+        assert c.get("AAPL") == b'{"c":1}'
+        assert c.hits == 1
+
+    def test_missing_key(self, segment_name):
+        c = _make(segment_name)
+        assert c.get("nope") is None
+        assert c.misses == 1
+
+    def test_overwrite_same_key(self, segment_name):
+        c = _make(segment_name)
+        c.set("k", b"first")
+        c.set("k", b"second")
+        assert c.get("k") == b"second"
+
+    def test_expired_entry(self, segment_name):
+        c = _make(segment_name, ttl=10)
+        with patch("shm_cache.time.time", return_value=1000.0):
+            c.set("k", b"v")
+        with patch("shm_cache.time.time", return_value=1011.0):
+            assert c.get("k") is None
+
+    def test_oversize_value_skipped(self, segment_name, caplog):
+        c = _make(segment_name, slot_size=128)
+        c.set("big", b"x" * 500)
+        assert c.get("big") is None
+        assert c.oversize == 1
+        assert "500-byte value does not fit a 128-byte slot" in caplog.text
+
+    def test_default_slot_fits_scrape_body(self):
+        # Three Wikipedia extracts, 20 markets and 20 news items
+        assert shm_cache.SHM_CACHE_SLOT_SIZE >= 3 * 1600 + 20 * 500 + 20 * 500
+
+    def test_prefixes_are_isolated(self, segment_name):
+        a = _make(segment_name, prefix="a:")
+        b = _make(segment_name, prefix="b:")
+        a.set("k", b"from-a")
+        assert b.get("k") is None
+        b.set("k", b"from-b")
+        a.clear()
+        assert a.get("k") is None
+        assert b.get("k") == b"from-b"
+
+    def test_bucket_eviction_keeps_table_bounded(self, segment_name):
+        c = _make(segment_name, slots=8)
+        for i in range(100):
+            c.set(f"k{i}", str(i).encode())
+        assert c.get("k99") == b"99"
+        assert sum(c.get(f"k{i}") is not None for i in range(100)) <= 8
+
+    def test_get_or_fetch_caches_result(self, segment_name):
+        c = _make(segment_name)
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            return b"value", True
+
+        assert c.get_or_fetch("k", fetch) == b"value"
+        assert c.get_or_fetch("k", fetch) == b"value"
+        assert len(calls) == 1
+
+    def test_slow_fetch_does_not_block_other_keys(self, segment_name):
+        c = _make(segment_name)
+        release = threading.Event()
+
+        def slow():
+            release.wait(5)
+            return b"slow", True
+
+        with concurrent.futures.ThreadPoolExecutor(1) as pool:
+            pending = pool.submit(c.get_or_fetch, "slow", slow)
+            time.sleep(0.05)
+            # A key that shared "slow"'s lock when fetch locks were striped
+            stripe = shm_cache._hash_key(b"t:slow") % shm_cache.LOCK_STRIPES
+            fast = next(f"fast{i}" for i in range(100000)
+                        if shm_cache._hash_key(f"t:fast{i}".encode()) % shm_cache.LOCK_STRIPES == stripe)
+            started = time.monotonic()
+            assert c.get_or_fetch(fast, lambda: (b"fast", True)) == b"fast"
+            assert time.monotonic() - started < 1
+            release.set()
+            assert pending.result() == b"slow"
+        assert c._seg._fetch_locks == {}
+
+    def test_get_or_fetch_does_not_store_errors(self, segment_name):
+        c = _make(segment_name)
+        c.get_or_fetch("k", lambda: (b'{"error":"x"}', False))
+        assert c.get("k") is None
+
+
+class TestCrossProcess:
+    def test_value_visible_to_other_process(self, segment_name):
+        c = _make(segment_name)
+        proc = multiprocessing.get_context("spawn").Process(
+            target=_child_set, args=(segment_name, "TSLA", b"250.0")
+        )
+        proc.start()
+        proc.join(10)
+        assert c.get("TSLA") == b"250.0"
+
+    def test_fetch_deduplicated_across_processes(self, segment_name, tmp_path):
+        _make(segment_name)
+        counter = tmp_path / "calls"
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(target=_child_fetch, args=(segment_name, "NVDA", str(counter)))
+            for _ in range(3)
+        ]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join(20)
+        assert counter.read_text() == "x"
@@ -0,0 +1,166 @@
+"""
+Tests for snapshot.py — the precomputed /api/market-snapshot.
+"""
+
+import threading
+import time
+from unittest.mock import patch
+
+from serialization import loads
+
+QUOTE = {"symbol": "SPY", "current_price": 500.0, "change_percent": 0.4}
+MARKET = {"question": "Will the Fed cut?", "volume": "1000000"}
+NEWS = {"headline": "Stocks rally", "summary": "S"}
+
+
+def _snapshot(indices=None, markets=None, news=None, intervals=(30, 120, 300)):
+    from snapshot import MarketSnapshot
+    return MarketSnapshot({
+        "indices": (indices or (lambda: [QUOTE]), intervals[0]),
+        "markets": (markets or (lambda: [MARKET]), intervals[1]),
+        "news": (news or (lambda: [NEWS]), intervals[2]),
+    })
+
+
+class TestMarketSnapshot:
+    def test_build_is_serialized_once_and_versioned(self):
+        snap = _snapshot()
+        assert snap.body() is None
+        body = snap.refresh()
+        assert snap.body() is body
+        data = loads(body)
+        assert data["version"] == 1
+        assert data["components"]["indices"]["data"] == [QUOTE]
+        assert data["components"]["markets"]["interval_s"] == 120
+        assert data["components"]["news"]["stale"] is False
+        assert data["generated_at"] >= data["components"]["news"]["generated_at"]
+
+    def test_components_refresh_on_their_own_interval(self):
+        calls = {"indices": 0, "news": 0}
+
+        def indices():
+            calls["indices"] += 1
+            return [QUOTE]
+
+        def news():
+            calls["news"] += 1
+            return [NEWS]
+
+        snap = _snapshot(indices=indices, news=news, intervals=(0.05, 120, 300))
+        snap.refresh()
+        time.sleep(0.06)
+        body = snap.refresh()
+        assert calls == {"indices": 2, "news": 1}
+        assert loads(body)["version"] == 2
+
+        # Nothing due: same bytes, same version
+        assert snap.refresh() is body
+
+    def test_failed_refresh_keeps_last_good_data(self):
+        results = [[MARKET], [{"error": "Polymarket top markets failed: boom"}]]
+        snap = _snapshot(markets=lambda: results.pop(0), intervals=(30, 0, 300))
+        snap.refresh()
+        markets = loads(snap.refresh(force=True))["components"]["markets"]
+        assert markets["data"] == [MARKET]
+        assert markets["stale"] is True
+        assert markets["error"] == "Polymarket top markets failed: boom"
+
+    def test_exception_in_fetch_marks_stale(self):
+        def boom():
+            raise RuntimeError("down")
+        snap = _snapshot(news=boom)
+        news = loads(snap.refresh())["components"]["news"]
+        assert news["stale"] is True and news["error"] == "down"
+
+    def test_background_thread(self):
+        snap = _snapshot(intervals=(0.01, 0.01, 0.01))
+        snap.start()
+        try:
+            deadline = time.monotonic() + 2
+            while snap.version < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            snap.stop()
+        assert snap.version >= 3
+
+    @patch("snapshot.SNAPSHOT_IDLE_STOP", 0.05)
+    def test_background_thread_stops_when_unread(self):
+        snap = _snapshot(intervals=(0.01, 0.01, 0.01))
+        snap.start()
+        try:
+            snap._thread.join(timeout=2)
+            assert not snap._thread.is_alive()
+            assert snap.stats()["running"] is False
+        finally:
+            snap.stop()
+
+
+class TestIndexQuotes:
+    @patch("snapshot.SNAPSHOT_SYMBOLS", ["SPY", "QQQ"])
+    @patch("snapshot.get_stock_quote")
+    def test_failed_symbols_dropped(self, mock_quote):
+        from snapshot import index_quotes
+        mock_quote.side_effect = lambda s: QUOTE if s == "SPY" else {"error": "Finnhub quote failed: x"}
+        assert index_quotes() == [QUOTE]
+        mock_quote.side_effect = lambda s: {"error": "Finnhub quote failed: x"}
+        assert index_quotes() == [{"error": "Finnhub quote failed: x"}]
+
+
+class TestSnapshotEndpoint:
+    @patch("snapshot.get_market_news", return_value=[NEWS])
+    @patch("snapshot.get_top_markets", return_value=[MARKET])
+    @patch("snapshot.get_stock_quote", return_value=QUOTE)
+    def test_served_from_memory(self, mock_quote, mock_markets, mock_news, client):
+        first = client.get("/api/market-snapshot")
+        assert first.status_code == 200
+        assert first.json()["version"] == 1
+        calls = mock_quote.call_count
+
+        for _ in range(5):
+            assert client.get("/api/market-snapshot").json()["version"] == 1
+        assert mock_quote.call_count == calls
+        assert mock_markets.call_count == 1
+
+        again = client.get("/api/market-snapshot", headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+        assert client.get("/api/admin/snapshot").json()["reads"] == 7
+        assert client.get("/api/admin/snapshot").json()["running"] is False
+
+    @patch("snapshot.get_market_news", return_value=[NEWS])
+    @patch("snapshot.get_top_markets", return_value=[MARKET])
+    @patch("snapshot.get_stock_quote")
+    def test_stale_read_served_while_refreshing(self, mock_quote, mock_markets, mock_news, client):
+        from snapshot import snapshot
+        release = threading.Event()
+        mock_quote.return_value = QUOTE
+        assert client.get("/api/market-snapshot").json()["version"] == 1
+
+        def slow_quote(symbol):
+            release.wait(5)
+            return QUOTE
+        mock_quote.side_effect = slow_quote
+        snapshot.components["indices"].refreshed_at -= snapshot.components["indices"].interval
+        try:
+            started = time.monotonic()
+            for _ in range(3):
+                assert client.get("/api/market-snapshot").json()["version"] == 1
+            assert time.monotonic() - started < 1
+        finally:
+            release.set()
+            snapshot._revalidator.join(timeout=5)
+        assert client.get("/api/market-snapshot").json()["version"] == 2
+        assert mock_markets.call_count == 1
+
+    @patch("app.SNAPSHOT_ENABLED", True)
+    @patch("snapshot.get_market_news", return_value=[NEWS])
+    @patch("snapshot.get_top_markets", return_value=[MARKET])
+    @patch("snapshot.get_stock_quote", return_value=QUOTE)
+    def test_refresher_starts_on_first_read(self, mock_quote, mock_markets, mock_news, client):
+        from snapshot import snapshot
+        assert client.get("/api/admin/snapshot").json()["running"] is False
+        try:
+            assert client.get("/api/market-snapshot").status_code == 200
+            assert client.get("/api/admin/snapshot").json()["running"] is True
+        finally:
+            snapshot.stop()
+            snapshot._thread.join(timeout=2)
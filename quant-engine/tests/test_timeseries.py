@@ -0,0 +1,135 @@
+"""
+Tests for timeseries.py — ring-buffer price history.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+np = pytest.importorskip("numpy")
+
+
+class TestSeries:
+    def _make(self, capacity=5):
+        from timeseries import Series
+        return Series("quote:TEST", capacity)
+
+    def test_append_and_range(self):
+        s = self._make()
+        for i in range(3):
+            s.append(100.0 + i, 10.0 + i)
+        t, v = s.range()
+        assert t.tolist() == [100.0, 101.0, 102.0]
+        assert v.tolist() == [10.0, 11.0, 12.0]
+
+    def test_ring_buffer_wraps(self):
+        s = self._make(capacity=3)
+        for i in range(7):
+            s.append(float(i), float(i * 10))
+        t, v = s.arrays()
+        assert t.tolist() == [4.0, 5.0, 6.0]
+        assert v.tolist() == [40.0, 50.0, 60.0]
+        assert len(s) == 3
+
+    def test_out_of_order_dropped_and_same_time_replaced(self):
+        s = self._make()
+        s.append(10.0, 1.0)
+        s.append(5.0, 2.0)
+        s.append(10.0, 3.0)
+        assert s.range()[1].tolist() == [3.0]
+
+    def test_range_bounds(self):
+        s = self._make(capacity=10)
+        for i in range(10):
+            s.append(float(i), float(i))
+        t, _ = s.range(start=3, end=6)
+        assert t.tolist() == [3.0, 4.0, 5.0, 6.0]
+
+    def test_resample_ohlc(self):
+        s = self._make(capacity=10)
+        for t, v in [(0, 5), (10, 7), (59, 4), (60, 8), (130, 6)]:
+            s.append(float(t), float(v))
+        start, o, h, l, c, n = s.resample(60)
+        assert start.tolist() == [0.0, 60.0, 120.0]
+        assert o.tolist() == [5.0, 8.0, 6.0]
+        assert h.tolist() == [7.0, 8.0, 6.0]
+        assert l.tolist() == [4.0, 8.0, 6.0]
+        assert c.tolist() == [4.0, 8.0, 6.0]
+        assert n.tolist() == [3, 1, 1]
+
+    def test_memory_is_fixed(self):
+        s = self._make(capacity=100)
+        before = s.nbytes
+        for i in range(1000):
+            s.append(float(i), 1.0)
+        assert s.nbytes == before == 1600
+
+
+class TestStore:
+    def test_record_creates_series(self):
+        from timeseries import TimeSeriesStore
+        store = TimeSeriesStore(capacity=4)
+        store.record("quote:AAPL", "190.5", t=1.0)
+        assert store.get("quote:AAPL").last() == (1.0, 190.5)
+
+    def test_non_numeric_ignored(self):
+        from timeseries import TimeSeriesStore
+        store = TimeSeriesStore(capacity=4)
+        store.record("quote:AAPL", None)
+        assert store.get("quote:AAPL") is None
+
+    def test_series_count_bounded(self):
+        from timeseries import TimeSeriesStore
+        store = TimeSeriesStore(capacity=4, max_series=2)
+        store.record("a", 1, t=1.0)
+        store.record("b", 1, t=3.0)
+        store.record("c", 1, t=2.0)
+        assert sorted(store.keys()) == ["b", "c"]
+
+    def test_stats(self):
+        from timeseries import TimeSeriesStore
+        store = TimeSeriesStore(capacity=100, max_series=10)
+        store.record("a", 1.0, t=1.0)
+        stats = store.stats()
+        assert stats["series"] == 1
+        assert stats["points"] == 1
+        assert stats["bytes_per_series"] >= 1600
+        assert stats["bytes_limit"] == stats["bytes_per_series"] * 10
+
+
+class TestScraperHooks:
+    @patch("scraping.finnHub.requests.get")
+    def test_quote_recorded(self, mock_get, sample_stock_quote):
+        mock_get.return_value.json.return_value = dict(sample_stock_quote, t=1700000000)
+        from scraping.finnHub import get_stock_quote
+        from timeseries import store
+
+        get_stock_quote("TSLA")
+        assert store.get("quote:TSLA").last() == (1700000000.0, 250.0)
+
+    @patch("scraping.polymarket.requests.get")
+    def test_market_recorded(self, mock_get, sample_polymarket_gamma_response):
+        mock_get.return_value.json.return_value = sample_polymarket_gamma_response
+        from scraping.polymarket import search_markets
+        from timeseries import store
+
+        search_markets("Tesla stock")
+        assert store.get("polymarket:will-tesla-stock-hit-300").last()[1] == 0.65
+
+
+class TestTimeseriesEndpoints:
+    def test_query_and_resample(self, client):
+        from timeseries import store
+        for t, v in [(0, 1.0), (30, 2.0), (60, 3.0)]:
+            store.record("quote:NVDA", v, t=float(t))
+        data = client.get("/api/timeseries", params={"key": "quote:NVDA"}).json()
+        assert data["price"] == [1.0, 2.0, 3.0]
+        data = client.get("/api/timeseries", params={"key": "quote:NVDA", "interval": 60}).json()
+        assert data["close"] == [2.0, 3.0]
+
+    def test_unknown_key(self, client):
+        assert client.get("/api/timeseries", params={"key": "quote:NONE"}).status_code == 404
+
+    def test_stats_endpoint(self, client):
+        resp = client.get("/api/timeseries/stats")
+        assert resp.status_code == 200
+        assert "bytes_per_series" in resp.json()
@@ -0,0 +1,175 @@
+"""
+TIME-SERIES STORE
+- Purpose: Keeps a short price history for every stock symbol and Polymarket
+  market we fetch, so trend context and charts don't need fresh upstream pulls.
+- Each series is a fixed-capacity ring buffer of (timestamp, price) held in two
+  preallocated array('d') buffers inside a __slots__ container: memory per
+  series is fixed at creation and the number of series is capped.
+- Filled by the scrapers as quotes and markets are fetched; queried through
+  NumPy views for range and resample lookups.
+"""
+
+import os
+import sys
+import threading
+import time
+from array import array
+
+from lazy import lazy_import
+
+np = lazy_import("numpy")
+
+TIMESERIES_CAPACITY = int(os.getenv("TIMESERIES_CAPACITY", "2048"))
+TIMESERIES_MAX_SERIES = int(os.getenv("TIMESERIES_MAX_SERIES", "5000"))
+
+
+class Series:
+    """Ring buffer of float timestamps and prices with a fixed capacity."""
+
+    __slots__ = ("key", "capacity", "_t", "_v", "_head", "_size", "_lock")
+
+    def __init__(self, key: str, capacity: int = TIMESERIES_CAPACITY):
+        self.key = key
+        self.capacity = capacity
+        zeros = bytes(8 * capacity)
+        self._t = array("d", zeros)
+        self._v = array("d", zeros)
+        self._head = 0  # next write position
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return (len(self._t) + len(self._v)) * 8
+
+    def append(self, t: float, value: float):
+        """Add a point; a point older than the newest one is dropped, an equal timestamp replaces it."""
+        with self._lock:
+            if self._size:
+                last = (self._head - 1) % self.capacity
+                if t < self._t[last]:
+                    return
+                if t == self._t[last]:
+                    self._v[last] = value
+                    return
+            self._t[self._head] = t
+            self._v[self._head] = value
+            self._head = (self._head + 1) % self.capacity
+            if self._size < self.capacity:
+                self._size += 1
+
+    def last(self):
+        """Newest (timestamp, price) or None."""
+        with self._lock:
+            if not self._size:
+                return None
+            i = (self._head - 1) % self.capacity
+            return self._t[i], self._v[i]
+
+    def arrays(self):
+        """Chronologically ordered copies of (timestamps, prices) as NumPy arrays."""
+        with self._lock:
+            t = np.frombuffer(self._t, dtype=np.float64)
+            v = np.frombuffer(self._v, dtype=np.float64)
+            if self._size < self.capacity:
+                return t[:self._size].copy(), v[:self._size].copy()
+            return np.roll(t, -self._head), np.roll(v, -self._head)
+
+    def range(self, start: float = None, end: float = None):
+        """Points with start <= t <= end, found by binary search."""
+        t, v = self.arrays()
+        lo = 0 if start is None else int(np.searchsorted(t, start, side="left"))
+        hi = len(t) if end is None else int(np.searchsorted(t, end, side="right"))
+        return t[lo:hi], v[lo:hi]
+
+    def resample(self, interval: float, start: float = None, end: float = None):
+        """
+        Bucket points into fixed intervals (seconds).
+        Returns (bucket_start, open, high, low, close, count) arrays for non-empty buckets.
+        """
+        t, v = self.range(start, end)
+        if not len(t):
+            empty = np.empty(0)
+            return empty, empty, empty, empty, empty, np.empty(0, dtype=np.int64)
+        buckets = np.floor(t / interval).astype(np.int64)
+        # t is sorted, so each bucket is one contiguous run
+        starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+        ends = np.r_[starts[1:], len(t)]
+        return (
+            buckets[starts] * interval,
+            v[starts],
+            np.maximum.reduceat(v, starts),
+            np.minimum.reduceat(v, starts),
+            v[ends - 1],
+            ends - starts,
+        )
+
+
+class TimeSeriesStore:
+    """Keyed collection of Series with a cap on the number of series."""
+
+    def __init__(self, capacity: int = TIMESERIES_CAPACITY, max_series: int = TIMESERIES_MAX_SERIES):
+        self.capacity = capacity
+        self.max_series = max_series
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, value, t: float = None):
+        """Append a price to the series for key (created on first use)."""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return
+        t = time.time() if t is None else t
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    if len(self._series) >= self.max_series:
+                        self._evict_stalest()
+                    series = self._series[key] = Series(key, self.capacity)
+        series.append(t, value)
+
+    def _evict_stalest(self):
+        stalest = min(self._series.values(), key=lambda s: (s.last() or (0.0, 0.0))[0])
+        del self._series[stalest.key]
+
+    def get(self, key: str):
+        return self._series.get(key)
+
+    def keys(self):
+        return list(self._series)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+    def stats(self) -> dict:
+        """Memory report: fixed bytes per series and the current total."""
+        series = list(self._series.values())
+        probe = Series("", self.capacity)
+        per_series = sys.getsizeof(probe) + sys.getsizeof(probe._t) + sys.getsizeof(probe._v)
+        return {
+            "series": len(series),
+            "max_series": self.max_series,
+            "capacity": self.capacity,
+            "points": sum(len(s) for s in series),
+            "bytes_per_series": per_series,
+            "bytes_total": per_series * len(series),
+            "bytes_limit": per_series * self.max_series,
+        }
+
+
+store = TimeSeriesStore()
+
+
+def quote_key(symbol: str) -> str:
+    return f"quote:{symbol.upper()}"
+
+
+def market_key(slug: str) -> str:
+    return f"polymarket:{slug}"